@@ -4,7 +4,12 @@ Classic Board Evaluation.
 Contains heuristic evaluation functions and piece values.
 Enhanced with Piece-Square Tables (PST) based on standard Xiangqi strategy.
 Values are relative to Red (Top, y=0) perspective.
+
+The tables are precompiled into a numpy array indexed by (piece, square),
+so a board is scored with a single gather-and-sum; the whole score can
+also be updated incrementally per move (move_delta).
 """
+import numpy as np
 
 # Base Piece values
 PIECE_VALUES = {
@@ -123,6 +128,86 @@ KING_PST = [
     [0] * 9,
 ]
 
+# -----------------------------------------------------------------------------
+# Precompiled Tables
+# -----------------------------------------------------------------------------
+
+PST_MAP = {
+    1: KING_PST,
+    2: ADVISOR_PST,
+    3: ELEPHANT_PST,
+    4: HORSE_PST,
+    5: ROOK_PST,
+    6: CANNON_PST,
+    7: PAWN_PST,
+}
+
+
+def _build_square_table():
+    """Material + PST score of each piece (-7..7, row = piece + 7) on each square (y * 9 + x)."""
+    table = np.zeros((15, 90), dtype=np.int64)
+    for p_type, pst in PST_MAP.items():
+        values = PIECE_VALUES[p_type] + np.array(pst, dtype=np.int64)
+        table[7 + p_type] = values.ravel()
+        # Black mirrors coordinates (y' = 9 - y) and counts against Red
+        table[7 - p_type] = -values[::-1].ravel()
+    return table
+
+
+SQUARE_TABLE = _build_square_table()
+_SQUARE_ROWS = SQUARE_TABLE.tolist()  # Plain ints for fast scalar lookups
+_SQUARES = np.arange(90)
+
+
+def material_score(board) -> int:
+    """Material + position score (Red perspective), without pattern bonuses."""
+    pieces = np.asarray(board, dtype=np.int64).ravel() + 7
+    return int(SQUARE_TABLE[pieces, _SQUARES].sum())
+
+
+def move_delta(board, action) -> int:
+    """
+    Change of evaluate_board(board) when `action` (start * 90 + end) is played.
+
+    Lets a search carry the score down the tree (make: add the delta,
+    unmake: drop it) instead of rescoring every node. Material + position
+    is three table lookups; the cannon patterns are rescored only on the
+    (at most two) files a cannon move or capture touches.
+    """
+    board = np.asarray(board)
+    start, end = divmod(int(action), 90)
+    piece = board.item(start)
+    captured = board.item(end)
+    delta = _SQUARE_ROWS[piece + 7][end] - _SQUARE_ROWS[piece + 7][start] - _SQUARE_ROWS[captured + 7][end]
+
+    if abs(piece) == 6 or abs(captured) == 6:
+        squares = board.ravel()
+        after = squares.copy()
+        after[end], after[start] = piece, 0
+        for x in {start % 9, end % 9}:
+            delta += _file_cannon_bonus(after[x::9], x) - _file_cannon_bonus(squares[x::9], x)
+    return delta
+
+
+def _file_cannon_bonus(file, x) -> int:
+    """Cannon pattern bonus of one file (its 10 squares, top to bottom)."""
+    red = np.count_nonzero(file == 6)
+    black = np.count_nonzero(file == -6)
+    bonus = DOUBLE_CANNON_BONUS * (int(red >= 2) - int(black >= 2))
+    if x == 4:
+        bonus += HOLLOW_CANNON_BONUS * (red - black)
+    return int(bonus)
+
+
+def cannon_bonus(board) -> int:
+    """Double Cannon and Central Cannon bonuses (Red perspective)."""
+    board = np.asarray(board)
+    red = np.count_nonzero(board == 6, axis=0)     # Cannons per file
+    black = np.count_nonzero(board == -6, axis=0)
+    doubled = np.count_nonzero(red >= 2) - np.count_nonzero(black >= 2)
+    return int(DOUBLE_CANNON_BONUS * doubled + HOLLOW_CANNON_BONUS * (red[4] - black[4]))
+
+
 def evaluate_board(board) -> float:
     """
     Evaluation function with Material + Position Bonus.
@@ -133,94 +218,27 @@ def evaluate_board(board) -> float:
     Returns:
         Score (Red perspective)
     """
-    score = 0
-    
-    # Pre-fetch lookup tables to avoid lookups in inner loop
-    pst_map = {
-        1: KING_PST,
-        2: ADVISOR_PST,
-        3: ELEPHANT_PST,
-        4: HORSE_PST,
-        5: ROOK_PST,
-        6: CANNON_PST,
-        7: PAWN_PST
-    }
-
-    for y in range(10):
-        for x in range(9):
-            piece = board[y][x]
-            if piece == 0:
-                continue
-            
-            p_type = abs(piece)
-            base_val = PIECE_VALUES.get(p_type, 0)
-            
-            # Position Bonus
-            pst = pst_map.get(p_type)
-            if not pst:
-                continue
-
-            if piece > 0: # RED
-                pst_val = pst[y][x]
-                score += (base_val + pst_val)
-                
-            else: # BLACK
-                # Mirror coordinates for Black (y' = 9-y)
-                # Note: Xiangqi boards is symmetric horizontally for strategy usually,
-                # but let's stick to simple vertical mirror.
-                # Actually, Black Pawn at y=6 (Red side) is like Red Pawn at y=3 (Black side).
-                # Wait.
-                # Red Pawn at y=3 (Start).
-                # Black Pawn at y=6 (Start).
-                # PST[3] for Red is Initial.
-                # For Black at y=6, 9-6=3. So matches PST[3]. Correct.
-                
-                mirror_y = 9 - y
-                pst_val = pst[mirror_y][x]
-                score -= (base_val + pst_val)
-                
-    # -------------------------------------------------------------------------
-    # Pattern Logic: Double Cannon & Central Cannon
-    # -------------------------------------------------------------------------
-    # We scan files (columns) for Cannon configurations.
-    # This is a bit expensive (O(90)), but necessary for "smart" play at low depth.
-    
-    # Check Red Cannons
-    # Transpose board roughly to check columns? Or just iterate x, then y.
-    
-    for x in range(9):
-        # Scan file x
-        col = board[:, x] # numpy slice
-        
-        # Find Cannons in this column
-        red_cannons = []
-        black_cannons = []
-        
-        for y in range(10):
-            p = col[y]
-            if p == 6: # Red Cannon
-                red_cannons.append(y)
-            elif p == -6: # Black Cannon
-                black_cannons.append(y)
-        
-        # 1. Double Cannon (Twin Cannons)
-        if len(red_cannons) >= 2:
-            score += DOUBLE_CANNON_BONUS
-        if len(black_cannons) >= 2:
-            score -= DOUBLE_CANNON_BONUS
-            
-        # 2. Central Cannon (Hollow Cannon attempt)
-        # Checking if Cannon is on Central File (x=4)
-        if x == 4:
-            # Red Central Cannon
-            for cy in red_cannons:
-                # If it's a "Hollow" cannon (threatening King directly or empty center)
-                # Ideally, we check if there are pieces between Cannon and Enemy King (y=0..2 black, y=7..9 red)
-                # Simplified: Just controlling the center is worth a lot.
-                score += HOLLOW_CANNON_BONUS
-                
-            # Black Central Cannon
-            for cy in black_cannons:
-                score -= HOLLOW_CANNON_BONUS
-
-    return score
+    return material_score(board) + cannon_bonus(board)
+
+
+def evaluate_boards(boards):
+    """
+    Vectorized evaluate_board for a batch of boards.
+
+    Args:
+        boards: (N, 10, 9) array
+
+    Returns:
+        (N,) int64 array of scores (Red perspective)
+    """
+    boards = np.asarray(boards, dtype=np.int64)
+    pieces = boards.reshape(len(boards), 90) + 7
+    scores = SQUARE_TABLE[pieces, _SQUARES].sum(axis=1)
+
+    red = np.count_nonzero(boards == 6, axis=1)     # (N, 9) cannons per file
+    black = np.count_nonzero(boards == -6, axis=1)
+    doubled = np.count_nonzero(red >= 2, axis=1) - np.count_nonzero(black >= 2, axis=1)
+    scores += DOUBLE_CANNON_BONUS * doubled
+    # Central Cannon: controlling the center file is worth a lot
+    scores += HOLLOW_CANNON_BONUS * (red[:, 4] - black[:, 4])
+    return scores
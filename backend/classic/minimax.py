@@ -1,148 +1,326 @@
 """
 Minimax Algorithm.
 
-Standard Alpha-Beta Pruning implementation for Xiangqi.
-Supports adjustable difficulty via depth and randomness.
+Iterative-deepening Negamax search with Alpha-Beta Pruning and a
+transposition table for Xiangqi. Supports adjustable difficulty via depth
+and a wall-clock budget per move.
 """
+import time
 import numpy as np
-import random
-from .evaluation import evaluate_board
+from game import KING
+from .evaluation import PIECE_VALUES, evaluate_board, move_delta
+from .transposition import ZobristHasher, TranspositionTable, EXACT, LOWER, UPPER
+
+WIN_SCORE = 10000
+
+# Move ordering keys (higher is searched first): PV move, table move,
+# captures by MVV-LVA, killer moves, then quiet moves by history score.
+PV_ORDER = 3 << 40
+TT_ORDER = 2 << 40
+CAPTURE_ORDER = 1 << 40
+KILLER_ORDER = (1 << 32, (1 << 32) - 1)  # First and second killer slot
+MAX_PLY = 64
+
+# Piece value by absolute piece type, for MVV-LVA
+_VALUES = np.array([0] + [PIECE_VALUES[p] for p in range(1, 8)], dtype=np.int64)
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when abort_check() fires or time runs out."""
 
 
 class MinimaxSolver:
     """Core Minimax Solver."""
     
-    def __init__(self, game, depth: int = 2):
+    def __init__(self, game, depth: int = 2, time_limit: float = None,
+                 tt_size_bits: int = 18, persistent_tt: bool = True, tt=None):
         """
         Initialize solver.
         
         Args:
             game: Game logic instance
-            depth: Search depth (1=weak, 4+=strong)
+            depth: Maximum search depth (1=weak, 4+=strong)
+            time_limit: Optional seconds per move; the deepest fully searched
+                depth is used once it runs out (depth 1 always completes)
+            tt_size_bits: Transposition table holds 2**tt_size_bits entries
+            persistent_tt: Keep the table between get_best_move calls (same game)
+            tt: Optional shared TranspositionTable (overrides tt_size_bits)
         """
         self.game = game
         self.depth = depth
+        self.time_limit = time_limit
+        self.persistent_tt = persistent_tt
+        self.tt = tt if tt is not None else TranspositionTable(tt_size_bits)
+        self.hasher = ZobristHasher()
+        self.nodes = 0
+        self._abort_check = None
+        self._deadline = None
+        self._pv = []
+        self._follow_pv = False
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history = np.zeros(game.get_action_size(), dtype=np.int64)
 
-    def get_best_move(self, canonical_board, progress_callback=None, abort_check=None):
+    def get_best_move(self, canonical_board, progress_callback=None, abort_check=None, depth_callback=None):
         """
-        Evaluate and find the best move.
+        Evaluate and find the best move, deepening one ply at a time.
         
         Args:
             canonical_board: The board state
-            progress_callback: Optional callable(current, total)
+            progress_callback: Optional callable(current, total), per root move
             abort_check: Optional callable() -> bool. If returns True, stop calculation.
+            depth_callback: Optional callable(info) after each completed depth, with
+                info = {'depth', 'score', 'pv', 'nodes', 'elapsed'} (pv in canonical
+                actions, alternating sides starting with the side to move)
+
+        Returns:
+            Best action of the deepest completed depth, or None if aborted
         """
         valids = self.game.get_valid_moves(canonical_board, 1)
         valid_actions = np.where(valids == 1)[0]
         
         if len(valid_actions) == 0:
             return None
-        
-        best_action = valid_actions[0]
-        best_score = -float('inf')
-        
-        # Consistent ordering for determinism (or shuffle if we want variety with SAME score?)
-        # User requested "Purely deterministic behavior (best move only)".
-        # Shuffling valid_actions introduces non-determinism if scores are equal.
-        # To be "purely deterministic", we should NOT shuffle, or shuffle with fixed seed.
-        # But usually engines return first best move.
-        # However, playing same game every time is boring. "No Randomness" usually means "Play Best Move", but if multiple best?
-        # Standard engines utilize randomness among equal best moves.
-        # But user said "remove randomness param".
-        # I will remove explicit random blunder.
-        # I will keep shuffling for variety among EQUAL moves, or remove it if "Strict Determinism" is the goal.
-        # User said "Minimax difficulty will now be determined SOLELY by search depth."
-        # I'll restart the shuffle to keep it interesting but 'strongest possible'.
-        np.random.shuffle(valid_actions)
-        
-        total_moves = len(valid_actions)
-        
-        for i, action in enumerate(valid_actions):
-            # Check abort
-            if abort_check and abort_check():
-                return None
 
+        if self.persistent_tt:
+            self.tt.new_search()
+        else:
+            self.tt.clear()
+        self.nodes = 0
+        self._abort_check = abort_check
+        self._deadline = None
+        self._pv = []
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history //= 2  # Age quiet-move statistics of earlier moves
+        start_time = time.time()
+
+        best_action = None
+        for depth in range(1, self.depth + 1):
+            try:
+                action, score = self._search_root(canonical_board, valid_actions, depth, progress_callback)
+            except SearchAborted:
+                if abort_check and abort_check():
+                    return None
+                break  # Out of time: keep the deepest completed result
+
+            best_action = action
+            self._pv = self._principal_variation(canonical_board, depth)
+            elapsed = time.time() - start_time
+            if depth_callback:
+                depth_callback({
+                    'depth': depth,
+                    'score': score,
+                    'pv': self._pv,
+                    'nodes': self.nodes,
+                    'elapsed': elapsed,
+                })
+
+            if abs(score) >= WIN_SCORE:
+                break  # Forced result: deeper search cannot improve on it
+            if self.time_limit:
+                # The next depth takes several times longer than this one;
+                # don't start it unless it has a fair chance to finish
+                if elapsed > self.time_limit / 2:
+                    break
+                self._deadline = start_time + self.time_limit
+
+        return best_action
+
+    def _search_root(self, canonical_board, valid_actions, depth, progress_callback=None):
+        """Search every root move to `depth`; returns (best action, score)."""
+        key = self.hasher.hash(canonical_board)
+        static = evaluate_board(canonical_board)
+        self._follow_pv = True
+        actions = self._order_moves(canonical_board, valid_actions, self.tt.probe(key), 0)
+
+        best_action = actions[0]
+        best_score = -float('inf')
+        total_moves = len(actions)
+        for i, action in enumerate(actions):
             # Report progress
             if progress_callback:
                 progress_callback(i, total_moves)
-                
-            next_board, next_player = self.game.get_next_state(canonical_board, 1, action)
-            next_canonical = self.game.get_canonical_form(next_board, next_player)
-            
-            # Opponent's turn -> minimize their score -> negate
-            score = -self._minimax(next_canonical, self.depth - 1, -float('inf'), float('inf'), False, abort_check)
-            
-            if abort_check and abort_check():
-                return None
-            
+
+            next_canonical = self._child(canonical_board, action)
+            # Opponent's turn -> their best score is our worst -> negate
+            child_static = -(static + move_delta(canonical_board, action))
+            score = -self._negamax(next_canonical, depth - 1, -float('inf'), -best_score, 1, child_static)
+            self._follow_pv = False  # Only the first line follows the old PV
+
             if score > best_score:
                 best_score = score
                 best_action = action
-                
-        return best_action
+
+        self.tt.store(key, depth, EXACT, best_score, int(best_action))
+        return best_action, best_score
+
+    def _principal_variation(self, canonical_board, depth):
+        """Follow best moves through the transposition table (at most `depth`)."""
+        pv = []
+        seen = set()
+        board = canonical_board
+        for _ in range(depth):
+            key = self.hasher.hash(board)
+            entry = self.tt.probe(key)
+            if entry is None or entry[3] is None or key in seen:
+                break
+            (x1, y1), (x2, y2) = self.game.decode_move(entry[3])
+            if board[y1][x1] <= 0 or board[y2][x2] > 0:
+                break  # Stale entry (index collision)
+            pv.append(entry[3])
+            seen.add(key)
+            board = self._child(board, entry[3])
+        return pv
+
+    def _child(self, canonical_board, action):
+        """Canonical board after `action`, from the opponent's point of view."""
+        next_board, next_player = self.game.get_next_state(canonical_board, 1, action)
+        return self.game.get_canonical_form(next_board, next_player)
+
+    def _order_moves(self, canonical_board, actions, entry, ply):
+        """
+        Sort moves so alpha-beta cuts off early: the previous iteration's PV
+        move (while still on the PV), the transposition table move, captures
+        by MVV-LVA, this ply's killer moves, then quiet moves by history.
+        """
+        keys = self._history[actions].copy()
+
+        captures = self._capture_keys(canonical_board, actions)
+        keys[captures > 0] = captures[captures > 0]
+
+        killers = self._killers[min(ply, MAX_PLY - 1)]
+        for slot, killer in enumerate(killers):
+            if killer is not None:
+                keys[(actions == killer) & (captures == 0)] = KILLER_ORDER[slot]
+
+        if entry is not None and entry[3] is not None:
+            keys[actions == entry[3]] = TT_ORDER
+        if self._follow_pv:
+            if ply < len(self._pv) and self._pv[ply] in actions:
+                keys[actions == self._pv[ply]] = PV_ORDER
+            else:
+                self._follow_pv = False
+
+        return actions[np.argsort(-keys, kind='stable')]
+
+    @staticmethod
+    def _capture_keys(canonical_board, actions):
+        """MVV-LVA ordering key per action (0 for non-captures)."""
+        squares = canonical_board.ravel()
+        victims = -squares[actions % 90]       # Enemy pieces are negative
+        attackers = squares[actions // 90]
+        keys = CAPTURE_ORDER + _VALUES[np.maximum(victims, 0)] * 1024 - _VALUES[attackers]
+        return np.where(victims > 0, keys, 0)
+
+    def _record_cutoff(self, canonical_board, action, depth, ply):
+        """Remember a quiet move that caused a beta cutoff (killer + history)."""
+        end = action % 90
+        if canonical_board.flat[end] < 0:
+            return  # Captures are already ordered by MVV-LVA
+        killers = self._killers[min(ply, MAX_PLY - 1)]
+        if killers[0] != action:
+            killers[1] = killers[0]
+            killers[0] = action
+        self._history[action] += depth * depth
     
-    def _minimax(self, canonical_board, depth, alpha, beta, maximizing, abort_check=None):
+    def _check_stop(self):
+        """Raise SearchAborted on abort or past the deadline."""
+        # For responsiveness, check every node (cheap next to move generation).
+        if self._abort_check and self._abort_check():
+            raise SearchAborted()
+        if self._deadline and time.time() > self._deadline:
+            raise SearchAborted()
+
+    def _negamax(self, canonical_board, depth, alpha, beta, ply, static):
         """
-        Recursive Minimax with Alpha-Beta Pruning.
+        Recursive Negamax with Alpha-Beta Pruning.
+
+        Scores are from the point of view of the side to move (positive in
+        the canonical board); each child's score is negated. `static` is
+        evaluate_board(canonical_board), updated incrementally per move
+        (flipping to the opponent's canonical view negates it).
         """
-        # Periodic abort check (every node might be too expensive, but depth isn't huge here)
-        # For responsiveness, check every node or check based on some counter.
-        # Since we are in python, check every node is safest for immediate stop.
-        if abort_check and abort_check():
-            return 0 # Return dummy value, will be discarded up stack
-
-        # Check terminal state
-        r = self.game.get_game_ended(canonical_board, 1)
-        if r != 0:
-            return r * 10000  # Large value for win/loss
-        
-        if depth == 0:
-            return self._quiescence(canonical_board, alpha, beta)
-        
+        self.nodes += 1
+        self._check_stop()
+
+        # Check terminal state (same rules as game.get_game_ended, but the
+        # move list is generated once and reused below)
+        if not np.any(canonical_board == KING):
+            return -WIN_SCORE
+        if not np.any(canonical_board == -KING):
+            return WIN_SCORE
+
+        key = self.hasher.hash(canonical_board)
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, tt_score, _ = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return tt_score
+                if flag == LOWER:
+                    alpha = max(alpha, tt_score)
+                elif flag == UPPER:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_score
+        alpha_orig = alpha
+
         valids = self.game.get_valid_moves(canonical_board, 1)
         valid_actions = np.where(valids == 1)[0]
-        
         if len(valid_actions) == 0:
-            return 0  # Draw
-        
-        # Node ordering optimization could go here (e.g. captures first)
-        
-        if maximizing:
-            max_eval = -float('inf')
-            for action in valid_actions:
-                next_board, next_player = self.game.get_next_state(canonical_board, 1, action)
-                next_canonical = self.game.get_canonical_form(next_board, next_player)
-                
-                eval_score = -self._minimax(next_canonical, depth - 1, -beta, -alpha, True, abort_check)
-                if abort_check and abort_check(): return 0
+            return -WIN_SCORE  # Checkmate or stalemate: loss in Xiangqi
 
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for action in valid_actions:
-                next_board, next_player = self.game.get_next_state(canonical_board, 1, action)
-                next_canonical = self.game.get_canonical_form(next_board, next_player)
-                
-                eval_score = -self._minimax(next_canonical, depth - 1, -beta, -alpha, False, abort_check)
-                if abort_check and abort_check(): return 0
+        if depth == 0:
+            # Leaves are cached too: transpositions mostly meet at the horizon
+            score = self._quiescence(canonical_board, alpha, beta, static, valid_actions)
+            self.tt.store(key, 0, self._bound(score, alpha_orig, beta), score, None)
+            return score
 
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            return min_eval
+        best_score = -float('inf')
+        best_action = None
+        for action in self._order_moves(canonical_board, valid_actions, entry, ply):
+            next_canonical = self._child(canonical_board, action)
+            child_static = -(static + move_delta(canonical_board, action))
+            score = -self._negamax(next_canonical, depth - 1, -beta, -alpha, ply + 1, child_static)
+            self._follow_pv = False
 
-    def _quiescence(self, canonical_board, alpha, beta):
+            if score > best_score:
+                best_score = score
+                best_action = int(action)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._record_cutoff(canonical_board, int(action), depth, ply)
+                break
+
+        flag = self._bound(best_score, alpha_orig, beta)
+        if flag == UPPER:
+            best_action = None  # No move proved best; keep any earlier one
+        self.tt.store(key, depth, flag, best_score, best_action)
+        return best_score
+
+    @staticmethod
+    def _bound(score, alpha, beta):
+        """Bound type of a score searched with window (alpha, beta)."""
+        if score <= alpha:
+            return UPPER
+        if score >= beta:
+            return LOWER
+        return EXACT
+
+    def _quiescence(self, canonical_board, alpha, beta, static, valid_actions=None):
         """
         Quiescence Search:
         Search only captures to avoid the horizon effect.
+
+        `valid_actions` may be passed when the caller already generated them.
         """
+        if valid_actions is None:
+            # Capture node (the horizon node, entered from _negamax with its
+            # moves, was already counted and checked there)
+            self.nodes += 1
+            self._check_stop()
+
         # 1. Stand Pat (Evaluate current position)
-        stand_pat = evaluate_board(canonical_board)
+        stand_pat = static
         
         if stand_pat >= beta:
             return beta
@@ -151,31 +329,28 @@ class MinimaxSolver:
             
         # 2. Generate Captures ONLY
         # Get all valid moves
-        valids = self.game.get_valid_moves(canonical_board, 1)
-        valid_actions = np.where(valids == 1)[0]
+        if valid_actions is None:
+            valids = self.game.get_valid_moves(canonical_board, 1)
+            valid_actions = np.where(valids == 1)[0]
         
-        capture_actions = []
-        for action in valid_actions:
-            # Check if move is a capture
-            # Need to decode move to see target square
-            move = self.game.decode_move(action)
-            start, end = move
-            # In canonical form, player is 1 (Positive), Enemy is -1 (Negative)
-            # board[y][x] < 0 implies capture
-            if canonical_board[end[1]][end[0]] < 0:
-                capture_actions.append(action)
+        # In canonical form, player is 1 (Positive), Enemy is -1 (Negative),
+        # so a negative target square implies capture
+        keys = self._capture_keys(canonical_board, valid_actions)
+        capture_actions = valid_actions[keys > 0]
                 
-        if not capture_actions:
+        if len(capture_actions) == 0:
             return stand_pat
             
-        # 3. Search Captures
+        # 3. Search Captures (most valuable victim, least valuable attacker first)
+        capture_actions = capture_actions[np.argsort(-keys[keys > 0], kind='stable')]
         for action in capture_actions:
             next_board, next_player = self.game.get_next_state(canonical_board, 1, action)
             next_canonical = self.game.get_canonical_form(next_board, next_player)
             
             # Recursively call QS
             # Negamax logic: -quiescence(...)
-            score = -self._quiescence(next_canonical, -beta, -alpha)
+            child_static = -(static + move_delta(canonical_board, action))
+            score = -self._quiescence(next_canonical, -beta, -alpha, child_static)
             
             if score >= beta:
                 return beta
@@ -0,0 +1,84 @@
+"""
+Transposition Table.
+
+Zobrist hashing of canonical boards and a fixed-size, hash-indexed table
+of search results (depth, bound type, score, best move) used by the
+Minimax solver for cutoffs and move ordering.
+"""
+import numpy as np
+
+# Bound types of a stored score
+EXACT = 0   # Score is exact (searched with an open window)
+LOWER = 1   # Fail-high: true score >= stored score
+UPPER = 2   # Fail-low: true score <= stored score
+
+
+class ZobristHasher:
+    """
+    64-bit Zobrist keys for canonical boards.
+
+    Canonical boards always have the side to move positive, so the key
+    needs no side-to-move component.
+    """
+
+    def __init__(self, seed: int = 20240101):
+        rng = np.random.default_rng(seed)
+        # Row = piece + 7 (pieces are -7..7), column = square y * 9 + x
+        self.keys = rng.integers(0, 2 ** 63, size=(15, 90), dtype=np.uint64)
+        self.keys[7] = 0  # Empty squares contribute nothing
+        self._squares = np.arange(90)
+
+    def hash(self, board) -> int:
+        pieces = np.asarray(board, dtype=np.int64).ravel() + 7
+        return int(np.bitwise_xor.reduce(self.keys[pieces, self._squares]))
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results indexed by the low bits of the key.
+
+    Each slot holds one entry (key, depth, flag, score, move, generation).
+    Replacement is depth-preferred with aging: a slot is overwritten when
+    it is empty, holds the same position, was written in an earlier search
+    (generation), or holds a result searched no deeper than the new one.
+    """
+
+    def __init__(self, size_bits: int = 18):
+        """
+        Args:
+            size_bits: Table has 2**size_bits slots
+        """
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        self._slots = [None] * self.size
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Age existing entries so the next search may replace them first."""
+        self.generation += 1
+
+    def probe(self, key: int):
+        """Return (depth, flag, score, move) for `key`, or None."""
+        entry = self._slots[key & self.mask]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1:5]
+
+    def store(self, key: int, depth: int, flag: int, score: float, move):
+        index = key & self.mask
+        entry = self._slots[index]
+        if (entry is None or entry[0] == key or entry[5] != self.generation
+                or depth >= entry[1]):
+            if move is None and entry is not None and entry[0] == key:
+                move = entry[4]  # Keep the known best move for ordering
+            self._slots[index] = (key, depth, flag, score, move, self.generation)
+            self.stores += 1
+
+    def __len__(self):
+        return sum(entry is not None for entry in self._slots)
@@ -1 +1,2 @@
 from .manager import HistoryManager
+from .buffer import BufferedHistory
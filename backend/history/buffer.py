@@ -0,0 +1,90 @@
+import asyncio
+import atexit
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedHistory:
+    """
+    In-memory view of the most recent games of one mode, written behind.
+
+    add() updates a bounded deque of recent results immediately and queues
+    the record; queued records are flushed to the HistoryManager in one
+    batch once `flush_size` accumulate or `flush_interval` seconds after
+    the first one, on a worker thread so the event loop never waits on
+    disk. Reads are served from memory.
+    """
+
+    def __init__(self, manager, mode="training", maxlen=50, flush_size=64, flush_interval=1.0):
+        self.manager = manager
+        self.mode = mode
+        self.maxlen = maxlen
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._recent = None       # Newest first; loaded from disk on first use
+        self._pending = []
+        self._lock = threading.Lock()        # Guards _pending (held briefly)
+        self._write_lock = threading.Lock()  # Keeps batches in order on disk
+        self._flush_task = None
+        atexit.register(self.flush)
+
+    def recent(self):
+        """Most recent results, newest first."""
+        if self._recent is None:
+            self._recent = deque(self.manager.get_recent_history(mode=self.mode, limit=self.maxlen),
+                                 maxlen=self.maxlen)
+        return list(self._recent)
+
+    def add(self, item):
+        """Record a finished game: visible at once, persisted in the next batch."""
+        self.recent()
+        self._recent.appendleft(item)
+        with self._lock:
+            self._pending.append(item)
+            full = len(self._pending) >= self.flush_size
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # No event loop (scripts, tests): write through
+            return
+        if full:
+            loop.create_task(asyncio.to_thread(self.flush))
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        """Write queued records to disk (blocking)."""
+        with self._write_lock:
+            with self._lock:
+                items, self._pending = self._pending, []
+            if not items:
+                return
+            try:
+                self.manager.save_games(items, mode=self.mode)
+            except Exception as e:
+                logger.error(f"Failed to save {len(items)} {self.mode} games: {e}")
+
+    def clear(self, delete=None):
+        """
+        Drop queued and cached results (blocking).
+
+        Waits for a flush already writing, so it cannot bring old games
+        back; `delete` (e.g. removing the history file) runs while writes
+        are still held off, and the manager's cached reads of the mode are
+        dropped after it.
+        """
+        with self._write_lock:
+            with self._lock:
+                self._pending = []
+            self._recent = deque(maxlen=self.maxlen)
+            if delete is not None:
+                delete()
+            self.manager.invalidate(self.mode)
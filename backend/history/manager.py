@@ -16,8 +16,36 @@ class HistoryManager:
         self.storage.append_game(game_data, mode)
         logger.info(f"Saved {mode} game {game_data.get('id', 'unknown')}")
         
-    def get_recent_history(self, mode="training", limit=50):
+    def save_games(self, games, mode="training"):
         """
-        Get recent games for a specific mode.
+        Save several completed game records with one write.
         """
+        self.storage.append_games(games, mode)
+        logger.info(f"Saved {len(games)} {mode} games")
+
+    def get_recent_history(self, mode="training", limit=50, offset=0):
+        """
+        Get recent games for a specific mode, newest first.
+        offset skips that many of the newest games (for pagination).
+        """
+        if offset:
+            return self.storage.load_games(mode, offset, limit)
         return self.storage.load_recent_games(mode, limit)
+
+    def count_games(self, mode="training"):
+        """
+        Total number of stored games for a mode.
+        """
+        return self.storage.count_games(mode)
+
+    def reset(self, mode="training"):
+        """
+        Delete all stored games for a mode. Returns whether there were any.
+        """
+        return self.storage.reset(mode)
+
+    def invalidate(self, mode="training"):
+        """
+        Drop cached reads for a mode (after its file was changed elsewhere).
+        """
+        self.storage.invalidate(mode)
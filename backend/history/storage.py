@@ -1,40 +1,230 @@
 import json
 import os
-import time
+from array import array
+from collections import deque
+
+import numpy as np
+
+# Bytes read per step when scanning a history file
+READ_BLOCK = 64 * 1024
+# Leading bytes remembered to recognise a file that was deleted and rewritten
+HEAD_BYTES = 256
+
 
 class HistoryStorage:
-    def __init__(self, base_dir="data/history"):
+    """
+    Append-only JSONL game history, one file per mode.
+
+    Reads never load a whole file: recent games come from an in-memory
+    ring of the last `cache_size` records (filled by a backwards tail read
+    and kept current on append), and paginated queries seek through an
+    index of line offsets built once and extended incrementally. Changes
+    made by other writers are picked up by comparing the file size with
+    the size already read; a file that was truncated or replaced (a
+    different inode, or different leading bytes since inode numbers are
+    reused) is read again from scratch.
+    """
+
+    def __init__(self, base_dir="data/history", cache_size=200):
         self.base_dir = base_dir
+        self.cache_size = cache_size
+        self._states = {}  # mode -> {'size', 'file', 'head', 'recent', 'offsets'}
         if not os.path.exists(base_dir):
             os.makedirs(base_dir)
-            
+
     def _get_filename(self, mode):
         # Organize by mode (training, pvp, pve)
         return os.path.join(self.base_dir, f"{mode}_games.jsonl")
 
     def append_game(self, game_record, mode="training"):
+        self.append_games([game_record], mode)
+
+    def append_games(self, game_records, mode="training"):
+        """Append several records with a single write."""
+        if not game_records:
+            return
+        filename = self._get_filename(mode)
+        data = "".join(json.dumps(record) + "\n" for record in game_records).encode("utf-8")
+        with open(filename, "ab") as f:
+            start = f.tell()
+            f.write(data)
+
+        state = self._states.get(mode)
+        if state is not None and state['size'] == start:
+            # We were up to date: extend the ring and index without re-reading
+            state['recent'].extend(game_records)
+            if state['offsets'] is not None:
+                state['offsets'].extend(self._line_starts(data, start))
+            state['head'] = (state['head'] + data)[:HEAD_BYTES]
+            state['size'] = start + len(data)
+
+    def reset(self, mode="training"):
+        """Delete the history of `mode` and its cached state; True if a file was removed."""
+        self.invalidate(mode)
         filename = self._get_filename(mode)
-        with open(filename, "a", encoding="utf-8") as f:
-            f.write(json.dumps(game_record) + "\n")
-            
+        if not os.path.exists(filename):
+            return False
+        os.remove(filename)
+        return True
+
+    def invalidate(self, mode="training"):
+        """Forget the cached state of `mode`; the next read starts from the file."""
+        self._states.pop(mode, None)
+
     def load_recent_games(self, mode="training", limit=50):
+        """Return the last `limit` games, newest first."""
+        return self.load_games(mode, offset=0, limit=limit)
+
+    def load_games(self, mode="training", offset=0, limit=50):
+        """Return `limit` games starting `offset` games back from the newest."""
         filename = self._get_filename(mode)
         if not os.path.exists(filename):
             return []
-            
-        # Efficiently read last N lines? 
-        # For simplicity in this demo, read all and slice. 
-        # Production would use seek() or a DB.
-        games = []
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                # Parse last 'limit' lines in reverse order
-                for line in reversed(lines[-limit:]):
-                    try:
-                        games.append(json.loads(line))
-                    except: pass
+            state = self._sync(mode, filename)
+            recent = state['recent']
+            if offset + limit <= len(recent):
+                end = len(recent) - offset
+                return [recent[i] for i in range(end - 1, end - 1 - limit, -1)]
+            if offset == 0:
+                return self._parse(self._tail_lines(filename, state['size'], limit))[::-1]
+            return self._read_page(filename, state, offset, limit)
         except Exception as e:
             print(f"Error loading history: {e}")
-            
+            return []
+
+    def count_games(self, mode="training"):
+        """Number of stored games (builds the offset index on first use)."""
+        filename = self._get_filename(mode)
+        if not os.path.exists(filename):
+            return 0
+        state = self._sync(mode, filename)
+        self._build_offsets(filename, state)
+        return len(state['offsets'])
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _sync(self, mode, filename):
+        """Bring the cached state of `mode` up to date with the file."""
+        stat = os.stat(filename)
+        size = stat.st_size
+        state = self._states.get(mode)
+        if state is None or size < state['size'] or not self._same_file(filename, stat, state):
+            # First use, or the file was truncated/replaced: tail-read the ring
+            end = self._complete_end(filename, size)
+            state = {
+                'size': end,
+                'file': (stat.st_dev, stat.st_ino),
+                'head': self._read_head(filename, end),
+                'recent': deque(self._parse(self._tail_lines(filename, end, self.cache_size)),
+                                maxlen=self.cache_size),
+                'offsets': None,
+            }
+            self._states[mode] = state
+        elif size > state['size']:
+            # Appended by another writer: read only the new complete lines
+            with open(filename, "rb") as f:
+                f.seek(state['size'])
+                data = f.read(size - state['size'])
+            data = data[:data.rfind(b"\n") + 1]
+            if state['offsets'] is not None:
+                state['offsets'].extend(self._line_starts(data, state['size']))
+            state['recent'].extend(self._parse(data.splitlines()))
+            state['head'] = (state['head'] + data)[:HEAD_BYTES]
+            state['size'] += len(data)
+        return state
+
+    @staticmethod
+    def _read_head(filename, end):
+        with open(filename, "rb") as f:
+            return f.read(min(end, HEAD_BYTES))
+
+    def _same_file(self, filename, stat, state):
+        """Whether `filename` is still the file `state` was read from."""
+        if (stat.st_dev, stat.st_ino) != state['file']:
+            return False
+        head = state['head']
+        return not head or self._read_head(filename, len(head)) == head
+
+    @staticmethod
+    def _complete_end(filename, size):
+        """Offset just past the last newline (ignores a line being written)."""
+        with open(filename, "rb") as f:
+            pos = size
+            while pos > 0:
+                step = min(READ_BLOCK, pos)
+                f.seek(pos - step)
+                block = f.read(step)
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    return pos - step + newline + 1
+                pos -= step
+        return 0
+
+    @staticmethod
+    def _tail_lines(filename, end, n):
+        """Read the last `n` lines before byte `end` with backwards block reads."""
+        if n <= 0 or end <= 0:
+            return []
+        data = b""
+        with open(filename, "rb") as f:
+            pos = end
+            # n lines need n + 1 newlines before them (or the start of the file)
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(READ_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if pos > 0:
+            lines = lines[1:]  # Partial first line
+        return lines[-n:]
+
+    @staticmethod
+    def _line_starts(data, base):
+        """Offsets of the lines in `data` (complete lines starting at file offset `base`)."""
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+        return (base + np.concatenate([[0], newlines[:-1] + 1])).tolist() if len(newlines) else []
+
+    def _build_offsets(self, filename, state):
+        """Index the start offset of every line (once; appends extend it)."""
+        if state['offsets'] is not None:
+            return
+        offsets = array('q')
+        with open(filename, "rb") as f:
+            pos = 0
+            while pos < state['size']:
+                data = f.read(min(READ_BLOCK * 16, state['size'] - pos))
+                data = data[:data.rfind(b"\n") + 1]
+                if not data:
+                    break
+                offsets.extend(self._line_starts(data, pos))
+                pos += len(data)
+                f.seek(pos)
+        state['offsets'] = offsets
+
+    def _read_page(self, filename, state, offset, limit):
+        """Read games offset..offset+limit back from the newest via the offset index."""
+        self._build_offsets(filename, state)
+        offsets = state['offsets']
+        last = len(offsets) - 1 - offset
+        first = max(0, last - limit + 1)
+        if last < 0:
+            return []
+        end = offsets[last + 1] if last + 1 < len(offsets) else state['size']
+        with open(filename, "rb") as f:
+            f.seek(offsets[first])
+            data = f.read(end - offsets[first])
+        return self._parse(data.splitlines())[::-1]
+
+    @staticmethod
+    def _parse(lines):
+        games = []
+        for line in lines:
+            try:
+                games.append(json.loads(line))
+            except ValueError:
+                pass
         return games
@@ -26,16 +26,50 @@ class RLConfig:
     
     # Neural network training
     lr: float = 0.001
+    lr_schedule: str = 'constant'  # 'constant', 'step' or 'cosine' (stepped per iteration)
+    lr_step_iters: int = 100  # 'step': decay every N iterations
+    lr_gamma: float = 0.1  # 'step': decay factor
+    lr_min: float = 1e-5  # 'cosine': final learning rate
     epochs: int = 10
+    train_steps: Optional[int] = None  # Fixed gradient steps per iteration (instead of epochs)
+    target_sample_reuse: Optional[float] = None  # Steps so each new sample is seen ~N times
     batch_size: int = 512
+    mirror_augment: bool = False  # Randomly mirror sampled positions left-right
+    loader_workers: int = 0  # DataLoader processes collating batches ahead of training
+    
+    # Replay buffer
+    replay_capacity: int = 200000  # Max examples kept (sample-count window)
+    replay_window_iters: Optional[int] = None  # Keep only the last N iterations
+    replay_recency_bias: float = 0.0  # 0 = uniform sampling, >0 favors recent examples
+    replay_dedup: bool = False  # Merge examples of identical positions
+    replay_dedup_weight: float = 0.5  # Sampling weight = merge count ** this
+    replay_dir: Optional[str] = None  # Memory-mapped on-disk shards instead of RAM
     
     # Parallel training
     num_workers: int = 4
+    lockstep_games: int = 8  # Games batched together by the lockstep backend
+    batch_policy: str = 'fixed'  # 'fixed', 'latency' or 'throughput'
+    latency_target_ms: float = 10.0  # Per-request target for 'latency' batching
+    inference_replicas: int = 1  # CPU model replicas in the prediction server
+    intra_op_threads: int = 0  # Torch threads for inference (0 = cores / replicas)
+    
+    # Asynchronous actor/learner mode
+    steps_per_iter: int = 100  # Learner steps per iteration (checkpoint interval)
+    publish_interval: int = 10  # Push weights to actors every K learner steps
+    max_sample_reuse: float = 4.0  # Max trained samples per generated sample
+    min_replay_size: int = 512  # Samples required before the learner starts
+    
+    # Evaluation
+    eval_interval: int = 10  # Play Minimax every N iterations (0 = never)
+    eval_games: int = 10
+    eval_depth: int = 2  # Minimax opponent search depth
     
     # Paths
     checkpoint_dir: str = './checkpoints'
     data_dir: str = './data'
     evolution_log_dir: str = './data/evolution'
+    evolution_log_compress: bool = True  # zlib-compress game log blocks
+    metrics_dir: str = './data/metrics'
     
     # Hardware
     cuda: bool = field(default_factory=lambda: torch.cuda.is_available())
@@ -52,10 +86,39 @@ class RLConfig:
             'cpuct': self.cpuct,
             'tempThreshold': self.temp_threshold,
             'lr': self.lr,
+            'lr_schedule': self.lr_schedule,
+            'lr_step_iters': self.lr_step_iters,
+            'lr_gamma': self.lr_gamma,
+            'lr_min': self.lr_min,
             'epochs': self.epochs,
+            'train_steps': self.train_steps,
+            'target_sample_reuse': self.target_sample_reuse,
             'batch_size': self.batch_size,
+            'mirror_augment': self.mirror_augment,
+            'loader_workers': self.loader_workers,
+            'maxlenOfQueue': self.replay_capacity,
+            'replay_window_iters': self.replay_window_iters,
+            'replay_recency_bias': self.replay_recency_bias,
+            'replay_dedup': self.replay_dedup,
+            'replay_dedup_weight': self.replay_dedup_weight,
+            'replay_dir': self.replay_dir,
             'num_workers': self.num_workers,
+            'lockstep_games': self.lockstep_games,
+            'batch_policy': self.batch_policy,
+            'latency_target_ms': self.latency_target_ms,
+            'inference_replicas': self.inference_replicas,
+            'intra_op_threads': self.intra_op_threads,
+            'steps_per_iter': self.steps_per_iter,
+            'publish_interval': self.publish_interval,
+            'max_sample_reuse': self.max_sample_reuse,
+            'min_replay_size': self.min_replay_size,
+            'eval_interval': self.eval_interval,
+            'eval_games': self.eval_games,
+            'eval_depth': self.eval_depth,
             'checkpoint': self.checkpoint_dir,
+            'evolution_log_dir': self.evolution_log_dir,
+            'evolution_log_compress': self.evolution_log_compress,
+            'metrics_dir': self.metrics_dir,
             'cuda': self.cuda,
         }
 
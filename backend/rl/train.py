@@ -1,11 +1,16 @@
 """
 Unified Training Entry Point for RL Module.
 
-Supports both single-machine (Coach) and parallel (ParallelTrainer) modes.
+All modes run the same Trainer core with a different self-play backend:
+single (sequential games, Coach), lockstep (batched games in threads),
+parallel (worker processes, ParallelTrainer) and async (parallel workers
+with an actor/learner loop).
 
 Usage:
     python -m rl.train --mode single
+    python -m rl.train --mode lockstep --lockstep-games 16
     python -m rl.train --mode parallel --workers 4
+    python -m rl.train --mode async --workers 8 --publish-interval 20
 """
 import sys
 import argparse
@@ -15,15 +20,21 @@ from game import XiangqiGame
 from .models.xiangqi_net import XiangqiNet
 from .training.coach import Coach
 from .training.parallel_trainer import ParallelTrainer
+from .training.trainer import Trainer
+from .training.backends import LockstepBackend
 from .utils.checkpoint import get_latest_checkpoint, load_checkpoint
 from .config import RLConfig
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Xiangqi AlphaZero Training')
-    parser.add_argument('--mode', type=str, choices=['single', 'parallel'], default='single',
-                        help='Training mode: single or parallel')
+    parser.add_argument('--mode', type=str, choices=['single', 'lockstep', 'parallel', 'async'], default='single',
+                        help='Training mode: single, lockstep, parallel or async')
     parser.add_argument('--workers', type=int, default=4,
                         help='Number of workers for parallel training')
+    parser.add_argument('--lockstep-games', type=int, default=8,
+                        help='Games played together in lockstep mode')
+    parser.add_argument('--eval-interval', type=int, default=10,
+                        help='Evaluate against Minimax every N iterations (0 = never)')
     parser.add_argument('--checkpoint', type=str, default='./checkpoints',
                         help='Checkpoint directory')
     parser.add_argument('--max-steps', type=int, default=200,
@@ -32,6 +43,38 @@ def parse_args():
                         help='Number of MCTS simulations per move')
     parser.add_argument('--num-episodes', type=int, default=10,
                         help='Number of self-play games per iteration')
+    parser.add_argument('--batch-policy', type=str, choices=['fixed', 'latency', 'throughput'], default='fixed',
+                        help='Prediction server batching policy (parallel mode)')
+    parser.add_argument('--latency-target-ms', type=float, default=10.0,
+                        help='Per-request latency target for the latency batching policy')
+    parser.add_argument('--inference-replicas', type=int, default=1,
+                        help='CPU model replicas in the prediction server (parallel mode)')
+    parser.add_argument('--intra-op-threads', type=int, default=0,
+                        help='Torch intra-op threads for inference (0 = cores / replicas)')
+    parser.add_argument('--train-steps', type=int, default=None,
+                        help='Fixed gradient steps per iteration instead of full epochs')
+    parser.add_argument('--target-sample-reuse', type=float, default=None,
+                        help='Gradient steps per iteration so each new sample is trained on ~N times')
+    parser.add_argument('--lr-schedule', type=str, choices=['constant', 'step', 'cosine'], default='constant',
+                        help='Learning-rate schedule, stepped once per iteration')
+    parser.add_argument('--steps-per-iter', type=int, default=100,
+                        help='Learner steps per iteration (async mode)')
+    parser.add_argument('--publish-interval', type=int, default=10,
+                        help='Publish weights to actors every K learner steps (async mode)')
+    parser.add_argument('--max-sample-reuse', type=float, default=4.0,
+                        help='Max trained samples per generated sample (async mode)')
+    parser.add_argument('--replay-window-iters', type=int, default=None,
+                        help='Train only on examples from the last N iterations')
+    parser.add_argument('--replay-recency-bias', type=float, default=0.0,
+                        help='Replay sampling bias towards recent examples (0 = uniform)')
+    parser.add_argument('--mirror-augment', action='store_true',
+                        help='Randomly mirror sampled training positions left-right')
+    parser.add_argument('--loader-workers', type=int, default=0,
+                        help='DataLoader worker processes prefetching training batches')
+    parser.add_argument('--replay-dedup', action='store_true',
+                        help='Merge replay examples of identical positions (averaged targets)')
+    parser.add_argument('--replay-dir', type=str, default=None,
+                        help='Keep the replay window in memory-mapped shards under this directory')
     parser.add_argument('--no-cuda', action='store_true', help='Disable CUDA')
     return parser.parse_args()
 
@@ -48,52 +91,73 @@ def main():
         'tempThreshold': 15,
         'updateThreshold': 0.6,
         'maxlenOfQueue': 200000,
+        'replay_window_iters': args.replay_window_iters,
+        'replay_recency_bias': args.replay_recency_bias,
+        'replay_dedup': args.replay_dedup,
+        'replay_dir': args.replay_dir,
         'num_mcts_sims': args.num_mcts_sims,
         'max_steps': args.max_steps,
         'cpuct': 1.0,
         'checkpoint': args.checkpoint,
+        'metrics_dir': './data/metrics',
+        'evolution_log_dir': './data/evolution',
         'lr': 0.001,
+        'lr_schedule': args.lr_schedule,
+        'lr_step_iters': 100,
+        'lr_gamma': 0.1,
+        'lr_min': 1e-5,
         'dropout': 0.3,
         'epochs': 10,
+        'train_steps': args.train_steps,
+        'target_sample_reuse': args.target_sample_reuse,
         'batch_size': 512,
+        'mirror_augment': args.mirror_augment,
+        'loader_workers': args.loader_workers,
         'cuda': not args.no_cuda and torch.cuda.is_available(),
         'num_channels': 512,
-        'num_workers': args.workers
+        'num_workers': args.workers,
+        'lockstep_games': args.lockstep_games,
+        'eval_interval': args.eval_interval,
+        'batch_policy': args.batch_policy,
+        'latency_target_ms': args.latency_target_ms,
+        'inference_replicas': args.inference_replicas,
+        'intra_op_threads': args.intra_op_threads,
+        'steps_per_iter': args.steps_per_iter,
+        'publish_interval': args.publish_interval,
+        'max_sample_reuse': args.max_sample_reuse,
+        'min_replay_size': 512
     }
     
     # Initialize Game and Model
-    # Note: Game is stateless logic mostly, but Coach needs an instance
-    # ParallelTrainer might instantiate its own games in workers
     game = XiangqiGame() 
     nnet = XiangqiNet()
     
     if config['cuda']:
         nnet.cuda()
     
-    # Resume Logic
+    print(f"=== Starting Training in [{args.mode.upper()}] mode ===")
+    
+    if args.mode == 'single':
+        trainer = Coach(game, nnet, config)
+    elif args.mode == 'lockstep':
+        trainer = Trainer(XiangqiGame, nnet, config, LockstepBackend(XiangqiGame, nnet, config))
+    else:
+        # ParallelTrainer takes the Game class (instantiated inside workers)
+        trainer = ParallelTrainer(XiangqiGame, nnet, config)
+    
+    # Resume Logic (model, optimizer and LR schedule)
     checkpoint_path, start_iter = get_latest_checkpoint(config['checkpoint'])
     if checkpoint_path:
         print(f"[Resume] Loading checkpoint: {checkpoint_path} (iteration {start_iter})")
-        start_iter = load_checkpoint(checkpoint_path, nnet)
+        start_iter = load_checkpoint(checkpoint_path, nnet, trainer.optimizer, trainer.scheduler)
     else:
         print("[Resume] No checkpoint found, starting from scratch.")
         start_iter = 0
-
-    print(f"=== Starting Training in [{args.mode.upper()}] mode ===")
+    trainer.start_iteration = start_iter + 1
     
-    if args.mode == 'single':
-        coach = Coach(game, nnet, config)
-        coach.start_iteration = start_iter + 1
-        coach.learn()
-        
-    elif args.mode == 'parallel':
-        # ParallelTrainer expects the Game Class, not instance (for pickling/spawning)
-        # But wait, our extracted ParallelTrainer code:
-        # trainer = ParallelTrainer(XiangqiGame, model, args)
-        # It takes the class.
-        
-        trainer = ParallelTrainer(XiangqiGame, nnet, config)
-        trainer.start_iteration = start_iter + 1
+    if args.mode == 'async':
+        trainer.learn_async()
+    else:
         trainer.learn()
 
 if __name__ == "__main__":
@@ -1,9 +1,17 @@
 """Training subpackage - Training utilities and trainers.
 
 Classes:
-    - Coach: Single-machine AlphaZero training loop
-    - ParallelTrainer: Multi-worker parallel training
+    - Trainer: AlphaZero training core over a pluggable self-play backend
+    - Coach: Trainer with sequential in-process self-play
+    - ParallelTrainer: Trainer with multi-worker self-play (sync or async)
+    - SequentialBackend, LockstepBackend, MultiprocessBackend: Self-play backends
+    - play_episode: The self-play game shared by all backends
     - XiangqiDataset: PyTorch dataset for training
-    - GameLogger: Game logging for evolution analysis
-    - BroadcastClient: Training update broadcaster
+    - ReplayBuffer: Bounded sliding-window replay buffer
+    - ShardReplayBuffer: Replay buffer over memory-mapped on-disk shards
+    - IterationTelemetry: Per-iteration phase timing and throughput
+    - GameLogger: Compact per-iteration game logs for evolution analysis
+    - GameIndex: Indexed, filterable store over logged games
+    - BroadcastClient: Training update broadcaster (non-blocking)
+    - TelemetryChannel: Batched, rate-limited background sender for dashboard updates
 """
@@ -0,0 +1,299 @@
+"""
+Self-Play Backends.
+
+A backend turns the current network into finished self-play games. The
+Trainer core owns everything else (replay buffer, optimizer, evaluation,
+checkpoints, metrics), so all backends are trained and measured the same
+way:
+
+    - SequentialBackend: one game at a time in the trainer process
+    - LockstepBackend: N games in threads of the trainer process, with
+      their leaf evaluations batched together each step
+    - MultiprocessBackend: worker processes + a prediction server; also
+      supports asynchronous actor/learner training
+"""
+import os
+import copy
+import queue
+import threading
+
+from ..workers.batching import make_batch_policy
+from ..workers.local_inference import LocalPredictor, LockstepPredictor
+from ..workers.pool import SelfPlayPool
+from ..workers.prediction_server import PredictionServer
+from .episode import play_episode
+
+
+class SelfPlayBackend:
+    """
+    Interface for self-play backends.
+
+    play() yields (examples, game_record) for each finished game. Backends
+    that set supports_async can also keep games running in the background
+    (submit() / poll()) while the trainer learns.
+    """
+
+    name = 'base'
+    supports_async = False
+    model_version = 0  # Version (iteration) of the weights self-play uses
+
+    def start(self):
+        """Acquire resources (processes, servers). Called before play()."""
+
+    def stop(self):
+        """Release resources. Safe to call more than once."""
+
+    def publish_weights(self, model, version):
+        """Make new weights visible to self-play."""
+        self.model_version = version
+
+    def play(self, iteration, num_games):
+        """
+        Play `num_games` games and yield them as they finish.
+
+        Args:
+            iteration: Training iteration the games belong to
+            num_games: Number of games to play
+
+        Yields:
+            Tuple of (EXAMPLE_DTYPE records, game_record)
+        """
+        raise NotImplementedError
+
+    def submit(self, iteration, num_games):
+        """Queue games to be played in the background (async backends)."""
+        raise NotImplementedError(f"{self.name} backend does not support async training")
+
+    def poll(self, timeout):
+        """Return the next finished (examples, game_record), or None on timeout."""
+        raise NotImplementedError(f"{self.name} backend does not support async training")
+
+    def report(self):
+        """Print and return a metrics summary for the last iteration (or None)."""
+        return None
+
+    def nn_evaluations(self) -> int:
+        """Network evaluations served so far (lifetime counter)."""
+        return 0
+
+
+class SequentialBackend(SelfPlayBackend):
+    """Plays games one after another on the trainer's own model."""
+
+    name = 'sequential'
+
+    def __init__(self, game_class, model, args, on_step=None):
+        """
+        Args:
+            game_class: Game class
+            model: The trainer's model (self-play always sees current weights)
+            args: Training configuration dict
+            on_step: Optional callable(board, step) for live board updates
+        """
+        self.game = game_class()
+        self.predictor = LocalPredictor(model)
+        self.args = args
+        self.on_step = on_step
+
+    def play(self, iteration, num_games):
+        for _ in range(num_games):
+            yield play_episode(self.game, self.predictor, self.args, iteration, self.on_step)
+
+    def nn_evaluations(self) -> int:
+        return self.predictor.requests
+
+
+class LockstepBackend(SelfPlayBackend):
+    """
+    Plays `lockstep_games` games at once in threads of the trainer process.
+
+    All games block on a shared LockstepPredictor, so each network call
+    evaluates one leaf from every running game in a single batch.
+    """
+
+    name = 'lockstep'
+
+    def __init__(self, game_class, model, args):
+        """
+        Args:
+            game_class: Game class (one instance per game thread)
+            model: The trainer's model (self-play always sees current weights)
+            args: Training configuration dict ('lockstep_games')
+        """
+        self.game_class = game_class
+        self.predictor = LockstepPredictor(model)
+        self.args = args
+        self.num_threads = args.get('lockstep_games', 8)
+
+    def _run_games(self, iteration, jobs, results):
+        game = self.game_class()
+        self.predictor.join()
+        try:
+            while True:
+                try:
+                    jobs.get_nowait()
+                except queue.Empty:
+                    return
+                results.put(play_episode(game, self.predictor, self.args, iteration))
+        except Exception as e:
+            results.put(e)  # Surface game errors in play() instead of hanging
+        finally:
+            self.predictor.leave()
+
+    def play(self, iteration, num_games):
+        jobs, results = queue.Queue(), queue.Queue()
+        for episode in range(num_games):
+            jobs.put(episode)
+        threads = [threading.Thread(target=self._run_games, args=(iteration, jobs, results), daemon=True)
+                   for _ in range(min(self.num_threads, num_games))]
+        batches, requests = self.predictor.batches, self.predictor.requests
+        for t in threads:
+            t.start()
+        for _ in range(num_games):
+            result = results.get()
+            if isinstance(result, Exception):
+                raise result
+            yield result
+        for t in threads:
+            t.join()
+        self._last = (self.predictor.batches - batches, self.predictor.requests - requests)
+
+    def report(self):
+        batches, requests = getattr(self, '_last', (0, 0))
+        if not batches:
+            return None
+        print(f"Inference (lock-step): {requests} requests in {batches} batches, "
+              f"batch mean={requests / batches:.1f}")
+        return {'requests': requests, 'batches': batches}
+
+    def nn_evaluations(self) -> int:
+        return self.predictor.requests
+
+
+class MultiprocessBackend(SelfPlayBackend):
+    """
+    Self-play worker processes fed by a long-lived prediction server.
+
+    The server serves its own copy of the model, so training can update
+    the trainer's model freely; new weights are pushed with
+    publish_weights().
+    """
+
+    name = 'multiprocess'
+    supports_async = True
+
+    def __init__(self, game_class, model, args, on_metrics=None):
+        """
+        Args:
+            game_class: Game class (instantiated inside the workers)
+            model: The trainer's model (copied for serving)
+            args: Training configuration dict
+            on_metrics: Optional callable(report) for prediction server metrics
+        """
+        self.game_class = game_class
+        self.model = model
+        self.args = args
+        self.on_metrics = on_metrics
+        self._served_before = 0  # Evaluations by servers already stopped
+        self.pred_server = None
+        self.worker_pool = None
+
+    def start(self):
+        """Start the prediction server and worker pool (once)."""
+        if self.pred_server is None:
+            num_workers = self.args['num_workers']
+            # Dynamic batch size: don't wait for more requests than we have workers!
+            effective_batch_size = min(32, num_workers)
+            served_model = copy.deepcopy(self.model)
+            served_model.eval()
+            self.pred_server = PredictionServer(
+                served_model, self.game_class(),
+                batch_size=effective_batch_size, timeout=0.05,
+                batch_policy=make_batch_policy(self.args, effective_batch_size),
+                num_replicas=self.args.get('inference_replicas', 1),
+                intra_op_threads=self.args.get('intra_op_threads', 0),
+                metrics_log=os.path.join(self.args.get('metrics_dir', 'data/metrics'), 'prediction_server.jsonl'),
+                on_metrics=self.on_metrics,
+                model_version=self.model_version
+            )
+            for i in range(num_workers):
+                self.pred_server.register_worker(i)
+            self.pred_server.start()
+        if self.worker_pool is None:
+            self.worker_pool = SelfPlayPool(self.game_class, self.args,
+                                            self.pred_server.request_queue, self.pred_server.response_queues)
+            self.worker_pool.start()
+
+    def stop(self):
+        """Stop the worker pool and prediction server if they are running."""
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+            self.worker_pool = None
+        if self.pred_server is not None:
+            self.pred_server.stop()
+            self._served_before += self.pred_server.metrics.total_requests
+            self.pred_server = None
+
+    def publish_weights(self, model, version):
+        """Push the current weights to the running prediction server."""
+        super().publish_weights(model, version)
+        if self.pred_server is not None:
+            self.pred_server.update_weights(model.state_dict(), version=version)
+
+    def play(self, iteration, num_games):
+        self.start()
+        self.worker_pool.submit(iteration, num_games)
+        for _ in range(num_games):
+            _, examples, record = self.worker_pool.get_result()
+            yield examples, record
+
+    def submit(self, iteration, num_games):
+        self.start()
+        self.worker_pool.submit(iteration, num_games)
+
+    def poll(self, timeout):
+        result = self.worker_pool.get_result(timeout=timeout)
+        if result is None:
+            return None
+        _, examples, record = result
+        return examples, record
+
+    def report(self):
+        if self.pred_server is None:
+            return None
+        report = self.pred_server.report_metrics()
+        if report['requests']:
+            batching = report['batching']
+            print(f"Inference (last {report['interval_s']:.0f}s): {report['requests']} requests, "
+                  f"batch mean={report['batch_size']['mean']:.1f}, "
+                  f"queue wait p50={report['queue_wait_ms']['p50']:.2f}ms, "
+                  f"inference p50={report['inference_ms']['p50']:.2f}ms "
+                  f"[{batching['mode']}, replicas={batching['replicas']}, model v{self.pred_server.model_version}]")
+        return report
+
+    def nn_evaluations(self) -> int:
+        served = self.pred_server.metrics.total_requests if self.pred_server is not None else 0
+        return self._served_before + served
+
+
+BACKENDS = {
+    'sequential': SequentialBackend,
+    'lockstep': LockstepBackend,
+    'multiprocess': MultiprocessBackend,
+}
+
+
+def make_backend(name, game_class, model, args, **kwargs):
+    """
+    Build a self-play backend by name.
+
+    Args:
+        name: 'sequential', 'lockstep' or 'multiprocess'
+        game_class: Game class
+        model: The trainer's model
+        args: Training configuration dict
+        **kwargs: Backend-specific options
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown self-play backend: {name}")
+    return BACKENDS[name](game_class, model, args, **kwargs)
@@ -2,35 +2,175 @@
 Broadcast Client for Training Updates.
 
 Sends training progress updates to the server for real-time visualization.
+
+Updates go through a per-process TelemetryChannel: callers only append to
+a bounded in-memory queue and a background thread ships batches to the
+server, so a slow or stopped dashboard never stalls self-play or training.
 """
+import os
+import atexit
+import threading
+import time
+from collections import deque, OrderedDict
+
 import requests
-import json
+
+SERVER_URL = "http://localhost:8000"
+# Server endpoint that unpacks a batch into the individual /internal routes
+BATCH_PATH = "/internal/telemetry/batch"
+
+
+class TelemetryChannel:
+    """
+    Fire-and-forget delivery of dashboard updates.
+
+    send() never blocks: messages go into a bounded queue that drops the
+    oldest entry when full. A daemon thread wakes at most `max_rate` times
+    per second and POSTs everything queued as one batch. Messages sent
+    with a `key` replace any still-queued message with the same key, so
+    high-frequency updates (e.g. live boards) are coalesced to the latest.
+    """
+
+    def __init__(self, server_url: str = SERVER_URL, max_queue: int = 1000,
+                 max_rate: float = 10.0, max_batch: int = 200, timeout: float = 0.5):
+        """
+        Args:
+            server_url: Base URL of the dashboard server
+            max_queue: Queued messages kept before the oldest are dropped
+            max_rate: Maximum batch POSTs per second
+            max_batch: Maximum messages per POST
+            timeout: HTTP timeout of the sender thread
+        """
+        self.url = server_url + BATCH_PATH
+        self.max_queue = max_queue
+        self.interval = 1.0 / max_rate
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._queue = deque()          # [(path, data)]
+        self._keyed = OrderedDict()    # key -> (path, data), latest only
+        self._busy = False             # A batch is being posted
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="telemetry-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, path: str, data: dict, key: str = None):
+        """
+        Queue an update for the server.
+
+        Args:
+            path: Internal endpoint the update is meant for (e.g.
+                '/internal/training/state')
+            data: JSON-serializable payload
+            key: Optional coalescing key; only the latest queued message
+                per key is delivered
+        """
+        with self._lock:
+            if key is not None:
+                self._keyed.pop(key, None)
+                self._keyed[key] = (path, data)
+                if len(self._keyed) > self.max_queue:
+                    self._keyed.popitem(last=False)
+                    self.dropped += 1
+            else:
+                self._queue.append((path, data))
+                if len(self._queue) > self.max_queue:
+                    self._queue.popleft()
+                    self.dropped += 1
+        self._wakeup.set()
+
+    def flush(self, timeout: float = 2.0):
+        """Wait (bounded) until queued messages have been delivered or given up on."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._queue and not self._keyed and not self._busy:
+                    return
+            self._wakeup.set()
+            time.sleep(0.01)
+
+    def _take_batch(self):
+        with self._lock:
+            batch = []
+            while self._queue and len(batch) < self.max_batch:
+                batch.append(self._queue.popleft())
+            while self._keyed and len(batch) < self.max_batch:
+                batch.append(self._keyed.popitem(last=False)[1])
+            self._busy = bool(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            batch = self._take_batch()
+            while batch:
+                start = time.time()
+                try:
+                    requests.post(self.url, json={
+                        "messages": [{"path": path, "data": data} for path, data in batch]
+                    }, timeout=self.timeout)
+                    self.sent += len(batch)
+                except Exception:
+                    self.failed += len(batch)  # Dashboard down; updates are best-effort
+                # Rate limit: at most one POST per interval
+                time.sleep(max(0.0, self.interval - (time.time() - start)))
+                batch = self._take_batch()
+
+
+_channel = None
+_channel_lock = threading.Lock()
+
+
+def get_channel() -> TelemetryChannel:
+    """
+    Return this process's telemetry channel, starting it on first use.
+
+    Forked worker processes do not inherit the sender thread, so a new
+    channel is created whenever the process id changes.
+    """
+    global _channel
+    with _channel_lock:
+        if _channel is None or _channel.pid != os.getpid():
+            _channel = TelemetryChannel()
+        return _channel
+
+
+@atexit.register
+def _flush_on_exit():
+    if _channel is not None and _channel.pid == os.getpid():
+        _channel.flush(timeout=1.0)
 
 
 class BroadcastClient:
     """
-    Broadcasts training updates to the server via HTTP POST.
-    
+    Broadcasts training updates to the server.
+
     Used to send step updates, game completions, etc. to the frontend.
+    Delivery is asynchronous through the process's TelemetryChannel.
     """
-    
-    def __init__(self, url: str = "http://localhost:8000/internal/training/update"):
+
+    def __init__(self, path: str = "/internal/training/update"):
         """
         Initialize broadcast client.
-        
+
         Args:
-            url: Server endpoint for training updates
+            path: Server endpoint for training updates
         """
-        self.url = url
-    
-    def broadcast(self, data: dict):
+        self.path = path
+
+    def broadcast(self, data: dict, key: str = None):
         """
-        Send an update to the server.
-        
+        Queue an update for the server (never blocks).
+
         Args:
             data: Dict with update information
+            key: Optional coalescing key (only the latest update per key is sent)
         """
-        try:
-            requests.post(self.url, json=data, timeout=0.5)
-        except Exception:
-            pass  # Non-blocking, ignore failures
+        get_channel().send(self.path, data, key=key)
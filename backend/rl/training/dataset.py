@@ -3,33 +3,96 @@ Dataset for Xiangqi Training.
 
 PyTorch Dataset for training examples generated from self-play.
 """
-import torch
-from torch.utils.data import Dataset
+import numpy as np
+from torch.utils.data import DataLoader, Dataset, Sampler
+
+from .examples import collate_records, mirror_records
+from .replay_buffer import sample_offsets
 
 
 class XiangqiDataset(Dataset):
     """
     PyTorch Dataset for Xiangqi training examples.
-    
-    Each example is a tuple of (board_state, policy, value).
+
+    Wraps a compact record array (see examples.py) or a replay buffer.
+    Indexing with an array of positions gathers the whole batch with one
+    fancy-indexing call and decodes it in bulk, so it can be driven by a
+    batch sampler with DataLoader(batch_size=None).
     """
-    
-    def __init__(self, examples):
+
+    def __init__(self, source, mirror_prob: float = 0.0):
         """
         Initialize dataset.
-        
+
         Args:
-            examples: List of (board_tensor, policy, value) tuples
+            source: EXAMPLE_DTYPE record array, or a replay buffer exposing
+                get(offsets)
+            mirror_prob: Probability of mirroring each sampled position
         """
-        self.examples = examples
-    
+        self.source = source
+        self.mirror_prob = mirror_prob
+
     def __len__(self):
-        return len(self.examples)
-    
+        return len(self.source)
+
+    def _gather(self, idx):
+        records = self.source.get(idx) if hasattr(self.source, 'get') else self.source[idx]
+        if self.mirror_prob > 0:
+            records = mirror_records(records, self.mirror_prob)
+        return records
+
     def __getitem__(self, idx):
-        board, pi, v = self.examples[idx]
-        return (
-            torch.FloatTensor(board),
-            torch.FloatTensor(pi),
-            torch.FloatTensor([v])
-        )
+        if np.ndim(idx) == 0:
+            board, pi, v = collate_records(self._gather(np.array([idx])))
+            return board[0], pi[0], v[0]
+        return collate_records(self._gather(np.asarray(idx)))
+
+
+class ReplayBatchSampler(Sampler):
+    """Yields `num_batches` arrays of sampled positions (with replacement)."""
+
+    def __init__(self, source, batch_size: int, num_batches: int):
+        """
+        Args:
+            source: Record array, or a replay buffer with its own
+                sample_offsets() (recency bias, dedup weighting)
+            batch_size: Positions per batch
+            num_batches: Number of batches per pass
+        """
+        self.source = source
+        self.batch_size = batch_size
+        self.num_batches = num_batches
+
+    def __len__(self):
+        return self.num_batches
+
+    def __iter__(self):
+        for _ in range(self.num_batches):
+            if hasattr(self.source, 'sample_offsets'):
+                yield self.source.sample_offsets(self.batch_size)
+            else:
+                yield sample_offsets(len(self.source), self.batch_size)
+
+
+def make_batch_loader(source, batch_size: int, num_batches: int,
+                      num_workers: int = 0, pin_memory: bool = False,
+                      mirror_prob: float = 0.0):
+    """
+    Build a DataLoader yielding collated (boards, pis, vs) batches.
+
+    Args:
+        source: Record array or replay buffer (see XiangqiDataset)
+        batch_size: Examples per batch
+        num_batches: Number of batches per pass
+        num_workers: Worker processes collating batches ahead of training
+        pin_memory: Pin batch tensors for asynchronous host-to-GPU copies
+        mirror_prob: Probability of mirroring each sampled position
+    """
+    return DataLoader(
+        XiangqiDataset(source, mirror_prob),
+        sampler=ReplayBatchSampler(source, batch_size, num_batches),
+        batch_size=None,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        prefetch_factor=2 if num_workers > 0 else None
+    )
@@ -0,0 +1,101 @@
+"""
+Self-Play Episode.
+
+The one implementation of a self-play game, shared by every backend
+(in-process, lockstep threads and worker processes), so all of them end
+games under the same rules and log the same record format.
+"""
+import time
+import uuid
+import numpy as np
+
+from ..algorithms.mcts import MCTS
+from .examples import encode_examples
+
+# A position repeated this many times (same side to move) is a draw
+REPETITION_LIMIT = 3
+
+
+def new_game_id() -> str:
+    """Short random game id (8 hex digits)."""
+    return uuid.uuid4().hex[:8]
+
+
+def play_episode(game, predictor, args, iteration=0, on_step=None, mcts_class=MCTS):
+    """
+    Play one self-play game with a fresh MCTS tree per move.
+
+    The game ends on a win/loss, as a draw on threefold repetition, or as
+    a draw after args['max_steps'] moves.
+
+    Args:
+        game: Game instance
+        predictor: Prediction source passed to `mcts_class`
+            (an object with predict() for MCTS, a callable for RemoteMCTS)
+        args: Training configuration dict
+        iteration: Training iteration the game belongs to
+        on_step: Optional callable(board, step) called before every move
+            (step counts from 1; Red moves on odd steps)
+        mcts_class: Tree search class, constructed as mcts_class(game, predictor, args)
+
+    Returns:
+        Tuple of (EXAMPLE_DTYPE records, game_record dict)
+    """
+    trainExamples = []
+    board = game.get_init_board()
+    curPlayer = 1
+    episodeStep = 0
+    max_steps = args.get('max_steps', 200)
+    seen = {}  # (board bytes, player) -> occurrences, for repetition draws
+
+    game_record = {
+        "game_id": new_game_id(),
+        "iteration": iteration,
+        "timestamp": time.time(),
+        "moves": [],
+        "winner": 0
+    }
+
+    def finish(result, reason):
+        game_record["winner"] = result
+        game_record["end_reason"] = reason
+        return encode_examples([(x[0], x[1], x[2], result * ((-1) ** (x[2] != curPlayer)))
+                                for x in trainExamples], game_record["game_id"]), game_record
+
+    while True:
+        state_id = (board.tobytes(), curPlayer)
+        seen[state_id] = seen.get(state_id, 0) + 1
+        if seen[state_id] >= REPETITION_LIMIT:
+            return finish(0, "repetition")
+
+        episodeStep += 1
+        canonicalBoard = game.get_canonical_form(board, curPlayer)
+        temp = int(episodeStep < args.get('tempThreshold', 15))
+        if on_step is not None:
+            on_step(board, episodeStep)
+
+        # Reset MCTS each move to save memory
+        mcts = mcts_class(game, predictor, args)
+        pi = mcts.get_action_prob(canonicalBoard, temp=temp)
+
+        # Store example (compact canonical board, encoded at game end)
+        trainExamples.append([canonicalBoard, pi, curPlayer])
+
+        action = np.random.choice(len(pi), p=pi)
+
+        # Log move - convert from Canonical to Absolute coordinates
+        start, end = game.decode_move(action)
+        # When curPlayer is Black (-1), canonical board was flipped: y -> 9 - y
+        if curPlayer == -1:
+            start = (start[0], 9 - start[1])
+            end = (end[0], 9 - end[1])
+        game_record["moves"].append([[int(start[0]), int(start[1])], [int(end[0]), int(end[1])]])
+
+        board, curPlayer = game.get_next_state(board, curPlayer, action)
+
+        r = game.get_game_ended(board, curPlayer)
+        if r != 0:
+            return finish(r, "result")
+
+        if episodeStep >= max_steps:
+            return finish(0, "max_steps")
@@ -0,0 +1,193 @@
+"""
+Compact Training Example Storage.
+
+Self-play examples are stored as fixed-size numpy records instead of
+dense float tensors and 8100-entry Python lists:
+
+    board        int8[10, 9]   canonical board (side to move is positive)
+    side         int8          player to move in absolute terms (1 / -1)
+    policy_idx   uint16[K]     action indices of non-zero policy entries
+    policy_prob  float16[K]    matching probabilities (0 = unused slot)
+    value        float16       game outcome from the side to move's view
+    game_id      uint32        first 8 hex digits of the game id
+    ply          uint16        position index within the game
+
+Dense network tensors are only built when a batch is collated.
+"""
+import numpy as np
+import torch
+
+BOARD_HEIGHT = 10
+BOARD_WIDTH = 9
+ACTION_SIZE = 8100
+NUM_PIECE_TYPES = 7
+
+# Visited moves per position; larger policies keep their top-K entries
+MAX_POLICY_ENTRIES = 64
+
+EXAMPLE_DTYPE = np.dtype([
+    ('board', np.int8, (BOARD_HEIGHT, BOARD_WIDTH)),
+    ('side', np.int8),
+    ('policy_idx', np.uint16, (MAX_POLICY_ENTRIES,)),
+    ('policy_prob', np.float16, (MAX_POLICY_ENTRIES,)),
+    ('value', np.float16),
+    ('game_id', np.uint32),
+    ('ply', np.uint16),
+])
+
+
+def _mirror_squares() -> np.ndarray:
+    """Square index (y * 9 + x) after a left-right mirror (x -> 8 - x)."""
+    y, x = np.divmod(np.arange(BOARD_HEIGHT * BOARD_WIDTH), BOARD_WIDTH)
+    return y * BOARD_WIDTH + (BOARD_WIDTH - 1 - x)
+
+
+_MIRROR_SQUARES = _mirror_squares()
+_ACTIONS = np.arange(ACTION_SIZE)
+# Action permutation for the left-right mirror (action = start * 90 + end)
+MIRROR_ACTIONS = (_MIRROR_SQUARES[_ACTIONS // 90] * 90 + _MIRROR_SQUARES[_ACTIONS % 90]).astype(np.uint16)
+
+
+def game_id_to_int(game_id) -> int:
+    """Map a hex game id (uuid or uuid prefix) to its first 32 bits."""
+    try:
+        return int(str(game_id).replace('-', '')[:8], 16)
+    except ValueError:
+        return 0
+
+
+def encode_examples(examples, game_id=None) -> np.ndarray:
+    """
+    Pack examples into an EXAMPLE_DTYPE record array.
+
+    Args:
+        examples: List of (canonical_board, pi, side, value) tuples in move
+            order, where pi is a dense policy of length ACTION_SIZE
+        game_id: Optional id of the game the examples come from
+
+    Returns:
+        Numpy structured array of length len(examples)
+    """
+    records = np.zeros(len(examples), dtype=EXAMPLE_DTYPE)
+    if game_id is not None:
+        records['game_id'] = game_id_to_int(game_id)
+    records['ply'] = np.arange(len(examples))
+    for i, (board, pi, side, value) in enumerate(examples):
+        pi = np.asarray(pi, dtype=np.float32)
+        idx = np.flatnonzero(pi)
+        if len(idx) > MAX_POLICY_ENTRIES:
+            idx = idx[np.argsort(pi[idx])[-MAX_POLICY_ENTRIES:]]
+        probs = pi[idx]
+        total = probs.sum()
+        if total > 0:
+            probs = probs / total
+
+        records[i]['board'] = board
+        records[i]['side'] = side
+        records[i]['policy_idx'][:len(idx)] = idx
+        records[i]['policy_prob'][:len(idx)] = probs
+        records[i]['value'] = value
+    return records
+
+
+def merge_examples(old, new, count: int) -> np.ndarray:
+    """
+    Average a new example into one that already stands for `count` copies.
+
+    Policy and value become the running mean over all count + 1 copies;
+    board, side and game metadata are taken from the newer example.
+
+    Args:
+        old: EXAMPLE_DTYPE record representing `count` examples
+        new: EXAMPLE_DTYPE record of the same position
+        count: Number of examples already merged into `old`
+
+    Returns:
+        Merged EXAMPLE_DTYPE record
+    """
+    pair = np.stack([old, new])
+    dense = decode_policies(pair['policy_idx'], pair['policy_prob'])
+    pi = (count * dense[0] + dense[1]) / (count + 1)
+    value = (count * float(old['value']) + float(new['value'])) / (count + 1)
+    merged = encode_examples([(new['board'], pi, new['side'], value)])[0]
+    merged['game_id'] = new['game_id']
+    merged['ply'] = new['ply']
+    return merged
+
+
+def mirror_records(records, prob: float = 0.5) -> np.ndarray:
+    """
+    Mirror a random subset of positions left-right.
+
+    Xiangqi is symmetric under x -> 8 - x, so a mirrored board with its
+    policy permuted through MIRROR_ACTIONS (and the same value) is an
+    equally valid example. Works on the compact records, before decoding.
+
+    Args:
+        records: EXAMPLE_DTYPE array
+        prob: Probability of mirroring each position
+
+    Returns:
+        Augmented copy of records
+    """
+    out = records.copy()
+    flip = np.random.random(len(out)) < prob
+    if flip.any():
+        out['board'][flip] = out['board'][flip][:, :, ::-1]
+        out['policy_idx'][flip] = MIRROR_ACTIONS[out['policy_idx'][flip]]
+    return out
+
+
+def boards_to_planes(boards) -> np.ndarray:
+    """
+    Expand int8 canonical boards into network input planes.
+
+    Matches XiangqiGame.state_to_tensor: channels 0-6 hold own pieces,
+    channels 7-13 enemy pieces.
+
+    Args:
+        boards: int8 array of shape (N, 10, 9)
+
+    Returns:
+        float32 array of shape (N, 14, 10, 9)
+    """
+    piece_ids = np.arange(1, NUM_PIECE_TYPES + 1, dtype=np.int8)[None, :, None, None]
+    boards = boards[:, None, :, :]
+    own = boards == piece_ids
+    enemy = boards == -piece_ids
+    return np.concatenate([own, enemy], axis=1).astype(np.float32)
+
+
+def decode_policies(policy_idx, policy_prob) -> np.ndarray:
+    """
+    Scatter sparse policies into dense (N, ACTION_SIZE) float32 targets.
+
+    Args:
+        policy_idx: uint16 array of shape (N, K)
+        policy_prob: float16 array of shape (N, K)
+    """
+    n = policy_idx.shape[0]
+    dense = np.zeros((n, ACTION_SIZE), dtype=np.float32)
+    mask = policy_prob > 0
+    rows = np.broadcast_to(np.arange(n)[:, None], policy_idx.shape)
+    dense[rows[mask], policy_idx[mask]] = policy_prob[mask]
+    # float16 storage loses a little mass; renormalize each row
+    sums = dense.sum(axis=1, keepdims=True)
+    np.divide(dense, sums, out=dense, where=sums > 0)
+    return dense
+
+
+def collate_records(records):
+    """
+    Build batch tensors from a record array.
+
+    Args:
+        records: EXAMPLE_DTYPE array
+
+    Returns:
+        Tuple of (boards, pis, vs) tensors
+    """
+    boards = torch.from_numpy(boards_to_planes(records['board']))
+    pis = torch.from_numpy(decode_policies(records['policy_idx'], records['policy_prob']))
+    vs = torch.from_numpy(records['value'].astype(np.float32))
+    return boards, pis, vs
@@ -0,0 +1,281 @@
+"""
+Indexed Evolution-Game Store.
+
+Keeps an in-memory index over every game in an evolution log directory
+(compact games_*.xgl logs plus legacy game_*.json files) so that the
+/api/evolution endpoints answer paginated, filtered queries without
+touching files other than the blocks holding the requested page.
+
+The index is maintained incrementally: each refresh only reads blocks
+appended since the previous one (logs are append-only) and JSON files not
+seen before. Columns are numpy arrays, so filters cost a few vectorized
+comparisons even for hundreds of thousands of games.
+"""
+import os
+import json
+import threading
+import time
+import numpy as np
+
+from .examples import game_id_to_int
+from .logger import GameLogReader, read_block, log_iteration, game_timestamp, LOG_SUFFIX
+
+_COLUMNS = {
+    'iteration': np.int32,
+    'winner': np.int8,
+    'num_moves': np.int32,
+    'timestamp': np.float64,
+    'id_prefix': np.int64,   # First 32 bits of the game id (see game_id_to_int)
+    'file': np.int32,        # Index into GameIndex._files
+    'block': np.int64,       # Block offset in a .xgl log (-1 for JSON files)
+    'slot': np.int32,        # Position within the block
+}
+
+
+class GameIndex:
+    """
+    In-memory index of logged self-play games.
+
+    Rows are kept in ingestion order (iteration ascending, then logging
+    order), so "newest first" is simply descending row order.
+    """
+
+    def __init__(self, log_dir: str = "data/evolution", refresh_interval: float = 1.0):
+        """
+        Args:
+            log_dir: Evolution log directory
+            refresh_interval: Minimum seconds between directory rescans
+        """
+        self.log_dir = log_dir
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._clear()
+
+    def _clear(self):
+        self._files = []          # Paths, referenced by the 'file' column
+        self._file_ids = {}       # Path -> index into _files
+        self._consumed = {}       # .xgl path -> bytes already indexed
+        self._seen_json = set()
+        self._game_ids = []       # Full game id per row
+        self._chunks = {name: [] for name in _COLUMNS}
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+
+    def __len__(self):
+        return len(self._game_ids)
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def refresh(self, force: bool = False):
+        """Index games logged since the last refresh (rate-limited unless forced)."""
+        with self._lock:
+            if not force and time.time() - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = time.time()
+            if not os.path.exists(self.log_dir):
+                return
+
+            names = os.listdir(self.log_dir)
+            if self._files_removed(names):
+                self._clear()  # Logs were deleted or rewritten (training reset)
+
+            # Both formats in one pass ordered by iteration, so rows stay
+            # iteration ascending when a directory mixes them
+            pending = []
+            for name in names:
+                iteration = log_iteration(name)
+                if iteration is None:
+                    continue
+                if name.endswith(LOG_SUFFIX) or name not in self._seen_json:
+                    pending.append((iteration, name))
+
+            for iteration, name in sorted(pending):
+                if name.endswith(LOG_SUFFIX):
+                    self._ingest_log(iteration, name)
+                else:
+                    self._ingest_json(iteration, name)
+            self._merge_chunks()
+
+    def _files_removed(self, names):
+        present = set(names)
+        if not self._seen_json <= present:
+            return True
+        for path, consumed in self._consumed.items():
+            try:
+                if os.path.basename(path) not in present or os.path.getsize(path) < consumed:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _file_id(self, path):
+        if path not in self._file_ids:
+            self._file_ids[path] = len(self._files)
+            self._files.append(path)
+        return self._file_ids[path]
+
+    def _add_rows(self, rows, game_ids):
+        for name in _COLUMNS:
+            self._chunks[name].append(np.array([row[name] for row in rows], dtype=_COLUMNS[name]))
+        self._game_ids.extend(game_ids)
+
+    def _ingest_log(self, iteration, name):
+        path = os.path.join(self.log_dir, name)
+        start = self._consumed.get(path, 0)
+        try:
+            if os.path.getsize(path) <= start:
+                return
+            reader = GameLogReader(path, start)
+        except OSError:
+            return
+        if not reader.blocks:
+            return
+
+        file_id = self._file_id(path)
+        rows, game_ids = [], []
+        for block in reader.blocks:
+            offset = reader.start + block[0]
+            entries = reader.block_index(block)
+            for slot, game in enumerate(reader.block_games(block, moves=False)):
+                rows.append(self._row(game, iteration, entries[slot][2], file_id, offset, slot))
+                game_ids.append(str(game.get('game_id', '')))
+        self._add_rows(rows, game_ids)
+        self._consumed[path] = reader.end
+
+    def _ingest_json(self, iteration, name):
+        path = os.path.join(self.log_dir, name)
+        try:
+            with open(path, 'r') as f:
+                game = json.load(f)
+        except (OSError, ValueError):
+            return  # Possibly still being written; retried on the next refresh
+        self._seen_json.add(name)
+        row = self._row(game, iteration, len(game.get('moves', [])), self._file_id(path), -1, 0)
+        self._add_rows([row], [str(game.get('game_id', ''))])
+
+    @staticmethod
+    def _row(game, iteration, num_moves, file_id, block, slot):
+        return {
+            'iteration': game.get('iteration', iteration),
+            'winner': int(game.get('winner', 0)),
+            'num_moves': num_moves,
+            'timestamp': game_timestamp(game),
+            'id_prefix': game_id_to_int(game.get('game_id', '')),
+            'file': file_id,
+            'block': block,
+            'slot': slot,
+        }
+
+    def _merge_chunks(self):
+        if not self._chunks['iteration']:
+            return
+        for name in _COLUMNS:
+            self._columns[name] = np.concatenate([self._columns[name]] + self._chunks[name])
+            self._chunks[name] = []
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def iterations(self):
+        """Iterations with logged games, newest first."""
+        self.refresh()
+        with self._lock:
+            return [int(i) for i in np.unique(self._columns['iteration'])[::-1]]
+
+    def query(self, iteration: int = None, game_id: str = None, winner: int = None,
+              min_moves: int = None, max_moves: int = None,
+              since: float = None, until: float = None,
+              offset: int = 0, limit: int = 50, moves: bool = True):
+        """
+        Find games matching all given filters, newest first.
+
+        Args:
+            iteration: Training iteration
+            game_id: Game id or id prefix (hex)
+            winner: 1 (red), -1 (black) or 0 (draw)
+            min_moves, max_moves: Game length bounds (inclusive)
+            since, until: Timestamp bounds (inclusive)
+            offset, limit: Page of the result to return
+            moves: Load full game records (False returns index rows only)
+
+        Returns:
+            Tuple of (total matching games, list of game dicts)
+        """
+        self.refresh()
+        with self._lock:
+            cols = self._columns
+            mask = np.ones(len(cols['iteration']), dtype=bool)
+            if iteration is not None:
+                mask &= cols['iteration'] == iteration
+            if winner is not None:
+                mask &= cols['winner'] == winner
+            if min_moves is not None:
+                mask &= cols['num_moves'] >= min_moves
+            if max_moves is not None:
+                mask &= cols['num_moves'] <= max_moves
+            if since is not None:
+                mask &= cols['timestamp'] >= since
+            if until is not None:
+                mask &= cols['timestamp'] <= until
+            if game_id:
+                mask &= self._id_mask(game_id)
+
+            rows = np.flatnonzero(mask)[::-1]
+            total = len(rows)
+            page = rows[offset:offset + limit]
+            if not moves:
+                return total, [self._summary(row) for row in page]
+            return total, self._load(page)
+
+    def _id_mask(self, game_id):
+        """Rows whose game id starts with `game_id` (dashes ignored)."""
+        prefix = str(game_id).replace('-', '').lower()
+        hex_digits = prefix[:8]
+        try:
+            value = int(hex_digits, 16)
+        except ValueError:
+            return np.zeros(len(self._game_ids), dtype=bool)
+        # Range of 32-bit id prefixes sharing the first hex digits
+        shift = 4 * (8 - len(hex_digits))
+        ids = self._columns['id_prefix']
+        mask = (ids >= value << shift) & (ids < (value + 1) << shift)
+        if len(prefix) > 8:
+            for row in np.flatnonzero(mask):
+                mask[row] = self._game_ids[row].replace('-', '').lower().startswith(prefix)
+        return mask
+
+    def _summary(self, row):
+        cols = self._columns
+        return {
+            'game_id': self._game_ids[row],
+            'iteration': int(cols['iteration'][row]),
+            'winner': int(cols['winner'][row]),
+            'num_moves': int(cols['num_moves'][row]),
+            'timestamp': float(cols['timestamp'][row]),
+        }
+
+    def _load(self, rows):
+        """Read full records for `rows`, reading each block once."""
+        cols = self._columns
+        wanted = {}  # (path, block) -> slots
+        for row in rows:
+            key = (self._files[cols['file'][row]], int(cols['block'][row]))
+            wanted.setdefault(key, []).append(int(cols['slot'][row]))
+
+        loaded = {}
+        for (path, block), slots in wanted.items():
+            try:
+                if block < 0:
+                    with open(path, 'r') as f:
+                        loaded[(path, block, 0)] = json.load(f)
+                else:
+                    for slot, game in zip(slots, read_block(path, block, slots)):
+                        loaded[(path, block, slot)] = game
+            except (OSError, ValueError, IndexError):
+                continue  # File removed (e.g. training reset) since it was indexed
+
+        keys = ((self._files[cols['file'][row]], int(cols['block'][row]), int(cols['slot'][row])) for row in rows)
+        return [loaded[key] for key in keys if key in loaded]
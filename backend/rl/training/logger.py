@@ -2,41 +2,352 @@
 Game Logger for Training Evolution.
 
 Logs game records during training for analysis and visualization.
+
+Games are buffered and appended in blocks to one compact log per
+iteration (games_{iteration:06d}.xgl) instead of one JSON file per game:
+
+    block   = header | payload | index | trailer
+    header  = magic 'XGLB', flags (1 = zlib payload), payload_len,
+              index_len, num_games
+    payload = per game: u16 meta_len, JSON metadata (everything but the
+              moves), u16 num_moves, uint16 actions (start * 90 + end in
+              absolute y * 9 + x squares)
+    index   = per game: payload offset and length, num_moves, winner,
+              timestamp (uncompressed, so listings skip the payload)
+    trailer = block_len, magic 'XGLE'
+
+Readers walk the trailers backwards from the end of the file, so the
+newest games are found without scanning the whole log.
 """
 import os
 import json
-import datetime
+import struct
+import time
+import zlib
+import numpy as np
+
+LOG_SUFFIX = ".xgl"
+BLOCK_MAGIC = b"XGLB"
+TRAILER_MAGIC = b"XGLE"
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct("<4sBIII")
+_TRAILER = struct.Struct("<I4s")
+_INDEX_ENTRY = struct.Struct("<IIHbxd")
+_U16 = struct.Struct("<H")
+
+
+def log_filename(iteration: int) -> str:
+    """File name of the compact game log of an iteration."""
+    return f"games_{iteration:06d}{LOG_SUFFIX}"
+
+
+def encode_moves(moves) -> np.ndarray:
+    """Pack [[[x1, y1], [x2, y2]], ...] moves into uint16 actions."""
+    if not moves:
+        return np.zeros(0, dtype=np.uint16)
+    coords = np.asarray(moves, dtype=np.int32).reshape(-1, 4)
+    start = coords[:, 1] * 9 + coords[:, 0]
+    end = coords[:, 3] * 9 + coords[:, 2]
+    return (start * 90 + end).astype(np.uint16)
+
+
+def decode_moves(actions) -> list:
+    """Unpack uint16 actions into [[[x1, y1], [x2, y2]], ...] moves."""
+    start, end = np.divmod(np.asarray(actions, dtype=np.int32), 90)
+    return [[[int(s % 9), int(s // 9)], [int(e % 9), int(e // 9)]] for s, e in zip(start, end)]
+
+
+def game_timestamp(game_record: dict) -> float:
+    return float(game_record.get("timestamp") or game_record.get("start_time") or time.time())
 
 
 class GameLogger:
     """
     Logs training games to disk for analysis.
-    
-    Creates JSON files with game records including moves, winner, and metadata.
+
+    log_game() only buffers; games are appended as one block per flush,
+    which happens every `flush_games` games, after `flush_interval`
+    seconds, when the iteration changes, or on an explicit flush().
     """
-    
-    def __init__(self, log_dir: str = "data/evolution"):
+
+    def __init__(self, log_dir: str = "data/evolution", compress: bool = True,
+                 flush_games: int = 64, flush_interval: float = 30.0):
         """
         Initialize logger.
-        
+
         Args:
             log_dir: Directory to save game logs
+            compress: zlib-compress block payloads
+            flush_games: Buffered games that trigger a write
+            flush_interval: Seconds after which buffered games are written
         """
         self.log_dir = log_dir
+        self.compress = compress
+        self.flush_games = flush_games
+        self.flush_interval = flush_interval
+        self._iteration = None
+        self._pending = []
+        self._last_flush = time.time()
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
-    
+
     def log_game(self, iteration: int, game_record: dict):
         """
         Log a single game.
-        
+
         Args:
             iteration: Training iteration number
             game_record: Dict with game_id, moves, winner, timestamp, etc.
         """
-        filename = os.path.join(
-            self.log_dir, 
-            f"game_{iteration}_{game_record.get('game_id', 'unknown')}.json"
-        )
-        with open(filename, 'w') as f:
-            json.dump(game_record, f, indent=2)
+        if self._iteration is not None and iteration != self._iteration:
+            self.flush()
+        self._iteration = iteration
+        self._pending.append(game_record)
+        if (len(self._pending) >= self.flush_games or
+                time.time() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Append buffered games to the iteration's log as one block."""
+        self._last_flush = time.time()
+        if not self._pending:
+            return
+        block = self._encode_block(self._iteration, self._pending)
+        path = os.path.join(self.log_dir, log_filename(self._iteration))
+        with open(path, "ab") as f:
+            f.write(block)
+        self._pending = []
+
+    def _encode_block(self, iteration, games) -> bytes:
+        payload, index = bytearray(), bytearray()
+        for game_record in games:
+            meta = {k: v for k, v in game_record.items() if k != "moves"}
+            meta.setdefault("iteration", iteration)
+            meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+            actions = encode_moves(game_record.get("moves", []))
+
+            offset = len(payload)
+            payload += _U16.pack(len(meta_bytes)) + meta_bytes
+            payload += _U16.pack(len(actions)) + actions.tobytes()
+            index += _INDEX_ENTRY.pack(offset, len(payload) - offset, len(actions),
+                                       int(game_record.get("winner", 0)), game_timestamp(game_record))
+
+        flags = 0
+        if self.compress:
+            payload, flags = zlib.compress(bytes(payload)), FLAG_ZLIB
+        header = _HEADER.pack(BLOCK_MAGIC, flags, len(payload), len(index), len(games))
+        body = header + bytes(payload) + bytes(index)
+        return body + _TRAILER.pack(len(body) + _TRAILER.size, TRAILER_MAGIC)
+
+
+class GameLogReader:
+    """
+    Reads one iteration's compact game log.
+
+    The block list comes from the trailers; a block whose write is still
+    in progress (or was cut short) is ignored.
+    """
+
+    def __init__(self, path: str, start: int = 0, length: int = None):
+        """
+        Args:
+            path: Path of a games_*.xgl file
+            start: Byte offset of the first block to read (for incremental
+                readers that already consumed the file up to here)
+            length: Bytes to read (default: to the end of the file)
+        """
+        self.path = path
+        self.start = start
+        with open(path, "rb") as f:
+            f.seek(start)
+            self._data = f.read() if length is None else f.read(length)
+        # [(start, flags, payload_len, index_len, num_games)], oldest first;
+        # starts are relative to self.start
+        self.blocks = self._find_blocks()
+        # File offset just past the last complete block
+        self.end = start + (self._parse_header(self.blocks[-1][0])[1] if self.blocks else 0)
+
+    def _parse_header(self, start):
+        if start < 0 or start + _HEADER.size > len(self._data):
+            return None
+        magic, flags, payload_len, index_len, num_games = _HEADER.unpack_from(self._data, start)
+        if magic != BLOCK_MAGIC:
+            return None
+        end = start + _HEADER.size + payload_len + index_len + _TRAILER.size
+        if end > len(self._data):
+            return None
+        return (start, flags, payload_len, index_len, num_games), end
+
+    def _find_blocks(self):
+        # Fast path: follow trailers back from the end of the file
+        blocks, end = [], len(self._data)
+        while end >= _TRAILER.size:
+            block_len, magic = _TRAILER.unpack_from(self._data, end - _TRAILER.size)
+            parsed = self._parse_header(end - block_len) if magic == TRAILER_MAGIC else None
+            if parsed is None or parsed[1] != end:
+                break
+            blocks.append(parsed[0])
+            end -= block_len
+        if end == 0:
+            return blocks[::-1]
+
+        # Torn tail: scan forward over the complete blocks instead
+        blocks, start = [], 0
+        while True:
+            parsed = self._parse_header(start)
+            if parsed is None:
+                return blocks
+            blocks.append(parsed[0])
+            start = parsed[1]
+
+    def __len__(self):
+        return sum(block[4] for block in self.blocks)
+
+    def block_index(self, block):
+        """Index entries (offset, length, num_moves, winner, timestamp) of one block."""
+        start, _, payload_len, index_len, num_games = block
+        index_start = start + _HEADER.size + payload_len
+        return [_INDEX_ENTRY.unpack_from(self._data, index_start + i * _INDEX_ENTRY.size)
+                for i in range(num_games)]
+
+    def _payload(self, block):
+        start, flags, payload_len, _, _ = block
+        payload = self._data[start + _HEADER.size:start + _HEADER.size + payload_len]
+        return zlib.decompress(payload) if flags & FLAG_ZLIB else payload
+
+    def summaries(self, newest_first: bool = True):
+        """
+        Yield index entries without decoding any payload.
+
+        Yields:
+            Dicts with num_moves, winner and timestamp
+        """
+        blocks = reversed(self.blocks) if newest_first else self.blocks
+        for block in blocks:
+            entries = self.block_index(block)
+            for _, _, num_moves, winner, timestamp in (reversed(entries) if newest_first else entries):
+                yield {"num_moves": num_moves, "winner": winner, "timestamp": timestamp}
+
+    def block_games(self, block, moves: bool = True, slots=None) -> list:
+        """
+        Decode the games of one block, in logging order.
+
+        Args:
+            block: Entry of self.blocks
+            moves: Decode the move lists (False returns metadata only)
+            slots: Positions within the block to decode (default: all)
+        """
+        payload = self._payload(block)
+        entries = self.block_index(block)
+        games = []
+        for slot in (range(len(entries)) if slots is None else slots):
+            offset, _, num_moves, _, _ = entries[slot]
+            meta_len, = _U16.unpack_from(payload, offset)
+            game = json.loads(payload[offset + 2:offset + 2 + meta_len])
+            if moves:
+                moves_at = offset + 2 + meta_len + 2
+                actions = np.frombuffer(payload, dtype=np.uint16, count=num_moves, offset=moves_at)
+                game["moves"] = decode_moves(actions)
+            games.append(game)
+        return games
+
+    def games(self, newest_first: bool = True):
+        """
+        Yield full game records (metadata plus decoded moves).
+        """
+        blocks = reversed(self.blocks) if newest_first else self.blocks
+        for block in blocks:
+            games = self.block_games(block)
+            yield from (reversed(games) if newest_first else games)
+
+
+def read_block(path: str, offset: int, slots=None) -> list:
+    """
+    Read the games of the single block starting at file offset `offset`.
+
+    Args:
+        path: Path of a games_*.xgl file
+        offset: Block start (GameLogReader.start + block start)
+        slots: Positions within the block to decode (default: all)
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        header = f.read(_HEADER.size)
+    _, _, payload_len, index_len, _ = _HEADER.unpack(header)
+    length = _HEADER.size + payload_len + index_len + _TRAILER.size
+    reader = GameLogReader(path, offset, length)
+    return reader.block_games(reader.blocks[0], slots=slots) if reader.blocks else []
+
+
+def log_iteration(filename):
+    """Iteration number of a log file name, or None for other files."""
+    if filename.startswith("games_") and filename.endswith(LOG_SUFFIX):
+        try:
+            return int(filename[len("games_"):-len(LOG_SUFFIX)])
+        except ValueError:
+            return None
+    if filename.startswith("game_") and filename.endswith(".json"):  # Legacy per-game JSON
+        try:
+            return int(filename.split("_")[1])
+        except (IndexError, ValueError):
+            return None
+    return None
+
+
+def list_iterations(log_dir: str = "data/evolution"):
+    """Iterations with logged games, newest first."""
+    if not os.path.exists(log_dir):
+        return []
+    iterations = {log_iteration(name) for name in os.listdir(log_dir)}
+    iterations.discard(None)
+    return sorted(iterations, reverse=True)
+
+
+def _legacy_games(log_dir, iteration):
+    """Games of an iteration logged as per-game JSON files by older versions."""
+    prefix = f"game_{iteration}_"
+    paths = [os.path.join(log_dir, name) for name in os.listdir(log_dir)
+             if name.startswith(prefix) and name.endswith(".json")]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            pass
+
+
+def iter_games(log_dir: str = "data/evolution", iteration: int = None):
+    """
+    Yield logged games, newest first.
+
+    Args:
+        log_dir: Evolution log directory
+        iteration: Only this iteration (default: all, newest iteration first)
+    """
+    iterations = [iteration] if iteration is not None else list_iterations(log_dir)
+    for it in iterations:
+        path = os.path.join(log_dir, log_filename(it))
+        if os.path.exists(path):
+            yield from GameLogReader(path).games()
+        yield from _legacy_games(log_dir, it)
+
+
+def load_games(log_dir: str = "data/evolution", iteration: int = None, limit: int = 50):
+    """
+    Load up to `limit` logged games, newest first.
+
+    Args:
+        log_dir: Evolution log directory
+        iteration: Only this iteration (default: all)
+        limit: Maximum number of games
+    """
+    if not os.path.exists(log_dir):
+        return []
+    games = []
+    for game in iter_games(log_dir, iteration):
+        if len(games) >= limit:
+            break
+        games.append(game)
+    return games
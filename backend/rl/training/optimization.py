@@ -0,0 +1,71 @@
+"""
+Optimizer, Learning-Rate Schedule and Training Budget.
+
+Trainers build one optimizer and one LR scheduler for their whole lifetime
+so Adam moment estimates carry over between iterations. The scheduler is
+stepped once per training iteration, and plan_training() decides how many
+gradient steps that iteration runs.
+"""
+import torch.optim as optim
+
+
+def make_optimizer(model, args):
+    """
+    Build the training optimizer for `model` from a config dict.
+
+    Args:
+        model: Neural network model
+        args: Training configuration dict ('lr', optional 'weight_decay')
+    """
+    return optim.Adam(model.parameters(), lr=args['lr'], weight_decay=args.get('weight_decay', 0.0))
+
+
+def make_lr_scheduler(optimizer, args):
+    """
+    Build the per-iteration LR schedule described by a config dict.
+
+    'lr_schedule' selects:
+        - 'constant': keep 'lr' (returns None)
+        - 'step': multiply by 'lr_gamma' every 'lr_step_iters' iterations
+        - 'cosine': anneal from 'lr' to 'lr_min' over 'num_iters' iterations
+
+    Args:
+        optimizer: Optimizer to schedule
+        args: Training configuration dict
+    """
+    schedule = args.get('lr_schedule', 'constant')
+    if schedule == 'constant':
+        return None
+    if schedule == 'step':
+        return optim.lr_scheduler.StepLR(optimizer, step_size=args.get('lr_step_iters', 100),
+                                         gamma=args.get('lr_gamma', 0.1))
+    if schedule == 'cosine':
+        return optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=args['num_iters'],
+                                                    eta_min=args.get('lr_min', 1e-5))
+    raise ValueError(f"Unknown lr_schedule: {schedule}")
+
+
+def plan_training(args, replay_size: int, new_samples: int):
+    """
+    Decide how many gradient steps one training iteration runs.
+
+    Step-budgeted modes keep iteration time flat as the replay window grows:
+        - 'train_steps': a fixed number of steps per iteration
+        - 'target_sample_reuse': enough steps that each newly generated
+          sample is trained on this many times on average
+    Otherwise every iteration runs 'epochs' passes over the replay window.
+
+    Args:
+        args: Training configuration dict
+        replay_size: Examples currently in the replay buffer
+        new_samples: Examples added since the last training iteration
+
+    Returns:
+        Tuple of (num_passes, batches_per_pass)
+    """
+    batch_size = args['batch_size']
+    if args.get('train_steps'):
+        return 1, args['train_steps']
+    if args.get('target_sample_reuse'):
+        return 1, max(1, round(args['target_sample_reuse'] * new_samples / batch_size))
+    return args['epochs'], max(1, -(-replay_size // batch_size))
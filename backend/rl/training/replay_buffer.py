@@ -0,0 +1,253 @@
+"""
+Replay Buffer for Self-Play Training Examples.
+
+Fixed-capacity ring buffer with a sliding window over recent iterations,
+replacing the unbounded per-iteration example history. Repeated positions
+(e.g. openings) can optionally be merged into a single example.
+"""
+import numpy as np
+
+from .examples import EXAMPLE_DTYPE, merge_examples
+
+
+def sample_offsets(size: int, batch_size: int, recency_bias: float = 0.0):
+    """
+    Draw logical positions in [0, size), 0 = oldest, with replacement.
+
+    Args:
+        size: Number of stored examples
+        batch_size: Number of positions to draw
+        recency_bias: 0 for uniform; k > 0 gives density ~ x^k over age position x
+    """
+    if size == 0:
+        raise ValueError("Cannot sample from an empty replay buffer")
+    if recency_bias > 0:
+        # Inverse-CDF sampling of density ~ x^k over age position x
+        u = np.random.random(batch_size)
+        offsets = (size * u ** (1.0 / (1.0 + recency_bias))).astype(np.int64)
+        return np.minimum(offsets, size - 1)
+    return np.random.randint(0, size, size=batch_size)
+
+
+def make_replay_buffer(args):
+    """
+    Build the replay buffer described by a training config dict.
+
+    Uses memory-mapped on-disk shards when 'replay_dir' is set, otherwise
+    an in-memory ring buffer.
+    """
+    kwargs = dict(
+        capacity=args.get('maxlenOfQueue', 200000),
+        window_iters=args.get('replay_window_iters'),
+        recency_bias=args.get('replay_recency_bias', 0.0)
+    )
+    if args.get('replay_dir'):
+        from .shards import ShardReplayBuffer
+        if args.get('replay_dedup'):
+            print("[Replay] Position dedup is not supported with on-disk shards; ignoring")
+        return ShardReplayBuffer(args['replay_dir'], **kwargs)
+    return ReplayBuffer(dedup=args.get('replay_dedup', False),
+                        count_weight=args.get('replay_dedup_weight', 0.5), **kwargs)
+
+
+class ReplayBuffer:
+    """
+    Bounded replay buffer with O(1) insert and eviction.
+
+    Examples live in a ring of `capacity` compact records (EXAMPLE_DTYPE)
+    tagged with the iteration that produced them. When full, the oldest
+    examples are overwritten; with
+    `window_iters` set, examples older than the last N iterations are
+    evicted as new iterations arrive. Batches are drawn by index, either
+    uniformly or biased towards recent examples, without shuffling.
+
+    With `dedup`, an example whose canonical board is already in the window
+    is merged into the stored one (running mean of policy and value, count
+    incremented, iteration refreshed) instead of taking a new slot. Merged
+    slots are sampled with weight count ** count_weight, through a
+    cumulative weight table rebuilt only after the buffer changed.
+    """
+
+    def __init__(self, capacity: int = 200000, window_iters: int = None, recency_bias: float = 0.0,
+                 dedup: bool = False, count_weight: float = 0.5):
+        """
+        Initialize replay buffer.
+
+        Args:
+            capacity: Maximum number of examples (sample-count window)
+            window_iters: Keep only examples from the last N iterations (None = no limit)
+            recency_bias: 0 for uniform sampling; k > 0 samples the example at
+                relative age position x in [0, 1] (1 = newest) with density ~ x^k
+            dedup: Merge examples of identical positions
+            count_weight: Sampling weight exponent on merge counts (0 = every
+                unique position alike, 1 = as often as it was played)
+        """
+        self.capacity = capacity
+        self.window_iters = window_iters
+        self.recency_bias = recency_bias
+        self.count_weight = count_weight
+
+        self._data = np.zeros(capacity, dtype=EXAMPLE_DTYPE)
+        self._iters = np.zeros(capacity, dtype=np.int64)
+        self._head = 0  # Slot of the oldest example
+        self._size = 0  # Occupied span of the ring, including merged-away slots
+        self.latest_iteration = None
+
+        # Dedup state: board bytes -> slot, and examples merged into each slot
+        self._index = {} if dedup else None
+        self._counts = np.zeros(capacity, dtype=np.int64)
+        self._live = 0
+        self._cum_weights = None  # Cumulative sampling weights over the span (None = stale)
+
+    def __len__(self):
+        return self._size if self._index is None else self._live
+
+    def add(self, records, iteration: int = 0):
+        """
+        Insert examples produced in `iteration`.
+
+        Args:
+            records: EXAMPLE_DTYPE record array
+            iteration: Training iteration that generated them
+        """
+        self._cum_weights = None
+        if self.latest_iteration is None or iteration > self.latest_iteration:
+            self.latest_iteration = iteration
+            self._evict_outside_window()
+
+        if self._index is not None:
+            records, counts = self._merge_duplicates(records, iteration)
+        else:
+            counts = 1
+
+        # Only the newest `capacity` records can survive the insert
+        records = records[-self.capacity:]
+        if self._index is not None:
+            counts = counts[-self.capacity:]
+        n = len(records)
+        overflow = max(0, self._size + n - self.capacity)
+        if overflow and self._index is not None:
+            self._drop_slots((self._head + np.arange(overflow)) % self.capacity)
+        self._head = (self._head + overflow) % self.capacity
+        self._size -= overflow
+
+        start = (self._head + self._size) % self.capacity
+        slots = (start + np.arange(n)) % self.capacity
+        self._data[slots] = records
+        self._iters[slots] = iteration
+        self._counts[slots] = counts
+        self._size += n
+
+        if self._index is not None:
+            self._live += n
+            for slot in slots:
+                self._index[self._data[slot]['board'].tobytes()] = int(slot)
+
+    def _merge_duplicates(self, records, iteration):
+        """
+        Merge records into stored duplicates and into each other.
+
+        Returns:
+            Tuple of (records needing new slots, their merge counts)
+        """
+        fresh, counts, pending = [], [], {}
+        for record in records:
+            key = record['board'].tobytes()
+            slot = self._index.get(key)
+            if slot is not None:
+                self._data[slot] = merge_examples(self._data[slot], record, self._counts[slot])
+                self._counts[slot] += 1
+                self._iters[slot] = iteration
+            elif key in pending:
+                i = pending[key]
+                fresh[i] = merge_examples(fresh[i], record, counts[i])
+                counts[i] += 1
+            else:
+                pending[key] = len(fresh)
+                fresh.append(record)
+                counts.append(1)
+        return np.array(fresh, dtype=EXAMPLE_DTYPE), np.array(counts, dtype=np.int64)
+
+    def _drop_slots(self, slots):
+        """Forget live examples in `slots` (dedup mode)."""
+        for slot in slots[self._counts[slots] > 0]:
+            self._index.pop(self._data[slot]['board'].tobytes(), None)
+        self._live -= int(np.count_nonzero(self._counts[slots]))
+        self._counts[slots] = 0
+
+    def flush(self):
+        """No-op; kept for interface parity with ShardReplayBuffer."""
+
+    def _evict_outside_window(self):
+        """Drop the oldest examples that fall out of the iteration window."""
+        if self.window_iters is None:
+            return
+        min_iteration = self.latest_iteration - self.window_iters + 1
+        if self._index is not None:
+            # Merged slots get their iteration refreshed, so stale slots can
+            # sit behind fresh ones; drop them wherever they are
+            span = (self._head + np.arange(self._size)) % self.capacity
+            self._drop_slots(span[self._iters[span] < min_iteration])
+            while self._size and self._counts[self._head] == 0:
+                self._head = (self._head + 1) % self.capacity
+                self._size -= 1
+            return
+        while self._size and self._iters[self._head] < min_iteration:
+            self._head = (self._head + 1) % self.capacity
+            self._size -= 1
+
+    def get(self, offsets):
+        """
+        Fetch records by logical position (0 = oldest).
+
+        Args:
+            offsets: Integer array of positions in [0, self._size)
+
+        Returns:
+            EXAMPLE_DTYPE record array
+        """
+        return self._data[(self._head + np.asarray(offsets)) % self.capacity]
+
+    def sample_offsets(self, batch_size: int):
+        """Draw `batch_size` logical positions (with replacement)."""
+        if self._index is None:
+            return sample_offsets(self._size, batch_size, self.recency_bias)
+        if self._live == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        if self._cum_weights is None:
+            counts = self._counts[(self._head + np.arange(self._size)) % self.capacity]
+            weights = np.where(counts > 0, counts.astype(np.float64) ** self.count_weight, 0.0)
+            if self.recency_bias > 0:
+                weights *= ((np.arange(self._size) + 0.5) / self._size) ** self.recency_bias
+            self._cum_weights = np.cumsum(weights)
+        # Zero-weight (merged-away) slots add no width, so they are never drawn
+        u = np.random.random(batch_size) * self._cum_weights[-1]
+        offsets = np.searchsorted(self._cum_weights, u, side='right')
+        return np.minimum(offsets, self._size - 1)
+
+    def sample(self, batch_size: int):
+        """
+        Draw one batch of examples (with replacement).
+
+        Args:
+            batch_size: Number of examples to draw
+
+        Returns:
+            EXAMPLE_DTYPE record array
+        """
+        return self.get(self.sample_offsets(batch_size))
+
+    def iter_batches(self, batch_size: int, num_batches: int):
+        """
+        Yield `num_batches` sampled batches.
+
+        Args:
+            batch_size: Examples per batch
+            num_batches: Number of batches to yield
+        """
+        for _ in range(num_batches):
+            yield self.sample(batch_size)
+
+    def batches_per_epoch(self, batch_size: int) -> int:
+        """Number of batches that cover the buffer once on average."""
+        return max(1, -(-len(self) // batch_size))
@@ -0,0 +1,240 @@
+"""
+Memory-Mapped Replay Shards.
+
+Self-play examples are written as fixed-record shards (.npy files of
+EXAMPLE_DTYPE records) and memory-mapped for random access. The replay
+window can then be larger than RAM, survives trainer restarts, and is
+shared between trainer processes through the page cache.
+"""
+import os
+import re
+import time
+import numpy as np
+
+from .examples import EXAMPLE_DTYPE
+from .replay_buffer import sample_offsets
+
+SHARD_PATTERN = re.compile(r"shard_(\d+)_(\d+)_(\d+)\.npy$")
+
+
+class ShardReplayBuffer:
+    """
+    Replay buffer backed by memory-mapped shard files.
+
+    Same interface as ReplayBuffer. New records are buffered in memory
+    (and sampleable right away) until `shard_size` records accumulate,
+    the iteration changes, or flush() is called; then they are written
+    atomically as a new shard. Whole shards fall out of the window by
+    iteration; the sample-count window trims the oldest shard logically.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        capacity: int = 200000,
+        window_iters: int = None,
+        recency_bias: float = 0.0,
+        shard_size: int = 4096,
+        delete_evicted: bool = True
+    ):
+        """
+        Initialize shard-backed replay buffer and load existing shards.
+
+        Args:
+            root: Directory holding shard files
+            capacity: Maximum number of examples in the window
+            window_iters: Keep only examples from the last N iterations (None = no limit)
+            recency_bias: 0 for uniform sampling, >0 favors recent examples
+            shard_size: Records buffered before a shard is written
+            delete_evicted: Delete shard files once they leave the window
+                (keeps the directory bounded; disable to archive old data)
+        """
+        self.root = root
+        self.capacity = capacity
+        self.window_iters = window_iters
+        self.recency_bias = recency_bias
+        self.shard_size = shard_size
+        self.delete_evicted = delete_evicted
+        os.makedirs(root, exist_ok=True)
+
+        self._shards = []      # [(iteration, seq, path, records)] oldest first
+        self._known = set()    # Paths already considered (loaded or evicted)
+        self._pending = []     # Unflushed record arrays
+        self._pending_iteration = None
+        self._skip = 0         # Records of the oldest shard outside the window
+        self._size = 0
+        self._starts = np.zeros(1, dtype=np.int64)
+        self.latest_iteration = None
+        self.refresh()
+
+    def __len__(self):
+        return self._size
+
+    def refresh(self):
+        """Memory-map shards written since the last scan (by any process)."""
+        found = []
+        for filename in os.listdir(self.root):
+            match = SHARD_PATTERN.match(filename)
+            path = os.path.join(self.root, filename)
+            if match and path not in self._known:
+                found.append((int(match.group(1)), int(match.group(2)), path))
+
+        # Shards already outside the iteration window are never mapped
+        min_iteration = None
+        if self.window_iters is not None and found:
+            latest = max([f[0] for f in found] + [self.latest_iteration or 0])
+            min_iteration = latest - self.window_iters + 1
+
+        added = False
+        for iteration, seq, path in found:
+            self._known.add(path)
+            if min_iteration is not None and iteration < min_iteration:
+                self._remove(path)
+                continue
+            try:
+                records = np.load(path, mmap_mode='r')
+            except (OSError, ValueError):
+                continue  # Evicted by another process meanwhile
+            if records.dtype != EXAMPLE_DTYPE:
+                print(f"[Replay] Skipping shard with incompatible layout: {path}")
+                continue
+            self._shards.append((iteration, seq, path, records))
+            added = True
+        if added:
+            self._shards.sort(key=lambda s: (s[0], s[1]))
+            latest = self._shards[-1][0]
+            if self.latest_iteration is None or latest > self.latest_iteration:
+                self.latest_iteration = latest
+        self._apply_window()
+
+    def add(self, records, iteration: int = 0):
+        """
+        Insert examples produced in `iteration`.
+
+        Args:
+            records: EXAMPLE_DTYPE record array
+            iteration: Training iteration that generated them
+        """
+        if self._pending_iteration is not None and iteration != self._pending_iteration:
+            self.flush()
+        if self.latest_iteration is None or iteration > self.latest_iteration:
+            self.latest_iteration = iteration
+            self.refresh()
+
+        self._pending.append(np.asarray(records, dtype=EXAMPLE_DTYPE))
+        self._pending_iteration = iteration
+        if sum(len(p) for p in self._pending) >= self.shard_size:
+            self.flush()
+        else:
+            self._apply_window()
+
+    def flush(self):
+        """Write buffered records as a new shard file."""
+        if not self._pending:
+            return
+        records = np.concatenate(self._pending)
+        iteration = self._pending_iteration
+        self._pending = []
+        self._pending_iteration = None
+        if len(records) == 0:
+            self._apply_window()
+            return
+
+        seq = time.time_ns()
+        filename = f"shard_{iteration:06d}_{seq}_{os.getpid()}.npy"
+        path = os.path.join(self.root, filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, records)
+        os.replace(tmp_path, path)  # Atomic: readers never see partial shards
+
+        self._known.add(path)
+        self._shards.append((iteration, seq, path, np.load(path, mmap_mode='r')))
+        self._shards.sort(key=lambda s: (s[0], s[1]))
+        self._apply_window()
+
+    def _segments(self):
+        """Record arrays in age order: shards, then unflushed records."""
+        return [s[3] for s in self._shards] + self._pending
+
+    def _apply_window(self):
+        """Drop shards outside the iteration window and trim to capacity."""
+        if self.window_iters is not None and self.latest_iteration is not None:
+            min_iteration = self.latest_iteration - self.window_iters + 1
+            while self._shards and self._shards[0][0] < min_iteration:
+                self._evict_oldest()
+
+        total = sum(len(seg) for seg in self._segments())
+        while self._shards and total - len(self._shards[0][3]) >= self.capacity:
+            total -= len(self._shards[0][3])
+            self._evict_oldest()
+
+        lengths = [len(seg) for seg in self._segments()]
+        self._starts = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._skip = max(0, total - self.capacity)
+        self._size = total - self._skip
+
+    def _evict_oldest(self):
+        _, _, path, _ = self._shards.pop(0)
+        self._remove(path)
+
+    def _remove(self, path):
+        if self.delete_evicted:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, offsets):
+        """
+        Fetch records by logical position (0 = oldest in the window).
+
+        Args:
+            offsets: Integer array of positions in [0, len(self))
+
+        Returns:
+            EXAMPLE_DTYPE record array (copied out of the memory maps)
+        """
+        positions = np.asarray(offsets, dtype=np.int64) + self._skip
+        segments = self._segments()
+        seg_ids = np.searchsorted(self._starts, positions, side='right') - 1
+        out = np.empty(len(positions), dtype=EXAMPLE_DTYPE)
+        for seg_id in np.unique(seg_ids):
+            mask = seg_ids == seg_id
+            local = positions[mask] - self._starts[seg_id]
+            # Sorted reads are friendlier to the page cache
+            order = np.argsort(local)
+            rows = np.flatnonzero(mask)[order]
+            out[rows] = segments[seg_id][local[order]]
+        return out
+
+    def sample_offsets(self, batch_size: int):
+        """Draw `batch_size` logical positions (with replacement)."""
+        return sample_offsets(self._size, batch_size, self.recency_bias)
+
+    def sample(self, batch_size: int):
+        """
+        Draw one batch of examples (with replacement).
+
+        Args:
+            batch_size: Number of examples to draw
+
+        Returns:
+            EXAMPLE_DTYPE record array
+        """
+        return self.get(self.sample_offsets(batch_size))
+
+    def iter_batches(self, batch_size: int, num_batches: int):
+        """
+        Yield `num_batches` sampled batches.
+
+        Args:
+            batch_size: Examples per batch
+            num_batches: Number of batches to yield
+        """
+        for _ in range(num_batches):
+            yield self.sample(batch_size)
+
+    def batches_per_epoch(self, batch_size: int) -> int:
+        """Number of batches that cover the window once on average."""
+        return max(1, -(-self._size // batch_size))
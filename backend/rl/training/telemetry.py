@@ -0,0 +1,111 @@
+"""
+Training Iteration Telemetry.
+
+Records wall-clock time per phase of a training iteration (self-play,
+collection, training, checkpoint, evaluation) and the work done in it,
+and derives throughput rates. One JSON record per iteration is appended
+to a metrics file and pushed to the dashboard.
+"""
+import os
+import json
+import time
+from contextlib import contextmanager
+
+PHASES = ('self_play', 'collection', 'training', 'checkpoint', 'evaluation')
+
+
+class IterationTelemetry:
+    """
+    Phase timings and work counters for one training iteration.
+
+    Time is attributed with `with telemetry.phase(name):` or add_time();
+    work with count(). summary() turns both into a JSON-serializable dict.
+    """
+
+    def __init__(self, iteration: int, backend: str):
+        """
+        Args:
+            iteration: Training iteration number
+            backend: Self-play backend name
+        """
+        self.iteration = iteration
+        self.backend = backend
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.phases = {name: 0.0 for name in PHASES}
+        self.counts = {
+            'games': 0,
+            'positions': 0,
+            'mcts_sims': 0,
+            'nn_evals': 0,
+            'train_samples': 0,
+        }
+
+    @contextmanager
+    def phase(self, name: str):
+        """Attribute the wall-clock time of the block to `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float):
+        """Attribute `seconds` to phase `name`."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, **counts):
+        """Add work done, e.g. count(games=1, positions=80)."""
+        for key, n in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def summary(self) -> dict:
+        """
+        Summarize the iteration.
+
+        Self-play rates are per second of self-play time (or of the whole
+        iteration when self-play overlaps training, as in async mode);
+        training samples/sec is per second of training time.
+        """
+        total = time.perf_counter() - self._start
+        play_time = self.phases.get('self_play') or total
+        train_time = self.phases.get('training') or total
+
+        def rate(n, seconds):
+            return n / seconds if seconds > 0 else 0.0
+
+        return {
+            'iteration': self.iteration,
+            'backend': self.backend,
+            'timestamp': self.start_time,
+            'total_s': total,
+            'phases_s': dict(self.phases),
+            'counts': dict(self.counts),
+            'rates': {
+                'games_per_s': rate(self.counts['games'], play_time),
+                'positions_per_s': rate(self.counts['positions'], play_time),
+                'mcts_sims_per_s': rate(self.counts['mcts_sims'], play_time),
+                'nn_evals_per_s': rate(self.counts['nn_evals'], play_time),
+                'train_samples_per_s': rate(self.counts['train_samples'], train_time),
+            },
+        }
+
+
+def append_metrics(path: str, record: dict):
+    """Append one JSON record to an append-only metrics file."""
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"[Telemetry] Failed to write metrics: {e}")
+
+
+def format_summary(summary: dict) -> str:
+    """One-line human-readable summary for the training log."""
+    phases = ", ".join(f"{name}={seconds:.1f}s" for name, seconds in summary['phases_s'].items() if seconds > 0)
+    rates = summary['rates']
+    return (f"[Telemetry] iter {summary['iteration']} ({summary['backend']}): {summary['total_s']:.1f}s [{phases}] "
+            f"games/s={rates['games_per_s']:.2f}, positions/s={rates['positions_per_s']:.1f}, "
+            f"sims/s={rates['mcts_sims_per_s']:.0f}, nn evals/s={rates['nn_evals_per_s']:.0f}, "
+            f"train samples/s={rates['train_samples_per_s']:.0f}")
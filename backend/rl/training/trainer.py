@@ -0,0 +1,379 @@
+"""
+Trainer - AlphaZero Training Core.
+
+One training loop for every self-play backend (see backends.py): the
+replay buffer, optimizer and LR schedule, loss, evaluation, checkpoints
+and dashboard broadcasts all live here, so backends are interchangeable
+and directly comparable.
+"""
+import os
+import time
+import numpy as np
+import torch
+from tqdm import tqdm
+
+from ..utils.checkpoint import save_checkpoint
+from ..workers.local_inference import LocalPredictor
+from .examples import collate_records, mirror_records
+from .dataset import make_batch_loader
+from .replay_buffer import make_replay_buffer
+from .optimization import make_optimizer, make_lr_scheduler, plan_training
+from .logger import GameLogger
+from .broadcast import BroadcastClient
+from .telemetry import IterationTelemetry, append_metrics, format_summary
+
+
+def loss_pi(outputs, targets):
+    """Policy loss (cross-entropy against MCTS visit distribution)."""
+    return -torch.sum(targets * outputs) / targets.size()[0]
+
+
+def loss_v(outputs, targets):
+    """Value loss (MSE)."""
+    return torch.sum((targets.view(-1) - outputs.view(-1)) ** 2) / targets.size()[0]
+
+
+class Trainer:
+    """
+    AlphaZero training loop over a pluggable self-play backend.
+
+    learn() alternates self-play iterations and training; learn_async()
+    keeps an async-capable backend playing while the learner trains.
+    """
+
+    def __init__(self, game_class, model, args, backend):
+        """
+        Initialize trainer.
+
+        Args:
+            game_class: Game class
+            model: Neural network model
+            args: Training configuration dict
+            backend: SelfPlayBackend producing games
+        """
+        self.game_class = game_class
+        self.model = model
+        self.args = args
+        self.backend = backend
+        self.replay_buffer = make_replay_buffer(args)
+        # One optimizer for the trainer's lifetime (state is checkpointed)
+        self.optimizer = make_optimizer(model, args)
+        self.scheduler = make_lr_scheduler(self.optimizer, args)
+        self.logger = GameLogger(args.get('evolution_log_dir', 'data/evolution'),
+                                 compress=args.get('evolution_log_compress', True))
+        self.state_broadcaster = BroadcastClient("/internal/training/state")
+        self.start_iteration = 1
+
+    # ------------------------------------------------------------------
+    # Training loops
+    # ------------------------------------------------------------------
+
+    def learn(self):
+        """Main training loop: self-play, train, checkpoint, evaluate."""
+        num_eps = self.args['num_eps']
+        self.backend.model_version = self.start_iteration - 1
+        try:
+            for i in range(self.start_iteration, self.args['num_iters'] + 1):
+                print(f'\n=== Iteration {i} ({self.backend.name} self-play) ===')
+                self._broadcast_status(i, "self-play", episode=0)
+                telemetry = self._start_telemetry(i)
+                self.backend.start()
+
+                iteration_examples = []
+                play_start = time.perf_counter()
+                games = self.backend.play(i, num_eps)
+                for ep, (examples, record) in enumerate(tqdm(games, total=num_eps, desc="Self Play")):
+                    with telemetry.phase('collection'):
+                        self._record_game(i, record, examples, episode=ep + 1)
+                        iteration_examples.append(examples)
+                    telemetry.count(games=1, positions=len(examples))
+                self.backend.report()
+                # Time spent waiting on the backend, excluding our own bookkeeping
+                telemetry.add_time('self_play', time.perf_counter() - play_start - telemetry.phases['collection'])
+
+                with telemetry.phase('collection'):
+                    new_examples = np.concatenate(iteration_examples)
+                    self.replay_buffer.add(new_examples, iteration=i)
+
+                self._broadcast_status(i, "training_dnn", episode=num_eps)
+                with telemetry.phase('training'):
+                    trained = self.train_network(new_samples=len(new_examples))
+                    if self.scheduler is not None:
+                        self.scheduler.step()
+                    self.backend.publish_weights(self.model, i)
+                telemetry.count(train_samples=trained)
+
+                self._end_iteration(i, telemetry)
+        finally:
+            self.backend.stop()
+            self.logger.flush()
+
+    def learn_async(self):
+        """
+        Asynchronous actor/learner loop.
+
+        Self-play workers keep playing episodes and push finished games into
+        a replay buffer while the learner samples batches and trains. Weights
+        are published to the backend every `publish_interval` steps. The
+        learner pauses whenever it has trained on more than
+        `max_sample_reuse` times the number of generated samples, so data
+        stays fresh. Every `steps_per_iter` learner steps count as one
+        iteration (status broadcast + checkpoint + evaluation).
+        """
+        if not self.backend.supports_async:
+            raise ValueError(f"{self.backend.name} backend does not support async training")
+
+        batch_size = self.args['batch_size']
+        steps_per_iter = self.args.get('steps_per_iter', 100)
+        publish_interval = self.args.get('publish_interval', 10)
+        max_reuse = self.args.get('max_sample_reuse', 4.0)
+        min_replay = self.args.get('min_replay_size', batch_size)
+        # Keep enough episodes queued that no actor waits for work
+        max_in_flight = 2 * self.args['num_workers']
+
+        replay = self.replay_buffer
+        samples_generated = 0
+        samples_trained = 0
+        in_flight = 0
+        iteration = self.start_iteration
+
+        def collect(timeout):
+            nonlocal in_flight, samples_generated
+            wait_start = time.perf_counter()
+            result = self.backend.poll(timeout)
+            telemetry.add_time('waiting', time.perf_counter() - wait_start)
+            while result is not None:
+                in_flight -= 1
+                examples, record = result
+                with telemetry.phase('collection'):
+                    replay.add(examples, iteration=iteration)
+                    self._record_game(iteration, record, examples)
+                samples_generated += len(examples)
+                telemetry.count(games=1, positions=len(examples))
+                wait_start = time.perf_counter()
+                result = self.backend.poll(0.001)
+                telemetry.add_time('waiting', time.perf_counter() - wait_start)
+
+        self.backend.model_version = self.start_iteration - 1
+        try:
+            print(f'\n=== Async training from iteration {iteration} ({self.backend.name} self-play) ===')
+            self._broadcast_status(iteration, "async")
+            self.backend.start()
+            telemetry = self._start_telemetry(iteration)
+            self.model.train()
+            step = 0
+            pi_losses, v_losses = [], []
+            while iteration <= self.args['num_iters']:
+                if in_flight < max_in_flight:
+                    self.backend.submit(iteration, max_in_flight - in_flight)
+                    in_flight = max_in_flight
+
+                # Block for data while the buffer is too small or over-reused
+                starved = (len(replay) < min_replay or
+                           samples_trained + batch_size > max_reuse * samples_generated)
+                collect(timeout=0.5 if starved else 0.001)
+                if starved:
+                    continue
+
+                with telemetry.phase('training'):
+                    batch = replay.sample(batch_size)
+                    if self.args.get('mirror_augment'):
+                        batch = mirror_records(batch)
+                    l_pi, l_v = self._train_step(*collate_records(batch))
+                telemetry.count(train_samples=batch_size)
+                pi_losses.append(l_pi)
+                v_losses.append(l_v)
+                samples_trained += batch_size
+                step += 1
+
+                if step % publish_interval == 0:
+                    self.backend.publish_weights(self.model, iteration)
+
+                if step % steps_per_iter == 0:
+                    print(f"[Iter {iteration}] Loss PI: {np.mean(pi_losses):.4f}, Loss V: {np.mean(v_losses):.4f}, "
+                          f"buffer={len(replay)}, reuse={samples_trained / max(samples_generated, 1):.2f}")
+                    pi_losses, v_losses = [], []
+                    self.backend.publish_weights(self.model, iteration)
+                    self.backend.report()
+                    # Step before the checkpoint, as learn() does, so it stores this iteration's schedule
+                    if self.scheduler is not None:
+                        self.scheduler.step()
+                    self._end_iteration(iteration, telemetry)
+                    self.model.train()
+                    iteration += 1
+                    self._broadcast_status(iteration, "async")
+                    telemetry = self._start_telemetry(iteration)
+        finally:
+            self.backend.stop()
+            self.logger.flush()
+
+    def _end_iteration(self, iteration, telemetry):
+        """Checkpoint (replay shards first, so a resume finds them), evaluate and report telemetry."""
+        with telemetry.phase('checkpoint'):
+            self.logger.flush()
+            self.replay_buffer.flush()
+            self.save_checkpoint(self.args['checkpoint'], f'checkpoint_{iteration}.pth.tar', iteration)
+        print(f"Checkpoint saved: checkpoint_{iteration}.pth.tar")
+
+        eval_interval = self.args.get('eval_interval', 10)
+        if eval_interval and iteration % eval_interval == 0:
+            with telemetry.phase('evaluation'):
+                self.evaluate(iteration)
+
+        self._finish_telemetry(telemetry)
+
+    def _start_telemetry(self, iteration):
+        """Begin timing an iteration."""
+        self._nn_evals_mark = self.backend.nn_evaluations()
+        return IterationTelemetry(iteration, self.backend.name)
+
+    def _finish_telemetry(self, telemetry):
+        """Derive search counters, then log, persist and broadcast the iteration summary."""
+        telemetry.count(mcts_sims=telemetry.counts['positions'] * self.args['num_mcts_sims'],
+                        nn_evals=self.backend.nn_evaluations() - self._nn_evals_mark)
+        summary = telemetry.summary()
+        print(format_summary(summary))
+        append_metrics(os.path.join(self.args.get('metrics_dir', 'data/metrics'), 'training.jsonl'), summary)
+        self._broadcast_telemetry(summary)
+
+    def _record_game(self, iteration, record, examples, episode=None):
+        """Log a finished game to disk and the dashboard."""
+        self.logger.log_game(iteration, record)
+        self._broadcast_game_result(record, len(record.get('moves', [])), iteration)
+        if episode is not None:
+            self._broadcast_episode(episode)
+
+    # ------------------------------------------------------------------
+    # Network training
+    # ------------------------------------------------------------------
+
+    def train_network(self, new_samples=0):
+        """
+        Train neural network on batches sampled from the replay buffer.
+
+        Args:
+            new_samples: Examples added since the last call (for the
+                'target_sample_reuse' step budget)
+
+        Returns:
+            Number of samples trained on
+        """
+        num_passes, num_batches = plan_training(self.args, len(self.replay_buffer), new_samples)
+
+        self.model.train()
+        trained = 0
+        for epoch in range(num_passes):
+            print(f'EPOCH {epoch + 1}:')
+            pi_losses, v_losses = [], []
+
+            loader = make_batch_loader(self.replay_buffer, self.args['batch_size'], num_batches,
+                                       num_workers=self.args.get('loader_workers', 0),
+                                       pin_memory=self.args['cuda'],
+                                       mirror_prob=0.5 if self.args.get('mirror_augment') else 0.0)
+            for boards, pis, vs in tqdm(loader, desc="Training"):
+                l_pi, l_v = self._train_step(boards, pis, vs)
+                pi_losses.append(l_pi)
+                v_losses.append(l_v)
+                trained += len(boards)
+
+            print(f'Loss PI: {np.mean(pi_losses):.4f}, Loss V: {np.mean(v_losses):.4f}')
+        return trained
+
+    def _train_step(self, boards, pis, vs):
+        """
+        Run one gradient step on a collated batch.
+
+        Returns:
+            Tuple of (policy_loss, value_loss) as floats
+        """
+        if self.args['cuda']:
+            boards, pis, vs = (t.cuda(non_blocking=True) for t in (boards, pis, vs))
+
+        out_pi, out_v = self.model(boards)
+        l_pi = loss_pi(out_pi, pis)
+        l_v = loss_v(out_v, vs)
+        total_loss = l_pi + l_v
+
+        self.optimizer.zero_grad()
+        total_loss.backward()
+        self.optimizer.step()
+        return l_pi.item(), l_v.item()
+
+    # ------------------------------------------------------------------
+    # Evaluation and checkpoints
+    # ------------------------------------------------------------------
+
+    def evaluate(self, iteration):
+        """Evaluate the current model against MinimaxPlayer."""
+        from ..evaluation.arena import Arena
+        from ..evaluation.players import AlphaZeroPlayer, MinimaxPlayer
+
+        print(f"\n=== Evaluation at Iteration {iteration} ===")
+        game = self.game_class()
+        num_games = self.args.get('eval_games', 10)
+
+        az_player = AlphaZeroPlayer(game, LocalPredictor(self.model), self.args, temp=0)
+        minimax_player = MinimaxPlayer(game, depth=self.args.get('eval_depth', 2))
+
+        arena = Arena(az_player, minimax_player, game)
+        az_wins, mm_wins, draws = arena.play_games(num_games, verbose=False)
+
+        print(f"AlphaZero vs Minimax: {az_wins} wins, {mm_wins} losses, {draws} draws")
+        win_rate = az_wins / float(num_games)
+        print(f"Win Rate: {win_rate * 100:.1f}%")
+
+        self.state_broadcaster.broadcast({
+            "eval_result": {
+                "iteration": iteration,
+                "az_wins": az_wins,
+                "mm_wins": mm_wins,
+                "draws": draws,
+                "win_rate": win_rate
+            }
+        })
+
+    def save_checkpoint(self, folder, filename, iteration):
+        """Save model, optimizer and LR schedule checkpoint."""
+        save_checkpoint(folder, filename, self.model.state_dict(),
+                        optimizer_state=self.optimizer.state_dict(), iteration=iteration,
+                        scheduler_state=self.scheduler.state_dict() if self.scheduler else None)
+
+    # ------------------------------------------------------------------
+    # Dashboard broadcasts (queued; never block the training loop)
+    # ------------------------------------------------------------------
+
+    def _broadcast_status(self, iteration, status, episode=None):
+        """Broadcast training status."""
+        state = {
+            "iteration": iteration,
+            "total_episodes": self.args['num_eps'],
+            "status": status
+        }
+        if episode is not None:
+            state["episode"] = episode
+        self.state_broadcaster.broadcast(state)
+
+    def _broadcast_episode(self, episode):
+        """Broadcast episode progress."""
+        self.state_broadcaster.broadcast({"episode": episode})
+
+    def _broadcast_game_result(self, game_record, steps, iteration):
+        """Broadcast game result to server for Dashboard display."""
+        self.state_broadcaster.broadcast({
+            "history_update": {
+                "id": game_record.get("game_id", "unknown")[:8],
+                "winner": game_record.get("winner", 0),
+                "steps": steps,
+                "timestamp": int(time.time()),
+                "episode": iteration
+            }
+        })
+
+    def _on_inference_metrics(self, report):
+        """Forward a prediction server metrics report to the dashboard."""
+        # Called from the server thread; only the latest report matters
+        self.state_broadcaster.broadcast({"inference": report}, key="inference")
+
+    def _broadcast_telemetry(self, summary):
+        """Broadcast iteration timing and throughput to server."""
+        self.state_broadcaster.broadcast({"telemetry": summary})
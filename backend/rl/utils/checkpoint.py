@@ -11,7 +11,8 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def save_checkpoint(folder: str, filename: str, state_dict, optimizer_state=None, iteration=None):
+def save_checkpoint(folder: str, filename: str, state_dict, optimizer_state=None, iteration=None,
+                    scheduler_state=None):
     """
     Save a model checkpoint.
     
@@ -21,6 +22,7 @@ def save_checkpoint(folder: str, filename: str, state_dict, optimizer_state=None
         state_dict: Model state dictionary
         optimizer_state: Optional optimizer state
         iteration: Optional iteration number
+        scheduler_state: Optional LR scheduler state
     """
     filepath = os.path.join(folder, filename)
     if not os.path.exists(folder):
@@ -32,19 +34,22 @@ def save_checkpoint(folder: str, filename: str, state_dict, optimizer_state=None
     }
     if optimizer_state is not None:
         checkpoint['optimizer'] = optimizer_state
+    if scheduler_state is not None:
+        checkpoint['scheduler'] = scheduler_state
         
     torch.save(checkpoint, filepath)
     logger.info(f"Checkpoint saved: {filepath}")
 
 
-def load_checkpoint(filepath: str, model, optimizer=None) -> int:
+def load_checkpoint(filepath: str, model, optimizer=None, scheduler=None) -> int:
     """
-    Load a checkpoint into a model (and optionally an optimizer).
+    Load a checkpoint into a model (and optionally an optimizer and LR scheduler).
     
     Args:
         filepath: Path to checkpoint file
         model: Model to load weights into
         optimizer: Optional optimizer to load state into
+        scheduler: Optional LR scheduler to load state into
         
     Returns:
         Iteration number from the checkpoint, or 0 if not found
@@ -53,11 +58,13 @@ def load_checkpoint(filepath: str, model, optimizer=None) -> int:
         logger.warning(f"Checkpoint not found: {filepath}")
         return 0
         
-    checkpoint = torch.load(filepath)
+    checkpoint = torch.load(filepath, map_location='cpu')
     model.load_state_dict(checkpoint['state_dict'])
     
     if optimizer is not None and 'optimizer' in checkpoint:
         optimizer.load_state_dict(checkpoint['optimizer'])
+    if scheduler is not None and 'scheduler' in checkpoint:
+        scheduler.load_state_dict(checkpoint['scheduler'])
         
     iteration = checkpoint.get('iteration', 0)
     logger.info(f"Checkpoint loaded: {filepath} (iteration {iteration})")
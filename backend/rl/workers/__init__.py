@@ -4,7 +4,12 @@ Classes:
     - PredictionServer: Batched GPU inference server
     - PredictionClient: Client for prediction requests
     - SelfPlayWorker: Self-play worker process
+    - SelfPlayPool: Persistent self-play worker pool fed by a job queue
+    - FixedBatchPolicy, AdaptiveBatchPolicy: Prediction server batching policies
+    - ServerMetrics, Histogram: Prediction server instrumentation
+    - LocalPredictor, LockstepPredictor: In-process inference for self-play
 
 Functions:
-    - run_worker: Entry point for worker process
+    - run_worker: Entry point for long-lived worker processes
+    - make_batch_policy: Build a batching policy from config
 """
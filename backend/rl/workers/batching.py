@@ -0,0 +1,244 @@
+"""
+Batching Policies for the Prediction Server.
+
+Decide how many requests the prediction server should wait for and how
+long it may wait before running a batch through the network.
+"""
+
+
+class FixedBatchPolicy:
+    """
+    Static policy: always wait for `batch_size` requests or `timeout` seconds.
+
+    This is the historical behavior of PredictionServer.
+    """
+
+    mode = 'fixed'
+
+    def __init__(self, batch_size: int = 32, timeout: float = 0.05):
+        """
+        Initialize fixed policy.
+
+        Args:
+            batch_size: Maximum batch size for inference
+            timeout: Maximum time to wait for more requests
+        """
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def next_window(self):
+        """Return (max_batch_size, timeout) for the next collection window."""
+        return self.batch_size, self.timeout
+
+    def record_arrivals(self, enqueue_times, collect_time):
+        """Fixed policy ignores observations."""
+        pass
+
+    def record_cycle(self, num_requests, collect_time, infer_time):
+        """Fixed policy ignores observations."""
+        pass
+
+    def metrics(self) -> dict:
+        """Current decisions of the policy."""
+        return {
+            'mode': self.mode,
+            'batch_size': self.batch_size,
+            'timeout_ms': self.timeout * 1000.0,
+        }
+
+
+class AdaptiveBatchPolicy:
+    """
+    Sizes batches and wait windows from observed traffic.
+
+    Tracks the request arrival rate (from the requests' enqueue times, so
+    a backlog shows up even though batches are capped) and the inference
+    latency per batch size, then picks the next collection window:
+
+    - 'latency': largest batch whose expected fill time plus inference
+      time stays within `latency_target`.
+    - 'throughput': batch size that maximizes requests served per second
+      of server time (fill time + inference time).
+    """
+
+    MODES = ('latency', 'throughput')
+
+    def __init__(
+        self,
+        max_batch_size: int = 32,
+        mode: str = 'latency',
+        latency_target: float = 0.01,
+        min_timeout: float = 0.0005,
+        max_timeout: float = 0.05,
+        smoothing: float = 0.2
+    ):
+        """
+        Initialize adaptive policy.
+
+        Args:
+            max_batch_size: Upper bound on batch size (e.g. number of workers)
+            mode: 'latency' or 'throughput'
+            latency_target: Target time per request in seconds (latency mode)
+            min_timeout: Lower bound on the wait window in seconds
+            max_timeout: Upper bound on the wait window in seconds
+            smoothing: EWMA factor for rate and latency estimates
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown batching mode: {mode}")
+        self.mode = mode
+        self.max_batch_size = max(1, max_batch_size)
+        self.latency_target = latency_target
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.smoothing = smoothing
+
+        self.arrival_rate = 0.0  # Requests per second
+        self.latency = {}        # Batch size -> EWMA inference seconds
+        self._last_arrival = None  # Latest enqueue time seen
+
+        # Start optimistic: full batch, max wait, until we have data
+        self.batch_size = self.max_batch_size
+        self.timeout = self.max_timeout
+
+    def next_window(self):
+        """Return (max_batch_size, timeout) for the next collection window."""
+        return self.batch_size, self.timeout
+
+    def record_arrivals(self, enqueue_times, collect_time):
+        """
+        Feed the requests of one collection window into the arrival rate.
+
+        The rate is taken from the enqueue times (requests per second of
+        arrival time since the latest request already seen), not from how
+        fast this server drained them.
+
+        Args:
+            enqueue_times: Enqueue timestamps of the collected requests
+            collect_time: Seconds the window waited
+        """
+        if not enqueue_times:
+            if collect_time > 0:
+                self._ewma_rate(0.0)  # A whole window without arrivals
+                self._plan()
+            return
+        latest = max(enqueue_times)
+        if self._last_arrival is None:
+            count, span = len(enqueue_times) - 1, latest - min(enqueue_times)
+        else:
+            count, span = len(enqueue_times), latest - self._last_arrival
+        if count > 0 and span > 0:
+            self._ewma_rate(count / span)
+        self._last_arrival = latest if self._last_arrival is None else max(latest, self._last_arrival)
+        self._plan()
+
+    def record_cycle(self, num_requests, collect_time, infer_time):
+        """
+        Feed one inference run into the latency estimates and re-plan.
+
+        Args:
+            num_requests: Requests served in this cycle
+            collect_time: Seconds spent collecting the batch
+            infer_time: Seconds spent in inference (0 if nothing ran)
+        """
+        if num_requests > 0 and infer_time > 0:
+            prev = self.latency.get(num_requests)
+            self.latency[num_requests] = infer_time if prev is None else (
+                prev + self.smoothing * (infer_time - prev)
+            )
+        self._plan()
+
+    def _ewma_rate(self, rate):
+        if self.arrival_rate == 0.0:
+            self.arrival_rate = rate
+        else:
+            self.arrival_rate += self.smoothing * (rate - self.arrival_rate)
+
+    def estimate_latency(self, batch_size):
+        """
+        Estimate inference time for a batch size.
+
+        Uses the measured value if available, otherwise a least-squares
+        fit of `fixed + per_item * batch_size` over measured sizes.
+        """
+        if batch_size in self.latency:
+            return self.latency[batch_size]
+        if not self.latency:
+            return 0.0
+        if len(self.latency) == 1:
+            # Assume fixed-cost dominated until a second size is measured;
+            # this favors trying larger batches, which then get measured
+            return next(iter(self.latency.values()))
+
+        sizes = list(self.latency.keys())
+        lats = list(self.latency.values())
+        n = len(sizes)
+        mean_s = sum(sizes) / n
+        mean_l = sum(lats) / n
+        var = sum((s - mean_s) ** 2 for s in sizes)
+        if var == 0:
+            return mean_l
+        per_item = sum((s - mean_s) * (l - mean_l) for s, l in zip(sizes, lats)) / var
+        per_item = max(per_item, 0.0)
+        fixed = max(mean_l - per_item * mean_s, 0.0)
+        return fixed + per_item * batch_size
+
+    def _fill_time(self, batch_size):
+        """Expected seconds to accumulate `batch_size` requests."""
+        if self.arrival_rate <= 0:
+            return self.max_timeout
+        return (batch_size - 1) / self.arrival_rate
+
+    def _plan(self):
+        best_size = 1
+        if self.mode == 'latency':
+            for b in range(1, self.max_batch_size + 1):
+                if self._fill_time(b) + self.estimate_latency(b) <= self.latency_target:
+                    best_size = b
+        else:
+            best_rate = -1.0
+            for b in range(1, self.max_batch_size + 1):
+                cost = self._fill_time(b) + self.estimate_latency(b)
+                rate = b / cost if cost > 0 else float('inf')
+                if rate > best_rate:
+                    best_rate = rate
+                    best_size = b
+
+        # Allow some slack over the expected fill time for jitter
+        timeout = 1.5 * self._fill_time(best_size)
+        if self.mode == 'latency':
+            timeout = min(timeout, max(self.latency_target - self.estimate_latency(best_size), 0.0))
+
+        self.batch_size = best_size
+        self.timeout = min(max(timeout, self.min_timeout), self.max_timeout)
+
+    def metrics(self) -> dict:
+        """Current decisions and estimates of the policy."""
+        return {
+            'mode': self.mode,
+            'batch_size': self.batch_size,
+            'timeout_ms': self.timeout * 1000.0,
+            'arrival_rate': self.arrival_rate,
+            'latency_target_ms': self.latency_target * 1000.0,
+            'expected_latency_ms': self.estimate_latency(self.batch_size) * 1000.0,
+        }
+
+
+def make_batch_policy(args, max_batch_size):
+    """
+    Build a batching policy from a training config dict.
+
+    Args:
+        args: Training configuration dict ('batch_policy', 'latency_target_ms')
+        max_batch_size: Upper bound on batch size
+
+    Returns:
+        FixedBatchPolicy or AdaptiveBatchPolicy
+    """
+    mode = args.get('batch_policy', 'fixed')
+    if mode == 'fixed':
+        return FixedBatchPolicy(batch_size=max_batch_size, timeout=0.05)
+    return AdaptiveBatchPolicy(
+        max_batch_size=max_batch_size,
+        mode=mode,
+        latency_target=args.get('latency_target_ms', 10.0) / 1000.0
+    )
@@ -0,0 +1,119 @@
+"""
+In-Process Inference for Self-Play.
+
+LocalPredictor evaluates one position at a time on the trainer's model.
+LockstepPredictor is shared by several games played in threads of one
+process: every game submits its next leaf and a single batched forward
+pass answers all of them, so the network always sees full batches
+without worker processes or queues.
+"""
+import threading
+import numpy as np
+import torch
+
+
+def _model_device(model):
+    return next(model.parameters()).device
+
+
+class LocalPredictor:
+    """Single-position inference on an in-process model."""
+
+    def __init__(self, model):
+        """
+        Args:
+            model: Neural network model (used on whatever device it lives on)
+        """
+        self.model = model
+        self.requests = 0
+
+    def predict(self, board_tensor):
+        """
+        Evaluate one position.
+
+        Args:
+            board_tensor: Board state array of shape (14, 10, 9)
+
+        Returns:
+            Tuple of (policy_probs, value)
+        """
+        self.model.eval()
+        with torch.no_grad():
+            x = torch.from_numpy(np.asarray(board_tensor, dtype=np.float32)).unsqueeze(0)
+            log_pi, v = self.model(x.to(_model_device(self.model)))
+        self.requests += 1
+        return torch.exp(log_pi).cpu().numpy()[0], v.cpu().numpy()[0][0]
+
+
+class LockstepPredictor:
+    """
+    Batches leaf evaluations of games running in lock-step threads.
+
+    Each game thread calls join() before playing and leave() when done.
+    predict() blocks until every joined game has a pending request, then
+    one thread runs the whole batch and wakes the others.
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+            model: Neural network model (used on whatever device it lives on)
+        """
+        self.model = model
+        self._cond = threading.Condition()
+        self._active = 0
+        self._pending = []   # [(ticket, board_tensor)]
+        self._results = {}   # ticket -> (policy, value)
+        self._next_ticket = 0
+        self.batches = 0
+        self.requests = 0
+
+    def join(self):
+        """Register a game thread."""
+        with self._cond:
+            self._active += 1
+
+    def leave(self):
+        """Unregister a finished game thread."""
+        with self._cond:
+            self._active -= 1
+            self._maybe_run()
+
+    def predict(self, board_tensor):
+        """
+        Evaluate one position as part of the next lock-step batch.
+
+        Args:
+            board_tensor: Board state array of shape (14, 10, 9)
+
+        Returns:
+            Tuple of (policy_probs, value)
+        """
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._pending.append((ticket, board_tensor))
+            self._maybe_run()
+            while ticket not in self._results:
+                self._cond.wait()
+            return self._results.pop(ticket)
+
+    def _maybe_run(self):
+        """Run the pending batch once every active game is waiting (lock held)."""
+        if not self._pending or len(self._pending) < self._active:
+            return
+        tickets, boards = zip(*self._pending)
+        self._pending = []
+
+        self.model.eval()
+        with torch.no_grad():
+            x = torch.from_numpy(np.stack(boards).astype(np.float32))
+            log_pi, v = self.model(x.to(_model_device(self.model)))
+        policies = torch.exp(log_pi).cpu().numpy()
+        values = v.cpu().numpy()[:, 0]
+
+        for i, ticket in enumerate(tickets):
+            self._results[ticket] = (policies[i], values[i])
+        self.batches += 1
+        self.requests += len(tickets)
+        self._cond.notify_all()
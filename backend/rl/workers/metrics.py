@@ -0,0 +1,150 @@
+"""
+Prediction Server Metrics.
+
+Fixed-bucket histograms and per-worker request counters used to see
+whether self-play is bound by inference or by tree search.
+"""
+import bisect
+import threading
+import time
+
+
+def exponential_buckets(start: float, factor: float, count: int):
+    """Return `count` bucket upper bounds: start, start*factor, ..."""
+    return [start * factor ** i for i in range(count)]
+
+
+class Histogram:
+    """
+    Histogram with fixed upper bucket bounds.
+
+    Values above the last bound land in an overflow bucket.
+    """
+
+    def __init__(self, bounds):
+        """
+        Initialize histogram.
+
+        Args:
+            bounds: Sorted list of bucket upper bounds
+        """
+        self.bounds = list(bounds)
+        self.reset()
+
+    def reset(self):
+        """Clear all observations."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float):
+        """
+        Approximate percentile (bucket upper bound containing it).
+
+        Args:
+            q: Quantile in [0, 1]
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target and c > 0:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Summary and bucket counts as a JSON-serializable dict."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'buckets': self.bounds,
+            'counts': self.counts,
+        }
+
+
+class ServerMetrics:
+    """
+    Metrics collected by PredictionServer over a reporting interval.
+
+    Tracks batch size, request queue wait, inference latency and response
+    dispatch time histograms, plus per-worker request counts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batch_size = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_ms = Histogram(exponential_buckets(0.1, 2, 14))
+        self.inference_ms = Histogram(exponential_buckets(0.25, 2, 12))
+        self.dispatch_ms = Histogram(exponential_buckets(0.01, 2, 12))
+        self.worker_requests = {}
+        self.interval_start = time.time()
+        self.total_requests = 0  # Lifetime count, never reset
+
+    def record_batch(self, worker_ids, queue_waits, inference_time, dispatch_time):
+        """
+        Record one served batch.
+
+        Args:
+            worker_ids: Worker id of each request in the batch
+            queue_waits: Seconds each request spent queued before inference
+            inference_time: Seconds spent in the model forward pass
+            dispatch_time: Seconds spent putting results on response queues
+        """
+        with self._lock:
+            self.batch_size.observe(len(worker_ids))
+            for wait in queue_waits:
+                self.queue_wait_ms.observe(wait * 1000.0)
+            self.inference_ms.observe(inference_time * 1000.0)
+            self.dispatch_ms.observe(dispatch_time * 1000.0)
+            for worker_id in worker_ids:
+                self.worker_requests[worker_id] = self.worker_requests.get(worker_id, 0) + 1
+            self.total_requests += len(worker_ids)
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        Summarize the current interval.
+
+        Args:
+            reset: Start a new interval after taking the snapshot
+
+        Returns:
+            Dict with histograms and per-worker request rates (req/s)
+        """
+        with self._lock:
+            now = time.time()
+            elapsed = max(now - self.interval_start, 1e-9)
+            snap = {
+                'timestamp': now,
+                'interval_s': elapsed,
+                'requests': self.queue_wait_ms.count,
+                'batch_size': self.batch_size.snapshot(),
+                'queue_wait_ms': self.queue_wait_ms.snapshot(),
+                'inference_ms': self.inference_ms.snapshot(),
+                'dispatch_ms': self.dispatch_ms.snapshot(),
+                'worker_rates': {
+                    str(w): n / elapsed for w, n in self.worker_requests.items()
+                },
+            }
+            if reset:
+                for hist in (self.batch_size, self.queue_wait_ms, self.inference_ms, self.dispatch_ms):
+                    hist.reset()
+                self.worker_requests = {}
+                self.interval_start = now
+        return snap
@@ -0,0 +1,93 @@
+"""
+Persistent Self-Play Worker Pool.
+
+Keeps worker processes alive across training iterations and feeds them
+episodes through a shared job queue.
+"""
+import queue
+from multiprocessing import Process, Queue
+
+from .self_play import run_worker
+
+
+class SelfPlayPool:
+    """
+    Pool of long-lived self-play worker processes.
+
+    Episodes are queued one job each; idle workers pull the next job as
+    soon as they finish, so the exact number of episodes is played and no
+    worker sits idle while another finishes a long game.
+    """
+
+    def __init__(self, game_class, args, request_queue, response_queues):
+        """
+        Initialize worker pool.
+
+        Args:
+            game_class: Game class (instantiated inside each worker)
+            args: Training configuration dict
+            request_queue: Prediction server request queue
+            response_queues: Dict worker_id -> prediction response queue
+        """
+        self.game_class = game_class
+        self.args = args
+        self.request_queue = request_queue
+        self.response_queues = response_queues
+        self.job_queue = Queue()
+        self.result_queue = Queue()
+        self.processes = []
+
+    def start(self):
+        """Spawn one worker process per response queue."""
+        for worker_id, response_queue in self.response_queues.items():
+            p = Process(
+                target=run_worker,
+                args=(worker_id, self.game_class, self.args, self.request_queue,
+                      response_queue, self.job_queue, self.result_queue),
+                daemon=True
+            )
+            p.start()
+            self.processes.append(p)
+
+    def submit(self, iteration, num_episodes):
+        """
+        Queue episodes for the given iteration.
+
+        Args:
+            iteration: Training iteration the episodes belong to
+            num_episodes: Number of episodes to play
+        """
+        for episode in range(num_episodes):
+            self.job_queue.put((iteration, episode))
+
+    def get_result(self, timeout: float = None):
+        """
+        Wait for the next finished episode.
+
+        Args:
+            timeout: Seconds to wait (None = until a result arrives)
+
+        Returns:
+            Tuple of (worker_id, examples, game_record), or None on timeout
+
+        Raises:
+            RuntimeError: If every worker process has died
+        """
+        while True:
+            try:
+                return self.result_queue.get(timeout=1.0 if timeout is None else timeout)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.processes):
+                    raise RuntimeError("All self-play workers have exited")
+                if timeout is not None:
+                    return None
+
+    def stop(self):
+        """Ask workers to exit and wait for them."""
+        for _ in self.processes:
+            self.job_queue.put(None)
+        for p in self.processes:
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
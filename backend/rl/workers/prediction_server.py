@@ -2,14 +2,26 @@
 Prediction Server for Batched GPU Inference.
 
 Collects inference requests from multiple workers and batches them
-for efficient GPU utilization.
+for efficient GPU utilization. On CPU-only hosts, batches can be spread
+over several model replicas running in parallel inference threads.
+
+The server is meant to be long-lived: new weights can be pushed with
+update_weights() (or handed off as a checkpoint file) and are picked up
+between batches. Every response is tagged with the model version used.
 """
+import os
+import copy
+import json
+import queue
 import torch
 import numpy as np
 from multiprocessing import Queue
 import time
 import threading
 
+from .batching import FixedBatchPolicy
+from .metrics import ServerMetrics
+
 
 class PredictionServer:
     """
@@ -17,7 +29,10 @@ class PredictionServer:
     and sends results back.
     """
     
-    def __init__(self, model, game, batch_size: int = 32, timeout: float = 0.05):
+    def __init__(self, model, game, batch_size: int = 32, timeout: float = 0.05, batch_policy=None,
+                 num_replicas: int = 1, intra_op_threads: int = 0,
+                 metrics_interval: float = 5.0, metrics_log: str = None, on_metrics=None,
+                 model_version: int = 0):
         """
         Initialize prediction server.
         
@@ -26,29 +41,142 @@ class PredictionServer:
             game: Game instance
             batch_size: Maximum batch size for inference
             timeout: Maximum time to wait for more requests
+            batch_policy: Optional batching policy (see workers/batching.py).
+                Defaults to a fixed policy built from batch_size and timeout.
+            num_replicas: Number of model replicas / inference threads.
+                Only used on CPU; a CUDA model always runs a single replica.
+            intra_op_threads: Torch intra-op threads for inference
+                (0 = split the available cores evenly between replicas)
+            metrics_interval: Seconds between metrics reports
+            metrics_log: Optional JSONL file to append each metrics report to
+            on_metrics: Optional callable(report) invoked with each report
+            model_version: Version number of the initial weights
         """
         self.model = model
         self.game = game
         self.batch_size = batch_size
         self.timeout = timeout
+        self.batch_policy = batch_policy or FixedBatchPolicy(batch_size, timeout)
         self.running = False
+
+        is_cuda = next(self.model.parameters()).is_cuda
+        self.num_replicas = 1 if is_cuda else max(1, num_replicas)
+        self.intra_op_threads = intra_op_threads
+        self.replicas = [self.model]
+        self.replica_threads = []
+        self._policy_lock = threading.Lock()
+        self._prev_num_threads = None
+
+        self.metrics = ServerMetrics()
+        self.metrics_interval = metrics_interval
+        self.metrics_log = metrics_log
+        self.on_metrics = on_metrics
+        self.last_report = None
+        self._last_report_time = time.time()
+
+        # Hot-swappable weights: (sequence, version, state_dict) staged by
+        # update_weights(). The sequence number grows with every staging, so
+        # republishing under the same version still reaches the replicas.
+        self.model_version = model_version
+        self._weights_lock = threading.Lock()
+        self._weights_seq = 0
+        self._pending_weights = None
+        self._replica_versions = {id(self.model): (0, model_version)}
         
         # Queues for communication
         self.request_queue = Queue()
         self.response_queues = {}
+        # Collected batch waiting for a free replica
+        self.batch_queue = queue.Queue(maxsize=1)
         
     def start(self):
         """Start the prediction server in a background thread."""
         self.running = True
+        if self.num_replicas > 1:
+            self._start_replicas()
         self.thread = threading.Thread(target=self._serve_loop, daemon=True)
         self.thread.start()
+
+    def _start_replicas(self):
+        """Create CPU model replicas and one inference thread per replica."""
+        threads = self.intra_op_threads or max(1, (os.cpu_count() or 1) // self.num_replicas)
+        # Intra-op thread count is process-wide in torch; restore it on stop
+        self._prev_num_threads = torch.get_num_threads()
+        torch.set_num_threads(threads)
+
+        self.replicas = [self.model] + [
+            copy.deepcopy(self.model) for _ in range(self.num_replicas - 1)
+        ]
+        for replica in self.replicas:
+            replica.eval()
+            self._replica_versions.setdefault(id(replica), self._replica_versions[id(self.model)])
+        self.replica_threads = []
+        for replica in self.replicas:
+            t = threading.Thread(target=self._replica_loop, args=(replica,), daemon=True)
+            t.start()
+            self.replica_threads.append(t)
         
     def stop(self):
         """Stop the prediction server."""
         self.running = False
         if hasattr(self, 'thread'):
             self.thread.join(timeout=1.0)
+        for t in self.replica_threads:
+            t.join(timeout=1.0)
+        self.replica_threads = []
+        if self._prev_num_threads is not None:
+            torch.set_num_threads(self._prev_num_threads)
+            self._prev_num_threads = None
+        self.report_metrics()
             
+    def update_weights(self, state_dict, version: int = None) -> int:
+        """
+        Stage new model weights; each replica loads them before its next batch.
+
+        Args:
+            state_dict: Model state dictionary (copied, so the caller may keep training)
+            version: Version number to tag responses with (default: current + 1)
+
+        Returns:
+            The version number assigned to these weights
+        """
+        weights = {k: v.detach().clone() for k, v in state_dict.items()}
+        with self._weights_lock:
+            if version is None:
+                version = self.model_version + 1
+            self._weights_seq += 1
+            self._pending_weights = (self._weights_seq, version, weights)
+            self.model_version = version
+        return version
+
+    def load_weights_file(self, filepath: str, version: int = None) -> int:
+        """
+        Stage weights from a checkpoint file (file handoff between processes).
+
+        Args:
+            filepath: Checkpoint written by save_checkpoint / torch.save
+            version: Version number (default: the checkpoint's iteration)
+
+        Returns:
+            The version number assigned to these weights
+        """
+        device = next(self.model.parameters()).device
+        checkpoint = torch.load(filepath, map_location=device)
+        state_dict = checkpoint.get('state_dict', checkpoint)
+        if version is None:
+            version = checkpoint.get('iteration')
+        return self.update_weights(state_dict, version)
+
+    def _sync_weights(self, model) -> int:
+        """Load staged weights into `model` if it is behind; return its version."""
+        with self._weights_lock:
+            pending = self._pending_weights
+        key = id(model)
+        if pending is not None and self._replica_versions.get(key, (None,))[0] != pending[0]:
+            model.load_state_dict(pending[2])
+            self._replica_versions[key] = pending[:2]
+        return self._replica_versions[key][1]
+
     def register_worker(self, worker_id):
         """
         Register a worker and return its response queue.
@@ -73,22 +201,63 @@ class PredictionServer:
             board_tensor: Board state tensor
             
         Returns:
-            Tuple of (policy, value)
+            Tuple of (policy, value, model_version)
         """
-        self.request_queue.put((worker_id, board_tensor))
+        self.request_queue.put((worker_id, board_tensor, time.time()))
         response_queue = self.response_queues[worker_id]
         return response_queue.get()
+
+    def get_metrics(self, reset: bool = False):
+        """
+        Return batching decisions and histograms for the current interval.
+
+        Args:
+            reset: Start a new metrics interval afterwards
+        """
+        with self._policy_lock:
+            batching = self.batch_policy.metrics()
+        batching['replicas'] = self.num_replicas
+        report = self.metrics.snapshot(reset=reset)
+        report['batching'] = batching
+        return report
+
+    def report_metrics(self):
+        """Close the current metrics interval: log it and notify the trainer."""
+        report = self.get_metrics(reset=True)
+        self.last_report = report
+        self._last_report_time = time.time()
+        if report['requests'] == 0:
+            return report
+
+        if self.metrics_log:
+            try:
+                os.makedirs(os.path.dirname(self.metrics_log) or '.', exist_ok=True)
+                with open(self.metrics_log, 'a') as f:
+                    f.write(json.dumps(report) + "\n")
+            except OSError as e:
+                print(f"[PredictionServer] Failed to write metrics: {e}")
+        if self.on_metrics:
+            try:
+                self.on_metrics(report)
+            except Exception as e:
+                print(f"[PredictionServer] Metrics callback failed: {e}")
+        return report
         
     def _serve_loop(self):
         """Main loop: collect requests, batch, infer, distribute."""
         while self.running:
+            if time.time() - self._last_report_time >= self.metrics_interval:
+                self.report_metrics()
+
             requests = []
             start_time = time.time()
+            with self._policy_lock:
+                batch_size, timeout = self.batch_policy.next_window()
             
             # Collect requests until batch full or timeout
-            while len(requests) < self.batch_size:
+            while len(requests) < batch_size:
                 elapsed = time.time() - start_time
-                remaining = self.timeout - elapsed
+                remaining = timeout - elapsed
                 
                 if remaining <= 0:
                     break
@@ -100,29 +269,66 @@ class PredictionServer:
                 except:
                     break
                     
+            collect_time = time.time() - start_time
+            with self._policy_lock:
+                self.batch_policy.record_arrivals([r[2] for r in requests], collect_time)
             if not requests:
                 continue
-                
-            # Batch inference
-            worker_ids = [r[0] for r in requests]
-            tensors = [r[1] for r in requests]
+
+            if self.num_replicas > 1:
+                # Hand off to whichever replica is free; blocks while all
+                # are busy, letting the next batch grow in the meantime
+                while self.running:
+                    try:
+                        self.batch_queue.put((requests, collect_time), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+            else:
+                self._run_batch(self.model, requests, collect_time)
+
+    def _replica_loop(self, replica):
+        """Inference thread: run batches on one model replica."""
+        while self.running:
+            try:
+                requests, collect_time = self.batch_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._run_batch(replica, requests, collect_time)
+
+    def _run_batch(self, model, requests, collect_time):
+        """Run one batch through `model` and distribute the results."""
+        version = self._sync_weights(model)
+        infer_start = time.time()
+        worker_ids = [r[0] for r in requests]
+        tensors = [r[1] for r in requests]
+        queue_waits = [infer_start - r[2] for r in requests]
+        
+        batch = np.stack(tensors)
+        batch_tensor = torch.FloatTensor(batch)
+        
+        if next(model.parameters()).is_cuda:
+            batch_tensor = batch_tensor.cuda()
             
-            batch = np.stack(tensors)
-            batch_tensor = torch.FloatTensor(batch)
+        with torch.no_grad():
+            policies, values = model(batch_tensor)
+            policies = policies.cpu().numpy()
+            values = values.cpu().numpy()
+        dispatch_start = time.time()
+        inference_time = dispatch_start - infer_start
+        self._record_cycle(len(requests), collect_time, inference_time)
             
-            if next(self.model.parameters()).is_cuda:
-                batch_tensor = batch_tensor.cuda()
-                
-            with torch.no_grad():
-                policies, values = self.model(batch_tensor)
-                policies = policies.cpu().numpy()
-                values = values.cpu().numpy()
-                
-            # Distribute results
-            for i, worker_id in enumerate(worker_ids):
-                result = (policies[i], values[i][0])
-                if worker_id in self.response_queues:
-                    self.response_queues[worker_id].put(result)
+        # Distribute results
+        for i, worker_id in enumerate(worker_ids):
+            result = (policies[i], values[i][0], version)
+            if worker_id in self.response_queues:
+                self.response_queues[worker_id].put(result)
+
+        self.metrics.record_batch(worker_ids, queue_waits, inference_time, time.time() - dispatch_start)
+
+    def _record_cycle(self, num_requests, collect_time, infer_time):
+        with self._policy_lock:
+            self.batch_policy.record_cycle(num_requests, collect_time, infer_time)
 
 
 class PredictionClient:
@@ -141,6 +347,7 @@ class PredictionClient:
         self.request_queue = request_queue
         self.response_queue = response_queue
         self.worker_id = id(self)
+        self.model_version = None  # Version of the weights behind the last response
         
     def predict(self, board_tensor):
         """
@@ -152,5 +359,6 @@ class PredictionClient:
         Returns:
             Tuple of (policy, value)
         """
-        self.request_queue.put((self.worker_id, board_tensor))
-        return self.response_queue.get()
+        self.request_queue.put((self.worker_id, board_tensor, time.time()))
+        policy, value, self.model_version = self.response_queue.get()
+        return policy, value
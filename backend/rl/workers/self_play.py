@@ -8,10 +8,12 @@ Optimized: Uses full MCTS tree search (not simplified single-pass).
 """
 import numpy as np
 import math
-import uuid
 import time
 from multiprocessing import Process, Queue
 
+from ..training.episode import play_episode
+from ..training.broadcast import get_channel
+
 
 class RemoteMCTS:
     """
@@ -151,112 +153,55 @@ class SelfPlayWorker:
         self.request_queue = request_queue
         self.response_queue = response_queue
         self.result_queue = result_queue
+        self.model_version = None  # Latest weights version seen in a response
         
     def predict(self, board_tensor):
         """Request prediction from the server."""
-        self.request_queue.put((self.worker_id, board_tensor))
-        return self.response_queue.get()
+        self.request_queue.put((self.worker_id, board_tensor, time.time()))
+        policy, value, version = self.response_queue.get()
+        self.model_version = version if self.model_version is None else max(self.model_version, version)
+        return policy, value
 
     def _broadcast_step(self, board, step, current_player):
-        """Broadcast current board state to server for real-time dashboard view."""
-        import requests
-        try:
-            requests.post("http://localhost:8000/internal/training/step", json={
-                "worker_id": self.worker_id,
-                "step": step,
-                "board": board.tolist(),
-                "player": current_player
-            }, timeout=0.1)  # Very short timeout to not block game
-        except:
-            pass  # Silently ignore broadcast failures
-        
+        """Queue the current board for the real-time dashboard view (never blocks)."""
+        get_channel().send("/internal/training/step", {
+            "worker_id": self.worker_id,
+            "step": step,
+            "board": board.tolist(),
+            "player": current_player
+        }, key=f"step-{self.worker_id}")
+
     def execute_episode(self, iteration=0):
         """Run a single self-play episode with full MCTS."""
-        trainExamples = []
-        board = self.game.get_init_board()
-        current_player = 1
-        game_record = {
-            "game_id": uuid.uuid4().hex[:8],
-            "start_time": int(time.time()),
-            "moves": [],
-            "winner": 0
-        }
-        
-        step = 0
-        max_steps = self.args.get('max_steps', 200)
-        
-        # History for repetition detection (3-fold)
-        board_history = []
-        
-        while step < max_steps:
-            # 1. Check Repetition (Draw)
-            # State identifier: (board_bytes, player)
-            state_id = (board.tobytes(), current_player)
-            # We use > 1 because we are about to append the current one (2nd repeat means 3rd appearance total?)
-            # Usually: 1st appearance (append). 2nd appearance (append). 3rd appearance -> Draw.
-            if board_history.count(state_id) >= 2:
-                # print(f"Draw by Repetition at step {step}")
-                game_record["winner"] = 0 # Draw
-                game_record["end_reason"] = "repetition"
-                return [(x[0], x[1], 0) for x in trainExamples], game_record
-                
-            board_history.append(state_id)
-            
-            canonical_board = self.game.get_canonical_form(board, current_player)
-            temp = int(step < self.args.get('tempThreshold', 15))
-            
-            # Create fresh MCTS for this move (like Coach does)
-            mcts = RemoteMCTS(self.game, self.predict, self.args)
-            pi = mcts.get_action_prob(canonical_board, temp=temp)
-            
-            # Store example
-            state_tensor = self.game.state_to_tensor(canonical_board)
-            trainExamples.append([state_tensor, pi, current_player])
-            
-            # Select action
-            action = np.random.choice(len(pi), p=pi)
-            
-            # Log move - convert from Canonical to Absolute coordinates
-            move_coords = self.game.decode_move(action)
-            start, end = move_coords
-            if current_player == -1:
-                start = (start[0], 9 - start[1])
-                end = (end[0], 9 - end[1])
-            game_record["moves"].append([list(start), list(end)])
-            
-            # Broadcast step for real-time view (every 5 moves to reduce overhead)
-            step += 1
+        self.model_version = None
+
+        def on_step(board, step):
+            # Broadcast for real-time view (every 5 moves to reduce overhead)
             if step % 5 == 0:
-                self._broadcast_step(board, step, current_player)
-            
-            # Execute move
-            board, current_player = self.game.get_next_state(board, current_player, action)
-            
-            # Check game end
-            r = self.game.get_game_ended(board, current_player)
-            if r != 0:
-                game_record["winner"] = r
-                return [(x[0], x[1], r * ((-1) ** (x[2] != current_player))) for x in trainExamples], game_record
-        
-        # Max steps reached - draw
-        game_record["winner"] = 0
-        return [(x[0], x[1], 0) for x in trainExamples], game_record
+                self._broadcast_step(board, step, 1 if step % 2 else -1)
 
+        examples, game_record = play_episode(self.game, self.predict, self.args, iteration,
+                                             on_step=on_step, mcts_class=RemoteMCTS)
+        game_record["model_version"] = self.model_version
+        return examples, game_record
 
-def run_worker(worker_id, game_class, args, request_queue, response_queue, result_queue, num_episodes, iteration):
-    """Entry point for worker process."""
-    from game import XiangqiGame
-    
-    game = XiangqiGame()
+
+def run_worker(worker_id, game_class, args, request_queue, response_queue, job_queue, result_queue):
+    """
+    Entry point for a long-lived worker process.
+
+    Pulls (iteration, episode) jobs from the shared job queue until it
+    receives None, and puts one (worker_id, examples, game_record) result
+    per episode. Workers that finish early simply take the next job, so
+    load balances itself across slow and fast games.
+    """
+    game = game_class()
     worker = SelfPlayWorker(worker_id, game, args, request_queue, response_queue, result_queue)
     
-    all_examples = []
-    all_game_records = []
-    for _ in range(num_episodes):
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        iteration, _episode = job
         examples, game_record = worker.execute_episode(iteration)
-        all_examples.extend(examples)
-        all_game_records.append(game_record)
-        
-    result_queue.put((worker_id, all_examples, all_game_records))
-
-
+        result_queue.put((worker_id, examples, game_record))
@@ -6,30 +6,37 @@ import time
 import threading
 import queue
 import os
-import glob
 
 import numpy as np
 import torch
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from fastapi.responses import StreamingResponse
 
 from game import XiangqiGame
 from classic.minimax import MinimaxSolver
+from classic.transposition import TranspositionTable
 from rl.models.xiangqi_net import XiangqiNet
 from rl.algorithms.mcts import MCTS
-from history import HistoryManager
+from rl.training.game_index import GameIndex
 from schemas.game_schemas import BoardRequest, SaveGameRequest
+from services.history_service import history_manager
 
 router = APIRouter()
 
 # Initialize game and AI components
 game = XiangqiGame()
 nnet = XiangqiNet()
-history_manager = HistoryManager()
 
 # Global abort event for Minimax interruption
 current_abort_event = None
 
+# Default wall-clock budget (seconds) for a Minimax move
+MINIMAX_TIME_LIMIT = 10.0
+
+# Transposition table shared by Minimax searches, so later moves of a game
+# reuse what earlier searches learned (entries are verified by full key)
+minimax_tt = TranspositionTable()
+
 # MCTS args
 args = {
     'num_mcts_sims': 50,
@@ -51,6 +58,19 @@ except:
 nnet.eval()
 
 
+def pv_to_absolute(pv, player):
+    """Convert a canonical principal variation to absolute [start, end] moves."""
+    moves = []
+    for ply, action in enumerate(pv):
+        start, end = game.decode_move(action)
+        # Sides alternate along the PV; Black's canonical rows are flipped
+        if player * (-1) ** ply == -1:
+            start = (start[0], 9 - start[1])
+            end = (end[0], 9 - end[1])
+        moves.append([[int(start[0]), int(start[1])], [int(end[0]), int(end[1])]])
+    return moves
+
+
 @router.post("/bot/move")
 @router.post("/api/ai/move")
 async def get_bot_move(req: BoardRequest):
@@ -76,18 +96,25 @@ async def get_bot_move(req: BoardRequest):
             # Classic Minimax with streaming progress
             q = queue.Queue()
 
+            time_limit = req.time_limit or MINIMAX_TIME_LIMIT
+
             def worker(abort_event):
                 def cb(c, t):
                     if abort_event.is_set():
                         return
                     q.put(("progress", c, t))
 
+                def depth_cb(info):
+                    if not abort_event.is_set():
+                        q.put(("depth", info))
+
                 def abort_check():
                     return abort_event.is_set()
 
-                solver = MinimaxSolver(game, depth=req.difficulty)
+                solver = MinimaxSolver(game, depth=req.difficulty, time_limit=time_limit, tt=minimax_tt)
                 try:
-                    action = solver.get_best_move(canonical_board, progress_callback=cb, abort_check=abort_check)
+                    action = solver.get_best_move(canonical_board, progress_callback=cb, abort_check=abort_check,
+                                                  depth_callback=depth_cb)
                     if abort_event.is_set():
                         q.put(("aborted",))
                     else:
@@ -108,26 +135,32 @@ async def get_bot_move(req: BoardRequest):
                     item = q.get(timeout=0.05)
 
                     if item[0] == "progress":
-                        c, total = item[1], item[2]
-                        now = time.time()
-                        percent = (c / total) if total > 0 else 0
-                        elapsed = now - start_time
-                        eta = (elapsed / percent) - elapsed if percent > 0.01 else 0
+                        # Deeper iterations restart the root moves, so the
+                        # time budget is the better measure of progress
+                        elapsed = time.time() - start_time
+                        percent = min(elapsed / time_limit, 0.99)
 
                         yield json.dumps({
                             "type": "progress",
                             "percent": round(percent * 100, 1),
-                            "eta_seconds": round(eta, 1)
+                            "eta_seconds": round(max(time_limit - elapsed, 0), 1)
+                        }) + "\n"
+
+                    elif item[0] == "depth":
+                        info = item[1]
+                        yield json.dumps({
+                            "type": "depth",
+                            "depth": info['depth'],
+                            "score": int(info['score']),
+                            "pv": pv_to_absolute(info['pv'], current_player),
+                            "nodes": info['nodes'],
+                            "elapsed": round(info['elapsed'], 2)
                         }) + "\n"
 
                     elif item[0] == "result":
                         action = item[1]
                         if action is not None:
-                            move = game.decode_move(action)
-                            start, end = move
-                            if current_player == -1:
-                                start = (start[0], 9 - start[1])
-                                end = (end[0], 9 - end[1])
+                            start, end = pv_to_absolute([action], current_player)[0]
 
                             yield json.dumps({
                                 "type": "result",
@@ -185,61 +218,56 @@ async def save_game(req: SaveGameRequest):
 
 
 @router.get("/api/history")
-async def get_history(mode: str = "training"):
-    """Get recent game history."""
-    return history_manager.get_recent_history(mode=mode)
+async def get_history(response: Response, mode: str = "training", limit: int = 50, offset: int = 0):
+    """
+    Get recent game history, newest first (paginated with offset/limit).
+
+    The total number of stored games is returned in X-Total-Count.
+    """
+    response.headers["X-Total-Count"] = str(history_manager.count_games(mode=mode))
+    return history_manager.get_recent_history(mode=mode, limit=limit, offset=offset)
 
 
 # ========== Evolution API ==========
 
-def load_evolution_games(iteration: int = None, limit: int = 50):
-    """Load RL training games from data/evolution directory."""
-    evolution_dir = "data/evolution"
-    games = []
+EVOLUTION_DIR = "data/evolution"
 
-    if not os.path.exists(evolution_dir):
-        return []
+# Incrementally refreshed index over all logged training games
+evolution_index = GameIndex(EVOLUTION_DIR)
 
-    pattern = f"game_{iteration}_*.json" if iteration else "game_*.json"
-    files = glob.glob(os.path.join(evolution_dir, pattern))
-    files.sort(key=os.path.getmtime, reverse=True)
 
-    for filepath in files[:limit]:
-        try:
-            with open(filepath, 'r') as f:
-                game_data = json.load(f)
-                game_data['source'] = 'rl'
-                games.append(game_data)
-        except:
-            pass
+def load_evolution_games(iteration: int = None, limit: int = 50, offset: int = 0, **filters):
+    """
+    Load RL training games (newest first) from the evolution index.
 
-    return games
+    Returns:
+        Tuple of (total matching games, page of games)
+    """
+    total, games = evolution_index.query(iteration=iteration, offset=offset, limit=limit, **filters)
+    for game_data in games:
+        game_data['source'] = 'rl'
+    return total, games
 
 
 def get_available_iterations():
     """Get list of available iteration numbers from evolution data."""
-    evolution_dir = "data/evolution"
-    iterations = set()
-
-    if not os.path.exists(evolution_dir):
-        return []
-
-    for filename in os.listdir(evolution_dir):
-        if filename.startswith("game_") and filename.endswith(".json"):
-            parts = filename.split("_")
-            if len(parts) >= 2:
-                try:
-                    iterations.add(int(parts[1]))
-                except ValueError:
-                    pass
-
-    return sorted(iterations, reverse=True)
+    return evolution_index.iterations()
 
 
 @router.get("/api/evolution/games")
-async def get_evolution_games(iteration: int = None, limit: int = 50):
-    """Get RL training games, optionally filtered by iteration."""
-    return load_evolution_games(iteration, limit)
+async def get_evolution_games(response: Response, iteration: int = None, limit: int = 50, offset: int = 0,
+                              game_id: str = None, winner: int = None,
+                              min_moves: int = None, max_moves: int = None,
+                              since: float = None, until: float = None):
+    """
+    Get RL training games, newest first, optionally filtered.
+
+    The total number of matching games is returned in X-Total-Count.
+    """
+    total, games = load_evolution_games(iteration, limit, offset, game_id=game_id, winner=winner,
+                                        min_moves=min_moves, max_moves=max_moves, since=since, until=until)
+    response.headers["X-Total-Count"] = str(total)
+    return games
 
 
 @router.get("/api/evolution/iterations")
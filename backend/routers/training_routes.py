@@ -3,6 +3,7 @@ Training-related API routes: status, control, configuration.
 """
 import os
 import json
+import asyncio
 import signal
 import subprocess
 
@@ -10,12 +11,10 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from services.websocket_manager import manager
 from schemas.game_schemas import TrainingUpdate, TrainingStartRequest
-from history import HistoryManager
+from services.history_service import history_manager, training_history
 
 router = APIRouter()
 
-history_manager = HistoryManager()
-
 # Shared training state (in-memory)
 training_state = {
     "iteration": 0,
@@ -25,9 +24,16 @@ training_state = {
     "games_completed": 0,
     "status": "idle",
     "history": [],
-    "evalHistory": []
+    "evalHistory": [],
+    "telemetryHistory": []
 }
 
+# Per-iteration timing/throughput summaries kept for the dashboard
+TELEMETRY_HISTORY_LIMIT = 100
+
+# On-disk replay shards of dashboard-started runs (relative to backend/)
+REPLAY_DIR = os.path.join("data", "replay")
+
 # Global training process reference
 training_process = None
 training_config = {
@@ -62,11 +68,14 @@ async def update_training_state(state: dict):
     global training_state
 
     if "history_update" in state:
-        item = state.pop("history_update")
-        history_manager.save_game(item, mode="training")
+        training_history.add(state.pop("history_update"))
+        training_state["history"] = training_history.recent()
+
+    if "telemetry" in state:
+        telemetry_history = training_state.get("telemetryHistory", []) + [state["telemetry"]]
+        training_state["telemetryHistory"] = telemetry_history[-TELEMETRY_HISTORY_LIMIT:]
 
     training_state.update(state)
-    training_state["history"] = history_manager.get_recent_history(mode="training", limit=50)
 
     return {"status": "ok"}
 
@@ -86,9 +95,33 @@ async def update_training_step(step_data: dict):
     return {"status": "ok"}
 
 
+@router.post("/internal/telemetry/batch")
+async def telemetry_batch(batch: dict):
+    """
+    Apply a batch of queued updates from a trainer or worker process.
+
+    Each message names the internal endpoint it was meant for; messages
+    are applied in order through the same handlers.
+    """
+    applied = 0
+    for message in batch.get("messages", []):
+        path, data = message.get("path"), message.get("data") or {}
+        if path == "/internal/training/state":
+            await update_training_state(data)
+        elif path == "/internal/training/step":
+            await update_training_step(data)
+        elif path == "/internal/training/update":
+            await manager.broadcast(data)
+        else:
+            continue
+        applied += 1
+    return {"status": "ok", "applied": applied}
+
+
 @router.get("/api/training/state")
 def get_training_state():
-    """Get current training state."""
+    """Get current training state (served from memory)."""
+    training_state["history"] = training_history.recent()
     return training_state
 
 
@@ -110,7 +143,8 @@ async def start_training(config: TrainingStartRequest = None):
     cmd = ["python", "-m", "rl.train", "--mode", training_config["mode"],
            "--max-steps", str(training_config["max_steps"]),
            "--num-mcts-sims", str(training_config["num_mcts_sims"]),
-           "--num-episodes", str(training_config.get("num_episodes", 10))]
+           "--num-episodes", str(training_config.get("num_episodes", 10)),
+           "--replay-dir", REPLAY_DIR]
     
     if training_config["mode"] == "parallel":
         cmd.extend(["--workers", str(training_config["workers"])])
@@ -179,7 +213,7 @@ async def reset_training():
 
     await stop_training()
 
-    deleted_counts = {"checkpoints": 0, "evolution": 0, "history": 0}
+    deleted_counts = {"checkpoints": 0, "evolution": 0, "replay": 0, "history": 0}
 
     # Clear Checkpoints
     try:
@@ -197,20 +231,32 @@ async def reset_training():
         evolution_dir = os.path.join(base_dir, "data", "evolution")
         if os.path.exists(evolution_dir):
             for f in os.listdir(evolution_dir):
-                if f.endswith(".json"):
+                if f.endswith(".json") or f.endswith(".xgl"):
                     os.remove(os.path.join(evolution_dir, f))
                     deleted_counts["evolution"] += 1
     except Exception as e:
         print(f"Error clearing evolution data: {e}")
 
-    # Clear Training History
+    # Clear Replay Shards (otherwise the next run resumes old samples)
     try:
-        history_file = os.path.join(base_dir, "data", "history", "training_games.jsonl")
-        if os.path.exists(history_file):
-            os.remove(history_file)
-            deleted_counts["history"] = 1
+        replay_dir = os.path.join(base_dir, REPLAY_DIR)
+        if os.path.exists(replay_dir):
+            for f in os.listdir(replay_dir):
+                if f.startswith("shard_"):
+                    os.remove(os.path.join(replay_dir, f))
+                    deleted_counts["replay"] += 1
     except Exception as e:
-        print(f"Error clearing history: {e}")
+        print(f"Error clearing replay shards: {e}")
+
+    # Clear Training History (after any write in progress, so none lands after the delete)
+    def delete_history():
+        try:
+            if history_manager.reset(mode="training"):
+                deleted_counts["history"] = 1
+        except Exception as e:
+            print(f"Error clearing history: {e}")
+
+    await asyncio.to_thread(training_history.clear, delete_history)
 
     # Reset Training State
     training_state = {
@@ -221,7 +267,8 @@ async def reset_training():
         "games_completed": 0,
         "status": "idle",
         "history": [],
-        "evalHistory": []
+        "evalHistory": [],
+        "telemetryHistory": []
     }
 
     print(f"[Reset] Deleted: {deleted_counts}")
@@ -1,7 +1,7 @@
 """
 Pydantic models for API requests and responses.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Tuple, Optional
 
 
@@ -9,7 +9,9 @@ class BoardRequest(BaseModel):
     """Request body for AI move calculation."""
     board: List[List[int]]
     player: int  # 1 for Red, -1 for Black
-    difficulty: Optional[int] = None  # 1-4 Classic, None for AlphaZero
+    difficulty: Optional[int] = None  # 1-20 Classic (max search depth), None for AlphaZero
+    # Seconds per Classic move (server default if None); capped so a request cannot hold the solver
+    time_limit: Optional[float] = Field(None, gt=0, le=60)
 
 
 class MoveResponse(BaseModel):
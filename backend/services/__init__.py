@@ -1 +1,2 @@
 from .websocket_manager import manager, ConnectionManager
+from .history_service import history_manager, training_history
@@ -0,0 +1,10 @@
+"""
+Game history shared by the API routers.
+"""
+from history import HistoryManager, BufferedHistory
+
+# One manager for every router, so resets and reads share the same cache
+history_manager = HistoryManager()
+
+# Recent training results served from memory; written to disk in batches
+training_history = BufferedHistory(history_manager, mode="training", maxlen=50)
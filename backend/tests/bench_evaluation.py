@@ -0,0 +1,98 @@
+"""
+Evaluation benchmark (evals/sec).
+
+Compares the original per-square evaluate_board loop with the table-based
+evaluator, its batch form and the incremental per-move update, and checks
+that all of them agree with the original on every position.
+
+    python tests/bench_evaluation.py [num_positions]
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+from classic.evaluation import (
+    PIECE_VALUES, PST_MAP, DOUBLE_CANNON_BONUS, HOLLOW_CANNON_BONUS,
+    evaluate_board, evaluate_boards, move_delta,
+)
+from game import XiangqiGame
+
+
+def reference_evaluate(board):
+    """The original loop-based evaluate_board."""
+    score = 0
+    for y in range(10):
+        for x in range(9):
+            piece = board[y][x]
+            if piece == 0:
+                continue
+            p_type = abs(piece)
+            pst = PST_MAP[p_type]
+            if piece > 0:
+                score += PIECE_VALUES[p_type] + pst[y][x]
+            else:
+                score -= PIECE_VALUES[p_type] + pst[9 - y][x]
+    for x in range(9):
+        col = board[:, x]
+        red_cannons = [y for y in range(10) if col[y] == 6]
+        black_cannons = [y for y in range(10) if col[y] == -6]
+        if len(red_cannons) >= 2:
+            score += DOUBLE_CANNON_BONUS
+        if len(black_cannons) >= 2:
+            score -= DOUBLE_CANNON_BONUS
+        if x == 4:
+            score += HOLLOW_CANNON_BONUS * (len(red_cannons) - len(black_cannons))
+    return score
+
+
+def random_positions(n, seed=0):
+    """Boards and moves of random walks from the initial position (canonical form)."""
+    game = XiangqiGame()
+    rng = np.random.default_rng(seed)
+    boards, actions = [], []
+    board = game.get_canonical_board()
+    for i in range(n):
+        if i % 80 == 0:
+            board = game.get_canonical_board()
+        start = rng.choice(np.flatnonzero(board.ravel() > 0))
+        end = rng.choice(np.flatnonzero(board.ravel() <= 0))
+        boards.append(board)
+        actions.append(start * 90 + end)
+        next_board, next_player = game.get_next_state(board, 1, start * 90 + end)
+        board = game.get_canonical_form(next_board, next_player)
+    return boards, actions
+
+
+def rate(fn, count):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def bench_evaluation(n=5000):
+    boards, actions = random_positions(n)
+    expected = [reference_evaluate(b) for b in boards]
+    assert [evaluate_board(b) for b in boards] == expected
+    assert list(evaluate_boards(boards)) == expected
+    for i in range(n - 1):
+        if (i + 1) % 80:
+            assert -(expected[i] + move_delta(boards[i], actions[i])) == expected[i + 1]
+
+    stacked = np.stack(boards)
+    results = {
+        'reference loop': rate(lambda: [reference_evaluate(b) for b in boards], n),
+        'evaluate_board': rate(lambda: [evaluate_board(b) for b in boards], n),
+        'evaluate_boards (batch)': rate(lambda: evaluate_boards(stacked), n),
+        'incremental (move_delta)': rate(
+            lambda: [score + move_delta(b, a) for score, b, a in zip(expected, boards, actions)], n),
+    }
+    print(f"{n} positions, all evaluators match the original")
+    for name, evals in results.items():
+        print(f"  {name:<32} {evals:>12,.0f} evals/sec")
+    return results
+
+
+if __name__ == "__main__":
+    bench_evaluation(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
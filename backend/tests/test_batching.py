@@ -0,0 +1,101 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rl.workers.batching import FixedBatchPolicy, AdaptiveBatchPolicy
+
+
+def feed(policy, rate, batch, cycles, fixed, per_item, start=0.0):
+    """Serve `cycles` batches of `batch` requests arriving evenly at `rate`/s."""
+    t = start
+    for _ in range(cycles):
+        times = [t + i / rate for i in range(batch)]
+        t += batch / rate
+        policy.record_arrivals(times, collect_time=0.001)
+        policy.record_cycle(batch, 0.001, fixed + per_item * batch)
+    return t
+
+
+def close(a, b, tol=1e-6):
+    return abs(a - b) <= tol * max(1.0, abs(b))
+
+
+def test_fixed_policy():
+    print("Testing fixed batching policy...")
+    policy = FixedBatchPolicy(batch_size=16, timeout=0.02)
+    policy.record_arrivals([0.0, 0.001], 0.01)
+    policy.record_cycle(2, 0.01, 0.005)
+    assert policy.next_window() == (16, 0.02)
+
+
+def test_latency_estimates():
+    print("Testing inference latency estimates...")
+    policy = AdaptiveBatchPolicy(max_batch_size=32)
+    assert policy.estimate_latency(8) == 0.0  # Nothing measured
+    policy.record_cycle(1, 0.0, 0.002)
+    assert policy.estimate_latency(16) == 0.002  # One size: assume fixed cost
+    policy.record_cycle(9, 0.0, 0.010)
+    assert close(policy.estimate_latency(5), 0.006)  # Fit: 1ms + 1ms per item
+    assert policy.estimate_latency(9) == 0.010  # Measured sizes are used as is
+    policy.record_cycle(9, 0.0, 0.020)
+    assert close(policy.latency[9], 0.012)  # EWMA with smoothing 0.2
+
+    # Larger batches measured faster: per-item cost clamps to zero
+    policy = AdaptiveBatchPolicy(max_batch_size=32)
+    policy.record_cycle(2, 0.0, 0.004)
+    policy.record_cycle(4, 0.0, 0.002)
+    assert close(policy.estimate_latency(20), 0.003)
+
+
+def test_latency_mode():
+    print("Testing latency-mode planning...")
+    policy = AdaptiveBatchPolicy(max_batch_size=32, mode='latency', latency_target=0.01)
+    # 1000 req/s, inference 1ms + 0.1ms per item: fill + inference = 1.1ms * b
+    policy.record_cycle(1, 0.0, 0.0011)
+    feed(policy, 1000.0, 9, 5, fixed=0.001, per_item=0.0001)
+    assert close(policy.arrival_rate, 1000.0)
+    batch_size, timeout = policy.next_window()
+    assert batch_size == 9
+    # 1.5x the 8ms fill time is capped by what the target leaves after inference
+    assert close(timeout, 0.01 - 0.0019)
+
+    # Arrivals stop: the rate decays and the window shrinks to single requests
+    for _ in range(50):
+        policy.record_arrivals([], collect_time=0.01)
+    assert policy.next_window() == (1, policy.min_timeout)
+
+
+def test_throughput_mode():
+    print("Testing throughput-mode planning...")
+    # Fixed cost dominates: fill the largest batch, waiting at most max_timeout
+    policy = AdaptiveBatchPolicy(max_batch_size=32, mode='throughput')
+    policy.record_cycle(1, 0.0, 0.0051)
+    feed(policy, 500.0, 8, 5, fixed=0.005, per_item=0.0001)
+    assert policy.next_window() == (32, policy.max_timeout)  # 1.5 * 31 / 500 = 93ms, clamped
+
+    # Requests trickle in slower than a batch runs: serve them one at a time
+    policy = AdaptiveBatchPolicy(max_batch_size=32, mode='throughput')
+    policy.record_cycle(1, 0.0, 0.0011)
+    feed(policy, 100.0, 4, 5, fixed=0.001, per_item=0.0001)
+    assert policy.next_window() == (1, policy.min_timeout)
+
+
+def test_backlog_rate():
+    print("Testing arrival rate under a backlog...")
+    # 2000 req/s arrive, but the server drains at most 4 per 10ms (400/s)
+    policy = AdaptiveBatchPolicy(max_batch_size=4, mode='throughput')
+    feed(policy, 2000.0, 4, 20, fixed=0.01, per_item=0.0)
+    assert close(policy.arrival_rate, 2000.0)
+
+    # Requests older than the latest one seen are not counted again
+    policy.record_arrivals([0.0, 0.0005], collect_time=0.0)
+    assert close(policy.arrival_rate, 2000.0)
+
+
+if __name__ == "__main__":
+    test_fixed_policy()
+    test_latency_estimates()
+    test_latency_mode()
+    test_throughput_mode()
+    test_backlog_rate()
+    print("ALL Batching Policy Tests Passed!")
@@ -4,8 +4,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import numpy as np
-from classic.evaluation import evaluate_board
-from classic.minimax import MinimaxSolver
+from classic.evaluation import evaluate_board, evaluate_boards, move_delta
+from classic.minimax import MinimaxSolver, WIN_SCORE
+from classic.transposition import TranspositionTable, ZobristHasher, EXACT, LOWER
 from game import XiangqiGame
 
 def test_evaluation():
@@ -53,7 +54,119 @@ def test_minimax():
     print(f"Best Move found (D2): {move2}")
     assert move2 is not None
 
+def test_transposition_table():
+    print("Testing Transposition Table...")
+    tt = TranspositionTable(size_bits=4)
+    tt.store(5, 3, EXACT, 1.5, 100)
+    assert tt.probe(5) == (3, EXACT, 1.5, 100)
+    assert tt.probe(5 + 16) is None  # Same slot, different position
+
+    # Shallower results don't evict deeper ones from the current search...
+    tt.store(5 + 16, 1, LOWER, 2.0, 200)
+    assert tt.probe(5) is not None
+    # ...but do replace entries left over from an earlier search
+    tt.new_search()
+    tt.store(5 + 16, 1, LOWER, 2.0, 200)
+    assert tt.probe(5) is None and tt.probe(5 + 16)[3] == 200
+
+    game = XiangqiGame()
+    hasher = ZobristHasher()
+    board = game.get_canonical_board()
+    # Same position reached by different move orders hashes the same
+    a = game.encode_move(((0, 9), (0, 8)))
+    b = game.encode_move(((8, 9), (8, 8)))
+    one, _ = game.get_next_state(board, 1, a)
+    one, _ = game.get_next_state(one, 1, b)
+    two, _ = game.get_next_state(board, 1, b)
+    two, _ = game.get_next_state(two, 1, a)
+    assert hasher.hash(one) == hasher.hash(two) != hasher.hash(board)
+
+    # Rook check forces the black rook to block; taking it then mates
+    board = np.zeros((10, 9), dtype=int)
+    board[9][4], board[0][3], board[9][0], board[2][0] = 1, -1, 5, -5
+    solver = MinimaxSolver(game, depth=3)
+    mate = game.encode_move(((0, 9), (3, 9)))
+    assert solver.get_best_move(board) == mate
+    assert solver.tt.probe(solver.hasher.hash(board)) == (3, EXACT, WIN_SCORE, mate)
+
+def test_iterative_deepening():
+    print("Testing Iterative Deepening...")
+    game = XiangqiGame()
+    board = np.zeros((10, 9), dtype=int)
+    board[9][4], board[0][3], board[9][0], board[2][0] = 1, -1, 5, -5
+    infos = []
+    solver = MinimaxSolver(game, depth=6)
+    move = solver.get_best_move(board, depth_callback=infos.append)
+    # Deepening stops once the forced win is found
+    assert [info['depth'] for info in infos] == [1, 2, 3]
+    assert infos[-1]['score'] == WIN_SCORE and infos[-1]['pv'][0] == move
+    assert len(infos[-1]['pv']) == 3
+
+    # A time budget still returns the move of the last completed depth
+    solver = MinimaxSolver(game, depth=20, time_limit=0.5)
+    assert solver.get_best_move(game.get_canonical_board()) is not None
+
+
+def test_move_ordering():
+    print("Testing Move Ordering...")
+    game = XiangqiGame()
+    board = np.zeros((10, 9), dtype=int)
+    board[9][4], board[0][3] = 1, -1
+    board[5][0], board[5][8] = 5, 7      # Red rook and pawn...
+    board[4][0], board[4][8] = -7, -5    # ...can take a pawn and a rook
+    solver = MinimaxSolver(game)
+    actions = np.where(game.get_valid_moves(board, 1) == 1)[0]
+    pawn_takes_rook = game.encode_move(((8, 5), (8, 4)))
+    rook_takes_pawn = game.encode_move(((0, 5), (0, 4)))
+    quiet = game.encode_move(((0, 5), (1, 5)))
+
+    ordered = solver._order_moves(board, actions, None, 0)
+    assert list(ordered[:2]) == [pawn_takes_rook, rook_takes_pawn]  # MVV-LVA
+
+    solver._record_cutoff(board, quiet, 2, 0)
+    ordered = solver._order_moves(board, actions, None, 0)
+    assert ordered[2] == quiet  # Killer right after the captures
+    ordered = solver._order_moves(board, actions, None, 1)
+    assert ordered[2] == quiet  # Other plies: history still ranks it first among quiet moves
+
+    entry = (1, EXACT, 0, quiet)
+    assert solver._order_moves(board, actions, entry, 0)[0] == quiet  # TT move first
+
+
+def test_incremental_evaluation():
+    print("Testing Incremental Evaluation...")
+    # Central and doubled cannons: 2 x (50 + CANNON_PST) + 300 + 2 x 500
+    board = np.zeros((10, 9), dtype=int)
+    board[7][4], board[5][4] = 6, 6
+    assert evaluate_board(board) == 2 * 50 + 1 + 5 + 300 + 1000
+
+    game = XiangqiGame()
+    rng = np.random.default_rng(0)
+    boards = []
+    board = game.get_canonical_board()
+    score = evaluate_board(board)
+    for _ in range(120):
+        # Random piece to a random square not holding an own piece
+        # (legality doesn't matter to the evaluator); cannons move often
+        # so the incremental cannon patterns are exercised
+        own = np.flatnonzero(board.ravel() > 0)
+        cannon = own[board.ravel()[own] == 6]
+        start = rng.choice(cannon if len(cannon) and rng.random() < 0.5 else own)
+        end = rng.choice(np.flatnonzero(board.ravel() <= 0))
+        action = start * 90 + end
+        score = -(score + move_delta(board, action))
+        next_board, next_player = game.get_next_state(board, 1, action)
+        board = game.get_canonical_form(next_board, next_player)
+        assert score == evaluate_board(board)
+        boards.append(board)
+    assert list(evaluate_boards(boards)) == [evaluate_board(b) for b in boards]
+
+
 if __name__ == "__main__":
     test_evaluation()
     test_minimax()
+    test_transposition_table()
+    test_iterative_deepening()
+    test_move_ordering()
+    test_incremental_evaluation()
     print("ALL Classic Tests Passed!")
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from game import XiangqiGame
+from rl.training.episode import play_episode
+
+
+class ShuffleRooks:
+    """Stand-in search that moves the left rook up and back, for both sides."""
+
+    def __init__(self, game, predictor, args):
+        self.game = game
+
+    def get_action_prob(self, canonical_board, temp=1):
+        pi = np.zeros(self.game.get_action_size())
+        up, back = ((0, 9), (0, 8)), ((0, 8), (0, 9))
+        move = up if canonical_board[9][0] == 5 else back
+        pi[self.game.encode_move(move)] = 1
+        return pi
+
+
+def test_repetition_draw():
+    print("Testing shared self-play episode...")
+    game = XiangqiGame()
+    steps = []
+    examples, record = play_episode(game, None, {'max_steps': 100}, iteration=3,
+                                    on_step=lambda board, step: steps.append(step), mcts_class=ShuffleRooks)
+    # The start position recurs after every 4 moves; its third occurrence is a draw
+    assert record["end_reason"] == "repetition" and record["winner"] == 0
+    assert len(record["moves"]) == 8 == len(examples) and steps == list(range(1, 9))
+    assert record["moves"][:2] == [[[0, 9], [0, 8]], [[0, 0], [0, 1]]]  # Absolute coordinates
+    assert len(record["game_id"]) == 8 and record["iteration"] == 3
+    assert np.all(examples['value'] == 0)
+
+    _, record = play_episode(game, None, {'max_steps': 3}, mcts_class=ShuffleRooks)
+    assert record["end_reason"] == "max_steps" and len(record["moves"]) == 3
+
+
+if __name__ == "__main__":
+    test_repetition_draw()
+    print("ALL Episode Tests Passed!")
@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+from rl.training.logger import GameLogger, GameLogReader, load_games, list_iterations, log_filename
+from rl.training.game_index import GameIndex
+
+
+def make_game(iteration, n):
+    return {
+        "game_id": f"{iteration}-{n}",
+        "timestamp": 1000 + iteration * 100 + n,
+        "moves": [[[n % 9, 0], [n % 9, 1]], [[4, 9], [4, 8]]],
+        "winner": [1, -1, 0][n % 3],
+    }
+
+
+def test_log_roundtrip():
+    print("Testing compact game log roundtrip...")
+    for compress in (True, False):
+        log_dir = tempfile.mkdtemp()
+        logger = GameLogger(log_dir, compress=compress, flush_games=3)
+        logged = []
+        for iteration in (1, 2):
+            for n in range(7):
+                game = make_game(iteration, n)
+                logger.log_game(iteration, game)
+                logged.append(game)
+        logger.flush()
+
+        assert list_iterations(log_dir) == [2, 1]
+        games = load_games(log_dir, limit=100)
+        # Newest first, moves and metadata intact, iteration filled in
+        assert [g["game_id"] for g in games] == [g["game_id"] for g in reversed(logged)]
+        assert games[0]["moves"] == logged[-1]["moves"]
+        assert games[0]["iteration"] == 2
+        assert [g["game_id"] for g in load_games(log_dir, iteration=1, limit=2)] == ["1-6", "1-5"]
+
+
+def test_torn_tail_and_legacy():
+    print("Testing torn block and legacy JSON files...")
+    log_dir = tempfile.mkdtemp()
+    logger = GameLogger(log_dir, flush_games=2)
+    for n in range(4):
+        logger.log_game(1, make_game(1, n))
+    path = os.path.join(log_dir, log_filename(1))
+    with open(path, "ab") as f:
+        f.write(b"XGLB\x01partial")  # A block still being written
+    reader = GameLogReader(path)
+    assert len(reader) == 4
+    assert next(reader.summaries())["num_moves"] == 2
+
+    with open(os.path.join(log_dir, "game_5_legacy.json"), "w") as f:
+        json.dump({"game_id": "legacy", "moves": [], "winner": 0}, f)
+    assert list_iterations(log_dir) == [5, 1]
+    assert load_games(log_dir, limit=1)[0]["game_id"] == "legacy"
+
+
+def test_game_index():
+    print("Testing evolution game index...")
+    log_dir = tempfile.mkdtemp()
+    logger = GameLogger(log_dir, flush_games=4)
+    for iteration in (1, 2, 3):
+        for n in range(10):
+            logger.log_game(iteration, make_game(iteration, n))
+    logger.flush()
+
+    index = GameIndex(log_dir)
+    total, games = index.query(limit=5)
+    assert total == 30 and [g["game_id"] for g in games] == ["3-9", "3-8", "3-7", "3-6", "3-5"]
+    assert index.iterations() == [3, 2, 1]
+
+    total, games = index.query(iteration=2, winner=1, offset=1, limit=2)
+    assert total == 4 and [g["game_id"] for g in games] == ["2-6", "2-3"]
+    assert games[0]["moves"] == make_game(2, 6)["moves"]
+    total, rows = index.query(since=1205, until=1302, moves=False)
+    assert [r["game_id"] for r in rows] == ["3-2", "3-1", "3-0", "2-9", "2-8", "2-7", "2-6", "2-5"]
+
+    # Appended blocks are picked up incrementally
+    logger.log_game(3, {"game_id": "c0ffee00", "timestamp": 2000, "moves": [], "winner": 0})
+    logger.flush()
+    index.refresh(force=True)
+    total, games = index.query(game_id="c0ff")
+    assert total == 1 and games[0]["game_id"] == "c0ffee00"
+    assert len(index) == 31
+    assert len(index._files) == 3  # One entry per log, however often it grows
+
+    # Legacy JSON games interleave with logs by iteration
+    with open(os.path.join(log_dir, "game_2_legacy.json"), "w") as f:
+        json.dump({"game_id": "legacy", "moves": [], "winner": 0}, f)
+    logger.log_game(4, make_game(4, 0))
+    logger.flush()
+    index = GameIndex(log_dir)
+    total, rows = index.query(limit=40, moves=False)
+    assert [r["iteration"] for r in rows] == sorted((r["iteration"] for r in rows), reverse=True)
+    assert rows[0]["game_id"] == "4-0" and total == 33
+
+
+if __name__ == "__main__":
+    test_log_roundtrip()
+    test_torn_tail_and_legacy()
+    test_game_index()
+    print("ALL Game Log Tests Passed!")
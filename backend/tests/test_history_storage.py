@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import threading
+import time
+from history.buffer import BufferedHistory
+from history.manager import HistoryManager
+from history.storage import HistoryStorage
+
+
+def ids(games):
+    return [g["id"] for g in games]
+
+
+def test_tail_and_pagination():
+    print("Testing history tail reads and pagination...")
+    base_dir = tempfile.mkdtemp()
+    writer = HistoryStorage(base_dir, cache_size=10)
+    reader = HistoryStorage(base_dir, cache_size=10)
+    for i in range(100):
+        writer.append_game({"id": i, "pad": "x" * (i % 7)})
+
+    assert ids(writer.load_recent_games(limit=3)) == [99, 98, 97]
+    assert ids(reader.load_recent_games(limit=30))[-1] == 70  # Beyond the ring: tail read
+    assert ids(reader.load_games(offset=40, limit=3)) == [59, 58, 57]
+    assert ids(reader.load_games(offset=98, limit=5)) == [1, 0]
+    assert reader.count_games() == 100
+
+    # Appends by another storage instance are picked up incrementally
+    writer.append_game({"id": 100})
+    assert ids(reader.load_recent_games(limit=2)) == [100, 99]
+    assert ids(reader.load_games(offset=1, limit=2)) == [99, 98]
+    assert reader.count_games() == 101
+
+    # A line still being written is ignored until complete
+    with open(writer._get_filename("training"), "a") as f:
+        f.write('{"id": 101')
+    assert ids(reader.load_recent_games(limit=1)) == [100]
+
+    # Truncation (reset) rebuilds the cache
+    open(writer._get_filename("training"), "w").close()
+    writer.append_game({"id": 0})
+    assert ids(reader.load_recent_games()) == [0]
+
+
+def test_replaced_file():
+    print("Testing history files deleted and regrown past the old size...")
+    base_dir = tempfile.mkdtemp()
+    writer = HistoryStorage(base_dir, cache_size=10)
+    reader = HistoryStorage(base_dir, cache_size=10)
+    writer.append_games([{"id": i} for i in range(5)])
+    assert ids(reader.load_recent_games(limit=10)) == [4, 3, 2, 1, 0]
+
+    # Deleted behind the reader's back, then regrown past the size it had read
+    os.remove(writer._get_filename("training"))
+    writer.append_games([{"id": i} for i in range(100, 112)])
+    assert ids(reader.load_recent_games(limit=10)) == list(range(111, 101, -1))
+    assert ids(reader.load_games(offset=10, limit=5)) == [101, 100]
+    assert reader.count_games() == 12
+
+    # reset() deletes the file and the cached state of its own instance
+    assert reader.reset()
+    assert not reader.reset()
+    assert reader.load_recent_games() == [] and reader.count_games() == 0
+    reader.append_games([{"id": i} for i in range(200, 220)])
+    assert ids(reader.load_recent_games(limit=3)) == [219, 218, 217]
+    assert ids(writer.load_recent_games(limit=3)) == [219, 218, 217]
+    assert writer.count_games() == 20
+
+
+class SlowManager(HistoryManager):
+    """Signals when a write has taken its games, then writes them late."""
+
+    def __init__(self, base_dir):
+        super().__init__(base_dir)
+        self.writing = threading.Event()
+
+    def save_games(self, games, mode="training"):
+        self.writing.set()
+        time.sleep(0.2)
+        super().save_games(games, mode=mode)
+
+
+def test_buffered_clear():
+    print("Testing buffered history add/flush/clear...")
+    base_dir = tempfile.mkdtemp()
+    manager = SlowManager(base_dir)
+    history = BufferedHistory(manager, maxlen=10)
+    history.add({"id": 0})  # No event loop: written through
+    assert ids(history.recent()) == [0]
+    assert manager.count_games() == 1
+
+    # Reset while a flush holds old games: they must not come back after the delete
+    history._pending = [{"id": 1}, {"id": 2}]
+    flusher = threading.Thread(target=history.flush)
+    flusher.start()
+    manager.writing.wait()
+    filename = manager.storage._get_filename("training")
+    history.clear(lambda: os.remove(filename))
+    flusher.join()
+    assert not os.path.exists(filename)
+    assert history.recent() == []
+    assert "training" not in manager.storage._states  # Cached reads dropped too
+
+    history.add({"id": 3})
+    assert ids(manager.get_recent_history()) == [3]
+
+
+if __name__ == "__main__":
+    test_tail_and_pagination()
+    test_replaced_file()
+    test_buffered_clear()
+    print("ALL History Storage Tests Passed!")
@@ -0,0 +1,31 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from game import XiangqiGame
+from rl.workers.prediction_server import PredictionServer
+
+
+def test_republish_same_version():
+    print("Testing weight republishing within one iteration...")
+    model = torch.nn.Linear(4, 2)
+    server = PredictionServer(model, XiangqiGame(), model_version=0)
+    replica = torch.nn.Linear(4, 2)
+
+    # Async training publishes several times per iteration under one version
+    for step in (1, 2):
+        weights = {k: torch.full_like(v, float(step)) for k, v in model.state_dict().items()}
+        assert server.update_weights(weights, version=3) == 3
+        assert server._sync_weights(replica) == 3
+        assert torch.all(replica.weight == step), "Replica kept stale weights"
+
+    # Nothing new staged: no reload
+    replica.weight.data.fill_(-1)
+    server._sync_weights(replica)
+    assert torch.all(replica.weight == -1)
+
+
+if __name__ == "__main__":
+    test_republish_same_version()
+    print("ALL Prediction Server Tests Passed!")
@@ -0,0 +1,170 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import numpy as np
+from game import XiangqiGame
+from rl.training.examples import encode_examples, collate_records, mirror_records, MIRROR_ACTIONS
+from rl.training.replay_buffer import ReplayBuffer
+from rl.training.shards import ShardReplayBuffer
+from rl.training.dataset import XiangqiDataset, make_batch_loader
+
+
+def make_examples(n, tag):
+    board = np.zeros((10, 9), dtype=int)
+    board[0][0] = tag
+    pi = [0.0] * 8100
+    pi[tag] = 1.0
+    return encode_examples([(board, pi, 1, 0) for _ in range(n)])
+
+
+def test_capacity_eviction():
+    print("Testing capacity eviction...")
+    buf = ReplayBuffer(capacity=10)
+    next_id = 0
+    for it, n in enumerate((6, 6, 3, 8), start=1):
+        records = make_examples(n, it)
+        records['game_id'] = np.arange(next_id, next_id + n)
+        next_id += n
+        buf.add(records, iteration=it)
+    assert len(buf) == 10
+    # Exactly the newest `capacity` records survive, oldest first
+    assert list(buf.get(np.arange(len(buf)))['game_id']) == list(range(next_id - 10, next_id))
+
+
+def test_iteration_window():
+    print("Testing iteration window...")
+    buf = ReplayBuffer(capacity=100, window_iters=2)
+    for it in range(1, 5):
+        buf.add(make_examples(5, it), iteration=it)
+    assert len(buf) == 10
+    tags = {e['board'][0, 0] for e in buf.sample(100)}
+    assert tags == {3, 4}, f"Unexpected iterations in window: {tags}"
+
+
+def test_recency_bias():
+    print("Testing recency-weighted sampling...")
+    buf = ReplayBuffer(capacity=1000, recency_bias=3.0)
+    buf.add(make_examples(500, 1), iteration=1)
+    buf.add(make_examples(500, 2), iteration=2)
+    tags = [e['board'][0, 0] for e in buf.sample(2000)]
+    assert tags.count(2) > 3 * tags.count(1)
+
+
+def test_compact_roundtrip():
+    print("Testing compact example encoding...")
+    game = XiangqiGame()
+    board = game.get_canonical_board()
+    pi = np.zeros(8100)
+    pi[[10, 500, 4000]] = [0.5, 0.25, 0.25]
+    records = encode_examples([(board, pi, 1, -1)])
+    assert records.itemsize < 512
+
+    boards, pis, vs = collate_records(records)
+    assert np.array_equal(boards[0].numpy(), game.state_to_tensor(board))
+    assert np.allclose(pis[0].numpy(), pi, atol=1e-3)
+    assert vs[0].item() == -1
+
+
+def test_shard_resume():
+    print("Testing memory-mapped replay shards...")
+    with tempfile.TemporaryDirectory() as root:
+        buf = ShardReplayBuffer(root, capacity=12, window_iters=2, shard_size=4)
+        for it in range(1, 4):
+            buf.add(make_examples(6, it), iteration=it)
+        buf.flush()
+        assert len(buf) == 12
+        assert {e['board'][0, 0] for e in buf.sample(100)} == {2, 3}
+
+        # A new process picks the window straight back up from disk
+        resumed = ShardReplayBuffer(root, capacity=12, window_iters=2)
+        assert len(resumed) == 12
+        assert np.array_equal(resumed.get(np.arange(12)), buf.get(np.arange(12)))
+
+        # Shards that left the window were deleted, so the directory stays bounded
+        buf.add(make_examples(6, 4), iteration=4)
+        buf.flush()
+        iterations = {int(name.split('_')[1]) for name in os.listdir(root)}
+        assert iterations == {3, 4}
+
+
+def test_batch_loader():
+    print("Testing batched dataset collation...")
+    buf = ReplayBuffer(capacity=100)
+    buf.add(make_examples(30, 5), iteration=1)
+    boards, pis, vs = XiangqiDataset(buf)[np.array([0, 3, 7])]
+    assert boards.shape == (3, 14, 10, 9) and pis.shape == (3, 8100) and vs.shape == (3,)
+
+    batches = list(make_batch_loader(buf, batch_size=8, num_batches=3))
+    assert len(batches) == 3
+    assert all(b[0].shape[0] == 8 for b in batches)
+    assert (batches[0][1].argmax(dim=1) == 5).all()
+
+
+def test_mirror_augmentation():
+    print("Testing mirror augmentation...")
+    assert np.array_equal(MIRROR_ACTIONS[MIRROR_ACTIONS], np.arange(8100))
+
+    # The opening position is symmetric, so its legal moves map onto themselves
+    game = XiangqiGame()
+    board = game.get_canonical_board()
+    valid = np.flatnonzero(game.get_valid_moves(board, 1))
+    assert set(MIRROR_ACTIONS[valid]) == set(valid)
+
+    pi = np.zeros(8100)
+    pi[valid[0]] = 1.0
+    board[0][0] = 0
+    records = encode_examples([(board, pi, 1, 1)])
+    mirrored = mirror_records(records, prob=1.0)
+    assert np.array_equal(mirrored['board'][0], records['board'][0][:, ::-1])
+    _, pis, _ = collate_records(mirrored)
+    assert pis[0].argmax().item() == MIRROR_ACTIONS[valid[0]]
+
+
+def test_position_dedup():
+    print("Testing position dedup...")
+    board = np.zeros((10, 9), dtype=int)
+    board[0][0] = 1
+    pi_a, pi_b = np.zeros(8100), np.zeros(8100)
+    pi_a[10], pi_b[20] = 1.0, 1.0
+
+    buf = ReplayBuffer(capacity=100, window_iters=2, dedup=True)
+    buf.add(encode_examples([(board, pi_a, 1, 1), (board, pi_b, 1, -1)]), iteration=1)
+    buf.add(make_examples(3, 2), iteration=1)
+    assert len(buf) == 2
+
+    _, pis, vs = collate_records(buf.get(np.array([0])))
+    assert np.allclose(pis[0, [10, 20]].numpy(), [0.5, 0.5], atol=1e-3)
+    assert vs[0].item() == 0
+
+    # Seeing the position again keeps it alive past the iteration window
+    buf.add(encode_examples([(board, pi_a, 1, 1)]), iteration=3)
+    buf.add(make_examples(1, 4), iteration=4)
+    assert len(buf) == 2
+    tags = {e['board'][0, 0] for e in buf.sample(50)}
+    assert tags == {1, 4}, f"Unexpected positions in window: {tags}"
+
+    # Weights follow count ** count_weight (merged-away slots never drawn),
+    # and are recomputed after every add
+    buf = ReplayBuffer(capacity=100, dedup=True, count_weight=1.0)
+    buf.add(encode_examples([(board, pi_a, 1, 1)] * 3), iteration=1)
+    buf.add(make_examples(1, 2), iteration=1)
+    tags = [e['board'][0, 0] for e in buf.sample(4000)]
+    assert 0.7 < tags.count(1) / len(tags) < 0.8
+    buf.add(make_examples(1, 2), iteration=1)
+    buf.add(make_examples(1, 2), iteration=1)
+    tags = [e['board'][0, 0] for e in buf.sample(4000)]
+    assert 0.45 < tags.count(1) / len(tags) < 0.55
+
+
+if __name__ == "__main__":
+    test_capacity_eviction()
+    test_iteration_window()
+    test_recency_bias()
+    test_compact_roundtrip()
+    test_shard_resume()
+    test_batch_loader()
+    test_mirror_augmentation()
+    test_position_dedup()
+    print("ALL Replay Buffer Tests Passed!")
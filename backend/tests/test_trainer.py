@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import numpy as np
+from game import XiangqiGame
+from rl.models.xiangqi_net import XiangqiNet
+from rl.training.backends import SelfPlayBackend
+from rl.training.examples import encode_examples
+from rl.training.trainer import Trainer
+from rl.utils.checkpoint import load_checkpoint
+
+
+class InstantBackend(SelfPlayBackend):
+    """Async backend whose games are finished as soon as they are submitted."""
+
+    name = 'instant'
+    supports_async = True
+
+    def __init__(self):
+        self.queued = 0
+
+    def play(self, iteration, num_games):
+        for _ in range(num_games):
+            yield self._game()
+
+    def submit(self, iteration, num_games):
+        self.queued += num_games
+
+    def poll(self, timeout):
+        if not self.queued:
+            return None
+        self.queued -= 1
+        return self._game()
+
+    @staticmethod
+    def _game():
+        board = XiangqiGame().get_canonical_board()
+        pi = np.zeros(8100)
+        pi[0] = 1.0
+        return encode_examples([(board, pi, 1, 0)] * 4), {"game_id": "0", "moves": [], "winner": 0}
+
+
+def make_trainer(folder, **overrides):
+    args = {
+        'num_iters': 3, 'num_eps': 2, 'batch_size': 4, 'lr': 0.01, 'cuda': False,
+        'lr_schedule': 'step', 'lr_step_iters': 1, 'lr_gamma': 0.5,
+        'num_workers': 1, 'num_mcts_sims': 1, 'steps_per_iter': 2, 'eval_interval': 0,
+        'train_steps': 1, 'checkpoint': folder,
+        'evolution_log_dir': os.path.join(folder, 'evolution'),
+        'metrics_dir': os.path.join(folder, 'metrics'),
+    }
+    args.update(overrides)
+    model = XiangqiNet(num_res_blocks=1, num_channels=8)
+    return Trainer(XiangqiGame, model, args, InstantBackend())
+
+
+def check_resume(folder, last_iteration):
+    """Each checkpoint holds the schedule stepped once per finished iteration."""
+    for i in range(1, last_iteration + 1):
+        trainer = make_trainer(folder)
+        iteration = load_checkpoint(os.path.join(folder, f'checkpoint_{i}.pth.tar'),
+                                    trainer.model, trainer.optimizer, trainer.scheduler)
+        assert iteration == i
+        assert trainer.scheduler.last_epoch == i, (i, trainer.scheduler.last_epoch)
+        assert np.isclose(trainer.optimizer.param_groups[0]['lr'], 0.01 * 0.5 ** i)
+
+
+def test_checkpoint_schedule():
+    print("Testing LR schedule stored in checkpoints (sync and async)...")
+    folder = tempfile.mkdtemp()
+    make_trainer(folder).learn()
+    check_resume(folder, 3)
+
+    folder = tempfile.mkdtemp()
+    make_trainer(folder).learn_async()
+    check_resume(folder, 3)
+
+    # Resuming continues the schedule where the checkpoint left it
+    trainer = make_trainer(folder, num_iters=4)
+    trainer.start_iteration = load_checkpoint(os.path.join(folder, 'checkpoint_3.pth.tar'), trainer.model,
+                                              trainer.optimizer, trainer.scheduler) + 1
+    trainer.learn_async()
+    check_resume(folder, 4)
+
+
+if __name__ == "__main__":
+    test_checkpoint_schedule()
+    print("ALL Trainer Tests Passed!")
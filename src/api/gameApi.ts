@@ -26,14 +26,24 @@ interface ResultUpdate {
     end: [number, number];
 }
 
-type AIResponse = ProgressUpdate | ResultUpdate;
+export interface DepthUpdate {
+    type: 'depth';
+    depth: number;
+    score: number;
+    pv: [[number, number], [number, number]][];
+    nodes: number;
+    elapsed: number;
+}
+
+type AIResponse = ProgressUpdate | DepthUpdate | ResultUpdate;
 
 export const getAIMove = async (
     board: number[][],
     player: number,
     difficulty?: number,
     signal?: AbortSignal,
-    onProgress?: (percent: number, eta: number) => void
+    onProgress?: (percent: number, eta: number) => void,
+    onDepth?: (update: DepthUpdate) => void
 ): Promise<{ start: [number, number], end: [number, number] }> => {
 
     // Convert 2D array to format expected by backend if needed, or pass as is
@@ -53,6 +63,10 @@ export const getAIMove = async (
             if (onProgress) {
                 onProgress(update.percent, update.eta_seconds);
             }
+        } else if (update.type === 'depth') {
+            if (onDepth) {
+                onDepth(update);
+            }
         } else if (update.type === 'result') {
             finalResult = { start: update.start, end: update.end };
         }
@@ -102,12 +116,15 @@ export async function saveGameResult(
 /**
  * Get RL evolution games from training
  */
-export async function getEvolutionGames(iteration?: number, limit: number = 50) {
+export async function getEvolutionGames(iteration?: number, limit: number = 50, offset: number = 0) {
     const params = new URLSearchParams();
     if (iteration !== undefined && iteration !== null) {
         params.append('iteration', String(iteration));
     }
     params.append('limit', String(limit));
+    if (offset > 0) {
+        params.append('offset', String(offset));
+    }
     return apiClient.get<any[]>(`/api/evolution/games?${params.toString()}`);
 }
 
@@ -8,7 +8,8 @@
 export interface AIMoveRequest {
     board: number[][];
     player: number;  // 1 = Red, -1 = Black
-    difficulty?: number;  // 1-4 for Classic, undefined for AlphaZero
+    difficulty?: number;  // 1-20 for Classic (max search depth), undefined for AlphaZero
+    time_limit?: number;  // Seconds per Classic move, in (0, 60] (server default if omitted)
 }
 
 export interface AIMoveProgressResponse {
@@ -23,7 +24,16 @@ export interface AIMoveResultResponse {
     end: [number, number];
 }
 
-export type AIMoveStreamResponse = AIMoveProgressResponse | AIMoveResultResponse;
+export interface AIMoveDepthResponse {
+    type: 'depth';
+    depth: number;
+    score: number;  // From the moving side's point of view
+    pv: [[number, number], [number, number]][];  // Principal variation, absolute [start, end]
+    nodes: number;
+    elapsed: number;
+}
+
+export type AIMoveStreamResponse = AIMoveProgressResponse | AIMoveDepthResponse | AIMoveResultResponse;
 
 // ========== Game API ==========
 